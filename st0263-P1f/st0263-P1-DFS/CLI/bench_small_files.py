@@ -0,0 +1,59 @@
+"""
+Benchmark de subida de archivos pequeños contra un clúster en marcha.
+
+Sube --files archivos de --size bytes (contenido al azar, para que no se deduplique)
+primero uno a uno con DFSClient.write y después juntos con write_many, que los
+empaqueta en bloques contenedores. Mide archivos/s de cada forma, cuántos bloques
+nuevos registra el NameNode y cuánto tarda el listado.
+
+    python bench_small_files.py --namenode 127.0.0.1:50051 --files 2000 --size 4096
+"""
+import argparse
+import os
+import time
+
+from dfs_client import DFSClient
+import dfs_pb2
+
+
+def namespace_blocks(client):
+    """Bloques direccionados por contenido que conoce el NameNode."""
+    metrics = client._namenode().GetMetrics(dfs_pb2.EmptyMessage()).metrics
+    return metrics.get('dedup.referenced_blocks', 0) + metrics.get('dedup.unreferenced_blocks', 0)
+
+
+def run_round(client, label, prefix, args, packed):
+    files = [(f"{prefix}-{index}.txt", os.urandom(args.size)) for index in range(args.files)]
+    blocks = namespace_blocks(client)
+    started = time.perf_counter()
+    if packed:
+        client.write_many(files)
+    else:
+        for name, data in files:
+            client.write(name, data)
+    elapsed = time.perf_counter() - started
+    print(f"{label:<12} {args.files / elapsed:9.1f} archivos/s, "
+          f"{namespace_blocks(client) - blocks:.0f} bloques nuevos")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--namenode', default='127.0.0.1:50051')
+    parser.add_argument('--files', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=4096)
+    args = parser.parse_args()
+
+    client = DFSClient(args.namenode, cache_ttl=0)
+    run_id = int(time.time())
+    try:
+        run_round(client, "uno a uno", f"bench-{run_id}-single", args, packed=False)
+        run_round(client, "empaquetados", f"bench-{run_id}-packed", args, packed=True)
+        started = time.perf_counter()
+        count = len(client.ls())
+        print(f"listado de {count} archivos en {(time.perf_counter() - started) * 1000:.1f} ms")
+    finally:
+        client.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,610 @@
+"""
+Cliente del DFS como librería, sin menús ni entradas por teclado.
+
+DFSClient reúne las operaciones contra el NameNode y los DataNodes para que otros
+programas (jobs por lotes, pipelines) muevan datos directamente:
+
+    client = DFSClient("127.0.0.1:50051")
+    client.put("datos.csv")                      # Sube un archivo local
+    client.get("datos.csv", "copia.csv")         # Lo descarga completo
+    with client.open("datos.csv") as f:          # Lectura en streaming, con seek
+        header = f.readline()
+    with client.open("salida.bin", "wb") as f:   # Escritura en streaming
+        f.write(b"...")
+
+Los canales se reutilizan entre llamadas (grpc_pool) y las descargas piden varios
+bloques a la vez; workers y readahead se configuran al crear el cliente. Los mapas
+de bloques, el listado y las búsquedas se guardan en una caché (metadata_cache)
+que el NameNode invalida al cambiar, así leer otra vez un archivo no le pregunta nada.
+
+Con un códec (codec= o UPLOAD_CODEC, ver common/compression.py) los datos viajan y se
+guardan comprimidos; las descargas aceptan los bloques comprimidos con cualquier códec
+que este proceso conozca y los descomprimen al escribirlos.
+
+Para muchos archivos pequeños, put_many y write_many los envían juntos y el DataNode
+los empaqueta en bloques contenedores compartidos (UploadPacked), con un solo
+CommitFiles por lote en lugar de varias RPCs y un bloque por archivo.
+"""
+import hashlib
+import io
+import os
+import queue
+import sys
+from bisect import bisect_right
+from concurrent import futures
+from pathlib import Path
+from threading import Lock, Thread
+
+import grpc
+
+sys.path.append(str(Path(__file__).parent.parent / 'proto'))
+sys.path.append(str(Path(__file__).parent.parent / 'common'))
+import compression
+import dfs_pb2
+import grpc_pool
+from metadata_cache import MetadataCache, METADATA_TTL
+
+DOWNLOAD_WORKERS = int(os.getenv("DOWNLOAD_WORKERS", "8"))  # Bloques descargados en paralelo
+READAHEAD_BLOCKS = int(os.getenv("READAHEAD_BLOCKS", "4"))  # Bloques que open() pide por adelantado al leer en orden
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # Tamaño de cada mensaje de UploadFile
+WRITE_QUEUE_CHUNKS = 8  # Mensajes en cola entre write() y el envío al DataNode
+UPLOAD_CODEC = os.getenv("UPLOAD_CODEC", "")  # Códec de las subidas; "" deja decidir al DataNode (BLOCK_CODEC)
+PACK_THRESHOLD = int(os.getenv("PACK_THRESHOLD", str(256 * 1024)))  # put_many empaqueta los archivos menores que esto
+PACK_BATCH_FILES = 10000  # Archivos por llamada a UploadPacked
+# Debe coincidir con el BLOCK_SIZE de los DataNodes; si no, la deduplicación no encuentra los bloques
+BLOCK_SIZE = 1024 * 1024
+
+
+class FileStatus:
+    """Tamaño y bloques de un archivo del DFS, como los devuelve DFSClient.stat."""
+    def __init__(self, name, size, blocks):
+        self.name = name
+        self.size = size
+        self.blocks = blocks  # BlockLocation de cada bloque, en orden
+
+    def __repr__(self):
+        return f"FileStatus(name={self.name!r}, size={self.size}, blocks={len(self.blocks)})"
+
+
+class UploadResult:
+    """
+    Resultado de una subida: bloques que el clúster no tenía (None si no se pudo saber
+    antes de enviar) y DataNode por el que se enviaron (None si no hizo falta enviar nada).
+    """
+    def __init__(self, name, new_blocks, datanode):
+        self.name = name
+        self.new_blocks = new_blocks
+        self.datanode = datanode
+
+    def __repr__(self):
+        return f"UploadResult(name={self.name!r}, new_blocks={self.new_blocks}, datanode={self.datanode!r})"
+
+
+class DFSClient:
+    def __init__(self, namenode, workers=DOWNLOAD_WORKERS, readahead=READAHEAD_BLOCKS, cache_ttl=METADATA_TTL,
+                 codec=UPLOAD_CODEC):
+        if codec:
+            compression.get(codec)
+        self.namenode = namenode
+        self.workers = workers
+        self.readahead = readahead
+        self.codec = codec
+        self.cache = MetadataCache(namenode, cache_ttl)
+
+    def _namenode(self):
+        return grpc_pool.get_stub(self.namenode)
+
+    def close(self):
+        """Cierra la suscripción a los cambios del NameNode."""
+        self.cache.close()
+
+    def ls(self):
+        """Nombres de todos los archivos del DFS."""
+        files = self.cache.get('ls')
+        if files is None:
+            response = self._namenode().ListFiles(dfs_pb2.EmptyMessage())
+            if response.status != 200:
+                raise IOError(f"ListFiles failed with status {response.status}")
+            files = tuple(response.files)
+            self.cache.put('ls', None, files, response.version)
+        return list(files)
+
+    def find(self, name):
+        """DataNodes que tienen al menos un bloque del archivo."""
+        addresses = self.cache.get('find', name)
+        if addresses is None:
+            response = self._namenode().FindFile(dfs_pb2.FindFileRequest(fileName=name))
+            if response.status != 200:
+                raise FileNotFoundError(f"File {name} not found")
+            addresses = tuple(response.nodeAddresses)
+            self.cache.put('find', name, addresses, response.version)
+        return list(addresses)
+
+    def stat(self, name):
+        """Tamaño y ubicación de los bloques del archivo; FileNotFoundError si no existe o está incompleto."""
+        return self.cache.get('stat', name) or self._fetch_stat(name)
+
+    def _fetch_stat(self, name):
+        response = self._namenode().NameNodeDownload(dfs_pb2.DownloadFileRequest(fileName=name))
+        if response.status != 200:
+            raise FileNotFoundError(f"File {name} not found or incomplete")
+        status = FileStatus(name, response.fileSize, list(response.blockLocations))
+        self.cache.put('stat', name, status, response.version)
+        return status
+
+    def _locate(self, name, offset, length):
+        """
+        Bloques que cubren el rango: con la caché activa se pide el mapa completo, que
+        sirve para las siguientes lecturas; sin ella, sólo los bloques del rango.
+        """
+        if self.cache.ttl > 0:
+            return self._fetch_stat(name)
+        response = self._namenode().GetBlockRange(
+            dfs_pb2.DownloadFileRequest(fileName=name, offset=offset, length=length))
+        if response.status != 200:
+            raise FileNotFoundError(f"File {name} not found or incomplete")
+        return FileStatus(name, response.fileSize, list(response.blockLocations))
+
+    def open(self, name, mode="rb"):
+        """Abre un archivo del DFS como objeto tipo archivo: 'rb' para leer o 'wb' para escribir."""
+        if mode == "rb":
+            return DFSReader(self, name)
+        if mode == "wb":
+            return DFSWriter(self, name)
+        raise ValueError(f"Unsupported mode {mode!r}: use 'rb' or 'wb'")
+
+    def get(self, name, local_path):
+        """
+        Descarga el archivo completo en local_path. Los bloques se piden en paralelo, cada uno
+        a una de sus réplicas, y se escriben directamente en su posición del archivo preasignado.
+        Si el mapa de bloques venía de la caché y ninguna réplica responde, se pide uno nuevo.
+        """
+        cached = self.cache.get('stat', name)
+        try:
+            return self._get(cached or self._fetch_stat(name), local_path)
+        except IOError:
+            if cached is None:
+                raise
+            return self._get(self._fetch_stat(name), local_path)
+
+    def _get(self, status, local_path):
+        with open(local_path, mode="wb") as f:
+            f.truncate(status.size)
+
+        writer = PositionalWriter(local_path)
+        try:
+            self._fetch_all(status.name, writer,
+                            [(location, 0, 0, location.offset) for location in status.blocks])
+        finally:
+            writer.close()
+        return status
+
+    def read(self, name, offset=0, length=0):
+        """
+        Devuelve los bytes [offset, offset + length) del archivo (length 0 = hasta el final)
+        sin descargarlo completo: de cada bloque que cubre el rango se pide sólo la parte necesaria.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative")
+        cached = self.cache.get('stat', name)
+        try:
+            return self._read(cached or self._locate(name, offset, length), offset, length)
+        except IOError:
+            if cached is None:
+                raise
+            return self._read(self._locate(name, offset, length), offset, length)
+
+    def _read(self, status, offset, length):
+        end = min(offset + length, status.size) if length > 0 else status.size
+        buffer = MemoryWriter(max(end - offset, 0))
+        parts = []
+        for location in status.blocks:
+            start = max(offset - location.offset, 0)
+            stop = min(end - location.offset, location.size)
+            if stop > start:
+                parts.append((location, start, stop - start, location.offset + start - offset))
+        self._fetch_all(status.name, buffer, parts)
+        return buffer.getvalue()
+
+    def _fetch_all(self, name, writer, parts):
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            jobs = [pool.submit(self.fetch_block, writer, *part, name=name) for part in parts]
+            for job in futures.as_completed(jobs):
+                job.result()
+
+    def fetch_block(self, writer, location, start=0, length=0, dest=None, name=None):
+        """
+        Descarga un bloque (o los length bytes desde start) probando sus réplicas en orden
+        hasta que una responda, y lo escribe en dest o en la posición del bloque en el archivo.
+        Devuelve la réplica que respondió. Si falla alguna réplica se olvida el mapa de
+        bloques del archivo 'name' guardado en caché.
+        """
+        if dest is None:
+            dest = location.offset
+        expected = length or (location.size - start if location.size else 0)
+        if location.packed:
+            # El archivo es sólo una parte del contenedor: se pide esa parte
+            start += location.block_offset
+            length = expected
+        # Primero la réplica sugerida por el NameNode; las que ya fallaron van al final
+        replicas = [location.datanode] + [r for r in location.replicas if r != location.datanode]
+        replicas.sort(key=lambda address: not grpc_pool.is_healthy(address))
+
+        request = dfs_pb2.DownloadFileRequest(fileName=location.blockName, offset=start, length=length,
+                                              accept_codecs=compression.available())
+        for address in replicas:
+            offset = dest
+            try:
+                compressed = []
+                for entry_response in grpc_pool.get_stub(address).DownloadFile(request):
+                    if entry_response.codec:
+                        # Bloque comprimido: se descomprime entero al terminar
+                        codec = entry_response.codec
+                        compressed.append(entry_response.chunk_data)
+                        continue
+                    writer.write(entry_response.chunk_data, offset)
+                    offset += len(entry_response.chunk_data)
+                if compressed:
+                    data = compression.decompress(codec, b"".join(compressed))
+                    writer.write(data, offset)
+                    offset += len(data)
+                if expected and offset - dest != expected:
+                    raise IOError(f"expected {expected} bytes, got {offset - dest}")
+                grpc_pool.report_success(address)
+                return address
+            except (grpc.RpcError, IOError, compression.CodecError) as e:
+                grpc_pool.report_failure(address, e)
+                if name is not None:
+                    self.cache.invalidate(name)
+                print(f"Block {location.blockName} failed at {address}, trying another replica: "
+                      f"{e.code() if isinstance(e, grpc.RpcError) else e}")
+
+        raise IOError(f"Block {location.blockName} is not available at any replica")
+
+    def put(self, local_path, name=None, codec=None):
+        """Sube un archivo local con su nombre (o con 'name'). Ver write."""
+        with open(local_path, mode="rb") as source:
+            return self.write(name or os.path.basename(local_path), source, codec)
+
+    def put_many(self, local_paths, codec=None):
+        """
+        Sube varios archivos locales con su nombre. Los menores que PACK_THRESHOLD se
+        empaquetan (ver write_many) y los demás se suben uno a uno con put.
+        Devuelve un UploadResult por archivo, primero los grandes.
+        """
+        results = []
+        small = []
+        for local_path in local_paths:
+            if os.path.getsize(local_path) >= PACK_THRESHOLD:
+                results.append(self.put(local_path, codec=codec))
+            else:
+                small.append(local_path)
+        results.extend(self.write_many(((os.path.basename(path), Path(path).read_bytes()) for path in small),
+                                       codec))
+        return results
+
+    def write_many(self, items, codec=None):
+        """
+        Sube muchos archivos dados como (nombre, bytes). Los menores que PACK_THRESHOLD viajan
+        juntos por UploadPacked, de a PACK_BATCH_FILES, y el DataNode los guarda empaquetados
+        en bloques contenedores; los demás se suben uno a uno con write. Devuelve un
+        UploadResult por archivo (new_blocks es None en los empaquetados).
+        """
+        codec = self.codec if codec is None else codec
+        results = []
+        batch = []
+        for name, data in items:
+            if len(data) >= PACK_THRESHOLD:
+                results.append(self.write(name, data, codec))
+                continue
+            batch.append((name, data))
+            if len(batch) >= PACK_BATCH_FILES:
+                results.extend(self._write_packed(batch, codec))
+                batch = []
+        if batch:
+            results.extend(self._write_packed(batch, codec))
+        return results
+
+    def _write_packed(self, batch, codec):
+        response = self._namenode().NameNodeUpload(dfs_pb2.EmptyMessage())
+        if response.status != 200 or not response.conns:
+            raise IOError("Not enough DataNodes available")
+        attempts = list(response.conns)
+        while attempts:
+            datanode = attempts.pop(0)
+            try:
+                grpc_pool.get_stub(datanode).UploadPacked(packed_requests(batch, codec))
+                grpc_pool.report_success(datanode)
+                for name, _ in batch:
+                    self.cache.invalidate(name, listing=True)
+                return [UploadResult(name, None, datanode) for name, _ in batch]
+            except grpc.RpcError as e:
+                if e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    if codec:
+                        print(f"{datanode} does not support codec {codec!r}, uploading uncompressed")
+                        codec = ""
+                        attempts.insert(0, datanode)
+                        continue
+                    # DataNode sin UploadPacked: un archivo por subida, como antes
+                    return [self.write(name, data, codec) for name, data in batch]
+                grpc_pool.report_failure(datanode, e)
+                print(f"Packed upload through {datanode} failed, trying another DataNode: {e.code()}")
+        raise IOError(f"{len(batch)} files could not be uploaded through any DataNode")
+
+    def write(self, name, data, codec=None):
+        """
+        Sube bytes o un objeto tipo archivo con el nombre dado. Si se puede volver atrás
+        (seek), antes se calcula el manifiesto: si el clúster ya tiene todos los bloques
+        sólo se fija el archivo (CommitFile) y no se envían datos, y si un DataNode falla se
+        reintenta con otro. Si no, los datos se envían en streaming una sola vez.
+        El DataNode que recibe el archivo lo corta y replica los bloques que falten.
+        codec (por defecto el del cliente) comprime los datos en el envío y en el disco;
+        si el DataNode no lo conoce se vuelve a subir sin comprimir, cuando se puede.
+        """
+        codec = self.codec if codec is None else codec
+        source = io.BytesIO(data) if isinstance(data, (bytes, bytearray, memoryview)) else data
+        seekable = hasattr(source, "seekable") and source.seekable()
+        stub = self._namenode()
+        new_blocks = None
+        if seekable:
+            start = source.tell()
+            commit = stub.CommitFile(dfs_pb2.CommitFileRequest(fileName=name, blocks=block_manifest(source)))
+            if commit.status == 200:
+                self.cache.invalidate(name, listing=True)
+                return UploadResult(name, 0, None)
+            new_blocks = len(commit.missing)
+
+        response = stub.NameNodeUpload(dfs_pb2.EmptyMessage())
+        if response.status != 200 or not response.conns:
+            raise IOError("Not enough DataNodes available")
+        # Basta con un DataNode: él corta el archivo y replica cada bloque
+        attempts = list(response.conns)
+        while attempts:
+            datanode = attempts.pop(0)
+            if seekable:
+                source.seek(start)
+            try:
+                grpc_pool.get_stub(datanode).UploadFile(upload_requests(name, source, codec=codec))
+                grpc_pool.report_success(datanode)
+                # Lo propio se ve enseguida, sin esperar a que llegue el cambio del NameNode
+                self.cache.invalidate(name, listing=True)
+                return UploadResult(name, new_blocks, datanode)
+            except grpc.RpcError as e:
+                if codec and seekable and e.code() == grpc.StatusCode.UNIMPLEMENTED:
+                    print(f"{datanode} does not support codec {codec!r}, uploading uncompressed")
+                    codec = ""
+                    attempts.insert(0, datanode)
+                    continue
+                grpc_pool.report_failure(datanode, e)
+                if not seekable:
+                    raise IOError(f"Upload of {name} through {datanode} failed: {e.code()}") from e
+                print(f"Upload through {datanode} failed, trying another DataNode: {e.code()}")
+        raise IOError(f"{name} could not be uploaded through any DataNode")
+
+
+def block_manifest(source, block_size=BLOCK_SIZE):
+    """Hash SHA-256 y tamaño de cada bloque leído de source, cortado igual que en los DataNodes."""
+    blocks = []
+    while True:
+        block = source.read(block_size)
+        if not block:
+            return blocks
+        blocks.append(dfs_pb2.BlockRef(hash=hashlib.sha256(block).hexdigest(), size=len(block)))
+
+
+def upload_requests(name, source, chunk_size=UPLOAD_CHUNK_SIZE, codec=""):
+    """
+    Mensajes de UploadFile: primero el nombre y luego el contenido de source en partes,
+    cada una comprimida por separado si hay códec.
+    """
+    yield dfs_pb2.UploadFileRequest(fileName=name, codec=codec)
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            return
+        yield dfs_pb2.UploadFileRequest(chunk_data=compression.get(codec).compress(chunk) if codec else chunk)
+
+
+class DFSReader(io.RawIOBase):
+    """
+    Archivo del DFS abierto para lectura. Las ubicaciones se piden al NameNode una sola
+    vez; cada bloque se descarga entero de una réplica cuando se necesita y, al leer en
+    orden, los 'readahead' siguientes se piden por adelantado en paralelo. Admite seek.
+    """
+    def __init__(self, client, name):
+        super().__init__()
+        status = client.stat(name)
+        self.client = client
+        self.name = name
+        self.size = status.size
+        self.blocks = status.blocks
+        self.offsets = [location.offset for location in self.blocks]
+        self.position = 0
+        self.pending = {}  # índice del bloque -> Future con su contenido
+        self.pool = futures.ThreadPoolExecutor(max_workers=max(1, client.readahead))
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence == io.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise ValueError("negative seek position")
+        self.position = offset
+        return offset
+
+    def _block(self, index):
+        """Contenido del bloque index; pide los siguientes y olvida los que quedaron fuera de la ventana."""
+        last = min(index + self.client.readahead, len(self.blocks) - 1)
+        for other in [i for i in self.pending if i < index or i > last]:
+            self.pending.pop(other).cancel()
+        for i in range(index, last + 1):
+            if i not in self.pending:
+                self.pending[i] = self.pool.submit(self._download, self.blocks[i])
+        return self.pending[index].result()
+
+    def _download(self, location):
+        buffer = MemoryWriter(location.size)
+        self.client.fetch_block(buffer, location, dest=0, name=self.name)
+        return buffer.buffer
+
+    def readinto(self, target):
+        # Llena target entero aunque cruce varios bloques: read(n) sólo devuelve menos al final del archivo
+        view = memoryview(target).cast("B")
+        filled = 0
+        while filled < len(view) and self.position < self.size:
+            index = bisect_right(self.offsets, self.position) - 1
+            data = self._block(index)
+            start = self.position - self.offsets[index]
+            count = min(len(view) - filled, len(data) - start)
+            if count <= 0:
+                break  # El bloque es más corto de lo que indicó el NameNode
+            view[filled:filled + count] = memoryview(data)[start:start + count]
+            filled += count
+            self.position += count
+        return filled
+
+    def readall(self):
+        chunks = []
+        while True:
+            chunk = self.read(BLOCK_SIZE)
+            if not chunk:
+                return b"".join(chunks)
+            chunks.append(chunk)
+
+    def close(self):
+        if not self.closed:
+            for pending in self.pending.values():
+                pending.cancel()
+            self.pool.shutdown(wait=False)
+        super().close()
+
+
+def packed_requests(files, codec=""):
+    """Mensajes de UploadPacked: el nombre de cada archivo seguido de su contenido."""
+    for position, (name, data) in enumerate(files):
+        yield dfs_pb2.UploadFileRequest(fileName=name, codec=codec if position == 0 else "")
+        if data:
+            yield dfs_pb2.UploadFileRequest(chunk_data=compression.get(codec).compress(data) if codec else data)
+
+
+class DFSWriter(io.RawIOBase):
+    """
+    Archivo del DFS abierto para escritura. Los datos se envían en streaming a un DataNode
+    a medida que se escriben, con una cola acotada entre write() y el envío, y el archivo
+    queda fijado al cerrar. No deduplica antes de enviar: para eso, DFSClient.write o put.
+    """
+    def __init__(self, client, name):
+        super().__init__()
+        response = client._namenode().NameNodeUpload(dfs_pb2.EmptyMessage())
+        if response.status != 200 or not response.conns:
+            raise IOError("Not enough DataNodes available")
+        self.client = client
+        self.name = name
+        self.datanode = response.conns[0]
+        self.codec = client.codec
+        self.buffer = bytearray()
+        self.chunks = queue.Queue(maxsize=WRITE_QUEUE_CHUNKS)
+        self.error = None
+        self.sender = Thread(target=self._send, daemon=True)
+        self.sender.start()
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._check()
+        data = memoryview(data).cast("B")
+        self.buffer.extend(data)
+        while len(self.buffer) >= UPLOAD_CHUNK_SIZE:
+            self._put(bytes(self.buffer[:UPLOAD_CHUNK_SIZE]))
+            del self.buffer[:UPLOAD_CHUNK_SIZE]
+        return len(data)
+
+    def _put(self, item):
+        # Con timeout para enterarse si el envío falló mientras la cola estaba llena
+        while True:
+            self._check()
+            try:
+                self.chunks.put(item, timeout=1)
+                return
+            except queue.Full:
+                pass
+
+    def _check(self):
+        if self.error is not None:
+            raise IOError(f"Upload of {self.name} through {self.datanode} failed: {self.error}")
+
+    def _requests(self):
+        yield dfs_pb2.UploadFileRequest(fileName=self.name, codec=self.codec)
+        for chunk in iter(self.chunks.get, None):
+            if self.codec:
+                chunk = compression.get(self.codec).compress(chunk)
+            yield dfs_pb2.UploadFileRequest(chunk_data=chunk)
+
+    def _send(self):
+        try:
+            grpc_pool.get_stub(self.datanode).UploadFile(self._requests())
+            grpc_pool.report_success(self.datanode)
+        except grpc.RpcError as e:
+            grpc_pool.report_failure(self.datanode, e)
+            self.error = e.code()
+
+    def close(self):
+        if self.closed:
+            return
+        try:
+            if self.buffer:
+                self._put(bytes(self.buffer))
+                self.buffer.clear()
+            self._put(None)
+            self.sender.join()
+            self._check()
+            self.client.cache.invalidate(self.name, listing=True)
+        finally:
+            super().close()
+
+
+class PositionalWriter:
+    """
+    Escribe en posiciones arbitrarias de un archivo desde varios hilos.
+    Usa os.pwrite cuando existe; en Windows serializa seek + write con un lock.
+    """
+    def __init__(self, filepath):
+        self.fd = os.open(filepath, os.O_WRONLY | getattr(os, 'O_BINARY', 0))
+        self.lock = Lock()
+
+    def write(self, data, offset):
+        if hasattr(os, 'pwrite'):
+            os.pwrite(self.fd, data, offset)
+            return
+        with self.lock:
+            os.lseek(self.fd, offset, os.SEEK_SET)
+            os.write(self.fd, data)
+
+    def close(self):
+        os.close(self.fd)
+
+
+class MemoryWriter:
+    """Destino en memoria con la misma interfaz que PositionalWriter, para lecturas por rango."""
+    def __init__(self, size):
+        self.buffer = bytearray(size)
+
+    def write(self, data, offset):
+        self.buffer[offset:offset + len(data)] = data
+
+    def getvalue(self):
+        return bytes(self.buffer)
+
+    def close(self):
+        pass
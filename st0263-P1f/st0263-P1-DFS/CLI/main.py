@@ -1,15 +1,12 @@
-import grpc
 import os
-import sys
 from dotenv import load_dotenv
-from pathlib import Path
 import getpass  # Para manejar contraseñas
 
-# Añadimos el directorio proto
-project_root = Path(__file__).parent.parent / 'proto'
-sys.path.append(str(project_root))
-import dfs_pb2_grpc
-import dfs_pb2
+# Antes de importar la librería: dfs_client y metadata_cache leen su configuración al importarse
+load_dotenv()
+
+# Toda la comunicación con el DFS está en la librería; este archivo sólo es el menú
+from dfs_client import DFSClient
 
 # Simulamos una base de datos de usuarios y contraseñas
 USERS_DB = {
@@ -20,6 +17,7 @@ USERS_DB = {
 class CLIInterface:
     def __init__(self, name_node_url):
         self.name_node_url = name_node_url
+        self.client = DFSClient(name_node_url)
         self.authenticated_user = None  # Para almacenar el usuario autenticado
 
     def clearScreen(self):
@@ -80,64 +78,40 @@ class CLIInterface:
 
     def getFile(self):
         try:
-            with grpc.insecure_channel(self.name_node_url) as chan:
-                stub = dfs_pb2_grpc.dfsStub(chan)
-                list_response = stub.ListFiles(dfs_pb2.EmptyMessage())
-                if list_response.status == 200:
-                    print("Available files:")
-                    for idx, file_name in enumerate(list_response.files, 1):
-                        print(f"{idx}. {file_name}")
-                else:
-                    print("No files available")
-                    return
+            files = self.client.ls()
+            if not files:
+                print("No files available")
+                return
+            print("Available files:")
+            for idx, file_name in enumerate(files, 1):
+                print(f"{idx}. {file_name}")
 
             file_idx = int(input("Select a file: ")) - 1
-            if file_idx < 0 or file_idx >= len(list_response.files):
+            if file_idx < 0 or file_idx >= len(files):
                 print("Invalid selection.")
                 return
-            file_name = list_response.files[file_idx]
-
-            with grpc.insecure_channel(self.name_node_url) as chan:
-                stub = dfs_pb2_grpc.dfsStub(chan)
-                download_response = stub.NameNodeDownload(dfs_pb2.DownloadFileRequest(fileName=file_name))
-                if download_response.status == 200 and download_response.conns:
-                    selected_data_node = download_response.conns[0]
-                    print(f"Downloading file from DataNode: {selected_data_node}")
-
-                    with grpc.insecure_channel(selected_data_node) as dataNodeChan:
-                        dataNodeStub = dfs_pb2_grpc.dfsStub(dataNodeChan)
-                        filepath = "downloads/" + file_name
-                        with open(filepath, mode="wb") as f:
-                            for entry_response in dataNodeStub.DownloadFile(dfs_pb2.DownloadFileRequest(fileName=file_name)):
-                                f.write(entry_response.chunk_data)
-                            print(f"File '{file_name}' successfully downloaded.")
-                else:
-                    print("File not found at any DataNode.")
+            file_name = files[file_idx]
+
+            self.client.get(file_name, os.path.join("downloads", file_name))
+            print(f"File '{file_name}' successfully downloaded.")
+        except FileNotFoundError:
+            print("File not found at any DataNode.")
         except Exception as e:
             print(f"Error during download: {str(e)}")
 
-    def ReadFiles(self, filepath, chunk_size=1024):
-        _, filename = os.path.split(filepath)
-        yield dfs_pb2.UploadFileRequest(fileName=filename)
-        with open(filepath, mode="rb") as f:
-            while True:
-                chunk = f.read(chunk_size)
-                if chunk:
-                    entry_request = dfs_pb2.UploadFileRequest(chunk_data=chunk)
-                    yield entry_request
-                else:
-                    return      
+    def readRange(self, file_name, offset, length):
+        """Bytes [offset, offset + length) del archivo; ver DFSClient.read."""
+        return self.client.read(file_name, offset, length)
 
     def findFile(self, file_name):
-        with grpc.insecure_channel(self.name_node_url) as chan:
-            stub = dfs_pb2_grpc.dfsStub(chan)
-            response = stub.FindFile(dfs_pb2.FindFileRequest(fileName=file_name))
-            if response.status == 200:
-                print(f"The file '{file_name}' was found at DataNodes:")
-                for address in response.nodeAddresses:
-                    print(address)
-            else:
-                print(f"The file '{file_name}' was not found")
+        try:
+            addresses = self.client.find(file_name)
+        except FileNotFoundError:
+            print(f"The file '{file_name}' was not found")
+            return
+        print(f"The file '{file_name}' was found at DataNodes:")
+        for address in addresses:
+            print(address)
 
     def listLocalFiles(self, directory="files"):
         print("Available files:")
@@ -150,43 +124,39 @@ class CLIInterface:
             files_dict = self.listLocalFiles("files")
             for idx, file_name in files_dict.items():
                 print(f"{idx}. {file_name}")
-            file_idx = int(input("Select a file to upload: "))
+            file_idx = int(input("Select a file to upload (0 = all): "))
+            if file_idx == 0:
+                # Los archivos pequeños se suben juntos, empaquetados en bloques compartidos
+                results = self.client.put_many([os.path.join("files", name) for name in files_dict.values()])
+                print(f"{len(results)} files uploaded successfully.")
+                return
             if file_idx in files_dict:
                 file_path = os.path.join("files", files_dict[file_idx])
             else:
                 print("Invalid selection")
                 return
 
-            with grpc.insecure_channel(self.name_node_url) as chan:
-                stub = dfs_pb2_grpc.dfsStub(chan)
-                response = stub.NameNodeUpload(dfs_pb2.EmptyMessage())
-                if response.status == 200 and len(response.conns) > 0:
-                    for dataNode in response.conns:
-                        with grpc.insecure_channel(dataNode) as dataNodeChan:
-                            dataNodeStub = dfs_pb2_grpc.dfsStub(dataNodeChan)
-                            dataNodeStub.UploadFile(self.ReadFiles(file_path))
-                    print(f"File uploaded successfully to {len(response.conns)} DataNodes.")
-                else:
-                    print("Error: Ensure that at least 2 DataNodes are available.")
+            result = self.client.put(file_path)
+            if result.datanode is None:
+                print("File uploaded successfully (all blocks were already stored, no data sent).")
+            else:
+                print(f"File uploaded successfully through DataNode {result.datanode} "
+                      f"({result.new_blocks} new blocks).")
         except Exception as e:
             print(f"Error during file upload: {str(e)}")
 
     def listFiles(self):
-        with grpc.insecure_channel(self.name_node_url) as chan:
-            stub = dfs_pb2_grpc.dfsStub(chan)
-            request = dfs_pb2.EmptyMessage()
-            response = stub.ListFiles(request)
-
-        if response.status == 200:
-            print("Files:")
-            print(response.files)
-        else:
+        try:
+            files = self.client.ls()
+        except IOError as e:
             print("Error listing files.")
-            print("Status code: ", response.status)
+            print(e)
+            return
+        print("Files:")
+        print(files)
 
 
 if __name__ == "__main__":
-    load_dotenv()
     namenode = str(os.getenv("namenode")).encode('utf-8')
     cli = CLIInterface(namenode)
     cli.cli()
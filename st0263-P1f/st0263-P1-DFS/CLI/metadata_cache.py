@@ -0,0 +1,144 @@
+"""
+Caché de metadatos del cliente: mapas de bloques, listado y ubicaciones de archivos.
+
+Cada respuesta del NameNode trae la versión del espacio de nombres con la que se
+armó. Un hilo suscrito a WatchNamespace recibe los cambios apenas ocurren y borra
+las entradas afectadas. Cada mensaje renueva una concesión (lease_ms): mientras está
+vigente las entradas valen hasta 'ttl' segundos; sin ella (NameNode caído, demasiados
+suscriptores) sólo 'unleased_ttl' segundos. Una lectura fallida en un DataNode
+también invalida el archivo, así nunca se insiste con réplicas que ya no existen.
+"""
+import os
+import time
+from threading import Lock, Thread
+
+import grpc
+
+import dfs_pb2
+import grpc_pool
+
+METADATA_TTL = float(os.getenv("METADATA_TTL", "60"))  # Edad máxima de una entrada; 0 desactiva la caché
+METADATA_UNLEASED_TTL = float(os.getenv("METADATA_UNLEASED_TTL", "1"))  # Edad máxima sin suscripción viva
+MAX_ENTRIES = 10000  # Entradas guardadas; al pasarse se descartan las más antiguas
+MAX_CHANGED = 10000  # Versiones de cambio recordadas por archivo antes de tratar todo como cambiado
+WATCH_RETRY = 5  # Segundos entre intentos de volver a suscribirse
+
+
+class MetadataCache:
+    def __init__(self, namenode, ttl=METADATA_TTL, unleased_ttl=METADATA_UNLEASED_TTL):
+        self.namenode = namenode
+        self.ttl = ttl
+        self.unleased_ttl = unleased_ttl
+        self.entries = {}         # (tipo, nombre) -> (valor, cuándo se guardó); tipo: 'stat', 'find' o 'ls'
+        self.changed_at = {}      # nombre -> versión del último cambio recibido
+        self.reset_at = 0         # Versión del último reset: nada anterior se puede guardar
+        self.version = 0          # Última versión recibida por WatchNamespace
+        self.listing_version = 0
+        self.lease_until = 0.0
+        self.lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.call = None
+        self.closed = False
+        if ttl > 0:
+            Thread(target=self._watch, daemon=True).start()
+
+    def get(self, kind, name=None):
+        """Valor guardado o None si no está o ya no vale."""
+        if self.ttl <= 0:
+            return None
+        now = time.monotonic()
+        limit = self.ttl if now < self.lease_until else min(self.ttl, self.unleased_ttl)
+        with self.lock:
+            entry = self.entries.get((kind, name))
+            if entry is not None and now - entry[1] <= limit:
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                del self.entries[(kind, name)]
+            self.misses += 1
+            return None
+
+    def put(self, kind, name, value, version):
+        """
+        Guarda una respuesta armada en 'version'. Si mientras llegaba se recibió un cambio
+        posterior del mismo archivo (o del listado) no se guarda: podría estar obsoleta.
+        """
+        if self.ttl <= 0:
+            return
+        with self.lock:
+            if kind == 'ls':
+                if version < self.listing_version:
+                    return
+            elif version < max(self.reset_at, self.changed_at.get(name, 0)):
+                return
+            if len(self.entries) >= MAX_ENTRIES:
+                del self.entries[next(iter(self.entries))]
+            self.entries[(kind, name)] = (value, time.monotonic())
+
+    def invalidate(self, name, listing=False):
+        """Olvida lo guardado de un archivo (y el listado si 'listing')."""
+        with self.lock:
+            self._drop(name)
+            if listing and self.entries.pop(('ls', None), None) is not None:
+                self.invalidations += 1
+
+    def _drop(self, name):
+        for kind in ('stat', 'find'):
+            if self.entries.pop((kind, name), None) is not None:
+                self.invalidations += 1
+
+    def _apply(self, change):
+        with self.lock:
+            if change.reset:
+                self.invalidations += len(self.entries)
+                self.entries.clear()
+                self.changed_at.clear()
+                self.reset_at = change.version
+            if len(self.changed_at) + len(change.files) > MAX_CHANGED:
+                # Sin memoria de qué cambió: lo anterior a esta versión ya no se guarda
+                self.changed_at.clear()
+                self.reset_at = change.version
+            for name in change.files:
+                self._drop(name)
+                self.changed_at[name] = change.version
+            if change.listing_version != self.listing_version:
+                if self.entries.pop(('ls', None), None) is not None:
+                    self.invalidations += 1
+                self.listing_version = change.listing_version
+            self.version = change.version
+            self.lease_until = time.monotonic() + change.lease_ms / 1000
+
+    def _watch(self):
+        """Mantiene la suscripción a WatchNamespace, retomando desde la última versión recibida."""
+        while not self.closed:
+            try:
+                self.call = grpc_pool.get_stub(self.namenode).WatchNamespace(dfs_pb2.WatchRequest(since=self.version))
+                for change in self.call:
+                    self._apply(change)
+            except grpc.RpcError as e:
+                if self.closed:
+                    return
+                if e.code() != grpc.StatusCode.CANCELLED:
+                    grpc_pool.report_failure(self.namenode, e)
+            # Sin suscripción no llegan invalidaciones: la caché vuelve a durar unleased_ttl
+            self.lease_until = 0.0
+            time.sleep(WATCH_RETRY)
+
+    def leased(self):
+        return time.monotonic() < self.lease_until
+
+    def stats(self):
+        return {
+            'metadata_cache.hits': self.hits,
+            'metadata_cache.misses': self.misses,
+            'metadata_cache.invalidations': self.invalidations,
+            'metadata_cache.entries': len(self.entries),
+            'metadata_cache.leased': int(self.leased()),
+        }
+
+    def close(self):
+        self.closed = True
+        if self.call is not None:
+            self.call.cancel()
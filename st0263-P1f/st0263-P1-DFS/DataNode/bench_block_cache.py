@@ -0,0 +1,106 @@
+"""
+Benchmark de la caché de bloques del DataNode con muchos clientes pidiendo los
+mismos bloques.
+
+Levanta un DataNode local sin NameNode con --blocks bloques de 1 MB (con sus
+CRC32C) y lanza --clients hilos que descargan bloques al azar, la mayoría de un
+conjunto caliente (--hot de los bloques reciben --hot-share de las lecturas).
+Se mide con la caché desactivada y con una caché de --cache-mb MB: MB/s, lecturas
+del disco y aciertos.
+
+    python bench_block_cache.py --blocks 512 --cache-mb 64 --clients 16
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from concurrent import futures
+
+import grpc
+
+import main
+import checksums
+import grpc_pool
+import dfs_pb2
+import dfs_pb2_grpc
+
+
+def make_blocks(count):
+    names = []
+    for index in range(count):
+        data = os.urandom(1024 * 1024)
+        name = f"bench_block_{index}"
+        with open(os.path.join(main.FILES_DIR, name), 'wb') as f:
+            f.write(data)
+        main.write_block_meta(name, "bench", index, len(data), "", checksums.chunk_checksums(data))
+        names.append(name)
+    return names
+
+
+def client(port, names, hot, hot_share, seconds):
+    stub = dfs_pb2_grpc.dfsStub(grpc.insecure_channel(f"127.0.0.1:{port}", options=grpc_pool.CHANNEL_OPTIONS))
+    total = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pool = names[:hot] if random.random() < hot_share else names[hot:]
+        request = dfs_pb2.DownloadFileRequest(fileName=random.choice(pool))
+        for response in stub.DownloadFile(request):
+            total += len(response.chunk_data)
+    return total
+
+
+def run_round(port, args, names, hot, cache_bytes):
+    main.block_cache.resize(cache_bytes)
+    loads = [0]
+    original = main.block_cache.loader
+
+    def counting_loader(name, path):
+        loads[0] += 1
+        return original(name, path)
+
+    main.block_cache.loader = counting_loader
+    before = main.block_cache.metrics()
+    try:
+        with futures.ThreadPoolExecutor(max_workers=args.clients) as pool:
+            jobs = [pool.submit(client, port, names, hot, args.hot_share, args.seconds) for _ in range(args.clients)]
+            total = sum(job.result() for job in jobs)
+    finally:
+        main.block_cache.loader = original
+    after = main.block_cache.metrics()
+    # Sin caché cada descarga lee el bloque del disco
+    disk_reads = loads[0] if cache_bytes else total // (1024 * 1024)
+    label = f"caché de {cache_bytes // (1024 * 1024)} MB" if cache_bytes else "sin caché"
+    print(f"{label:<18} {total / args.seconds / (1024 * 1024):8.1f} MB/s, {disk_reads} bloques leídos del disco, "
+          f"{after['block_cache.hits'] - before['block_cache.hits']} aciertos, "
+          f"{after['block_cache.evictions'] - before['block_cache.evictions']} descartes")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--blocks', type=int, default=512)
+    parser.add_argument('--hot', type=float, default=0.05, help='Fracción de los bloques que es caliente')
+    parser.add_argument('--hot-share', type=float, default=0.9, help='Fracción de las lecturas a bloques calientes')
+    parser.add_argument('--cache-mb', type=int, default=64)
+    parser.add_argument('--clients', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as files_dir:
+        main.FILES_DIR = files_dir
+        names = make_blocks(args.blocks)
+        hot = max(1, int(args.blocks * args.hot))
+
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=args.clients), options=grpc_pool.SERVER_OPTIONS)
+        dfs_pb2_grpc.add_dfsServicer_to_server(main.Files(None, 'bench'), server)
+        port = server.add_insecure_port('127.0.0.1:0')
+        server.start()
+        try:
+            run_round(port, args, names, hot, 0)
+            run_round(port, args, names, hot, args.cache_mb * 1024 * 1024)
+        finally:
+            server.stop(None)
+
+
+if __name__ == '__main__':
+    main_bench()
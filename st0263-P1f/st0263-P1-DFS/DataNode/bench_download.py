@@ -0,0 +1,95 @@
+"""
+Benchmark de DownloadFile: compara MB/s del camino antiguo (read() de 1KB por
+mensaje) con las lecturas grandes por readinto y por mmap.
+
+Levanta un DataNode local en un puerto libre, sin NameNode, y descarga un
+archivo de prueba varias veces por cada modo:
+
+    python bench_download.py --size-mb 256 --repeat 3
+"""
+import argparse
+import os
+import tempfile
+import time
+from concurrent import futures
+
+import grpc
+
+import main
+import grpc_pool
+import dfs_pb2
+import dfs_pb2_grpc
+
+
+def legacy_chunks(file_path, chunk_size=None, use_mmap=None):
+    """El camino original: una llamada a read() y un objeto nuevo por cada KB."""
+    with open(file_path, 'rb') as file:
+        while True:
+            chunk_data = file.read(1024)
+            if not chunk_data:
+                return
+            yield chunk_data
+
+
+def download(stub, file_name):
+    total = 0
+    for response in stub.DownloadFile(dfs_pb2.DownloadFileRequest(fileName=file_name)):
+        total += len(response.chunk_data)
+    return total
+
+
+def run_mode(stub, file_name, repeat):
+    best = 0.0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        total = download(stub, file_name)
+        elapsed = time.perf_counter() - start
+        best = max(best, total / elapsed / (1024 * 1024))
+    return best
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size-mb', type=int, default=128)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--chunk-sizes', default='1048576,4194304',
+                        help='Tamaños de mensaje a probar con readinto y mmap, separados por comas')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as files_dir:
+        main.FILES_DIR = files_dir
+        main.block_cache.resize(0)  # Se mide la lectura del disco, no la caché de bloques
+        file_name = 'bench.bin'
+        with open(os.path.join(files_dir, file_name), 'wb') as f:
+            for _ in range(args.size_mb):
+                f.write(os.urandom(1024 * 1024))
+
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), options=grpc_pool.SERVER_OPTIONS)
+        dfs_pb2_grpc.add_dfsServicer_to_server(main.Files(None, 'bench'), server)
+        port = server.add_insecure_port('127.0.0.1:0')
+        server.start()
+
+        channel = grpc.insecure_channel(f'127.0.0.1:{port}', options=grpc_pool.CHANNEL_OPTIONS)
+        stub = dfs_pb2_grpc.dfsStub(channel)
+
+        modes = [('read() 1KB (antiguo)', legacy_chunks, 1024, False)]
+        for chunk_size in [int(size) for size in args.chunk_sizes.split(',')]:
+            modes.append((f'readinto {chunk_size // 1024}KB', main.read_chunks, chunk_size, False))
+            modes.append((f'mmap {chunk_size // 1024}KB', main.read_chunks, chunk_size, True))
+
+        original = main.read_chunks
+        print(f'Archivo de {args.size_mb} MB, mejor de {args.repeat} descargas')
+        try:
+            for label, reader, chunk_size, use_mmap in modes:
+                main.read_chunks = reader
+                main.DOWNLOAD_CHUNK_SIZE = chunk_size
+                main.DOWNLOAD_USE_MMAP = use_mmap
+                print(f'{label:<24} {run_mode(stub, file_name, args.repeat):8.1f} MB/s')
+        finally:
+            main.read_chunks = original
+            channel.close()
+            server.stop(None)
+
+
+if __name__ == '__main__':
+    main_bench()
@@ -0,0 +1,157 @@
+"""
+Caché en memoria de bloques calientes del DataNode.
+
+Guarda bloques completos, ya verificados con sus CRC32C, hasta un presupuesto de
+bytes y descarta primero el usado hace más tiempo (LRU). Los bloques fijados (pin)
+no se descartan nunca. Si muchos clientes piden a la vez un bloque que no está, sólo
+uno lo lee del disco y los demás esperan esa misma lectura.
+
+Cada entrada recuerda el inodo, la fecha de modificación y el tamaño del archivo
+con los que se cargó y se compara con un stat() en cada acierto: un bloque
+reemplazado o borrado (también desde otro worker, que tiene su propia caché) nunca
+se sirve desde memoria.
+"""
+import os
+from collections import OrderedDict
+from concurrent import futures
+from threading import Lock
+
+
+class _Entry:
+    __slots__ = ('data', 'version', 'size')
+
+    def __init__(self, data, version, size):
+        self.data = data
+        self.version = version
+        self.size = size
+
+
+class BlockCache:
+    def __init__(self, capacity, loader, max_block_fraction=8, weigh=len):
+        """
+        capacity: bytes máximos en memoria (0 desactiva la caché).
+        loader(nombre, ruta): lee y verifica el bloque completo; sus excepciones llegan a get().
+        weigh(valor): bytes que ocupa en memoria lo que devolvió loader.
+        Los bloques de más de capacity / max_block_fraction se sirven siempre desde el disco.
+        """
+        self.loader = loader
+        self.weigh = weigh
+        self.max_block_fraction = max_block_fraction
+        self.lock = Lock()
+        self.entries = OrderedDict()  # Bloques descartables, del menos al más usado
+        self.pinned_entries = {}      # Bloques fijados: cuentan en el presupuesto pero no se descartan
+        self.pinned = set()
+        self.loading = {}             # nombre -> Future de la lectura en curso
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.hit_bytes = 0
+        self.resize(capacity)
+
+    def resize(self, capacity):
+        with self.lock:
+            self.capacity = capacity
+            self.max_block = capacity // self.max_block_fraction
+            self._evict()
+
+    def pin(self, name):
+        """Fija un bloque: una vez cargado no se descarta."""
+        with self.lock:
+            self.pinned.add(name)
+            entry = self.entries.pop(name, None)
+            if entry is not None:
+                self.pinned_entries[name] = entry
+
+    def unpin(self, name):
+        with self.lock:
+            self.pinned.discard(name)
+            entry = self.pinned_entries.pop(name, None)
+            if entry is not None:
+                self.entries[name] = entry
+                self._evict()
+
+    def get(self, name, path):
+        """
+        Contenido completo del bloque, desde memoria o leyéndolo con loader. Devuelve None
+        si la caché está desactivada, el bloque es demasiado grande o ya no existe.
+        """
+        if self.capacity <= 0:
+            return None
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            self.invalidate(name)
+            return None
+        if stat.st_size > self.max_block:
+            return None
+        version = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+
+        with self.lock:
+            entry = self.entries.get(name) or self.pinned_entries.get(name)
+            if entry is not None and entry.version == version:
+                if name in self.entries:
+                    self.entries.move_to_end(name)
+                self.hits += 1
+                self.hit_bytes += entry.size
+                return entry.data
+            self.misses += 1
+            loading = self.loading.get(name)
+            owner = loading is None
+            if owner:
+                loading = self.loading[name] = futures.Future()
+        if not owner:
+            return loading.result()
+
+        try:
+            data = self.loader(name, path)
+            loading.set_result(data)
+        except BaseException as e:
+            loading.set_exception(e)
+            raise
+        finally:
+            with self.lock:
+                del self.loading[name]
+        self._store(name, _Entry(data, version, self.weigh(data)))
+        return data
+
+    def _store(self, name, entry):
+        with self.lock:
+            self._remove(name)
+            if name in self.pinned:
+                self.pinned_entries[name] = entry
+            else:
+                self.entries[name] = entry
+            self.size += entry.size
+            self._evict()
+
+    def invalidate(self, name):
+        """Olvida un bloque borrado, apartado o reescrito."""
+        with self.lock:
+            self._remove(name)
+
+    def _remove(self, name):
+        entry = self.entries.pop(name, None) or self.pinned_entries.pop(name, None)
+        if entry is not None:
+            self.size -= entry.size
+
+    def _evict(self):
+        while self.size > self.capacity and self.entries:
+            _, entry = self.entries.popitem(last=False)
+            self.size -= entry.size
+            self.evictions += 1
+
+    def metrics(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'block_cache.capacity_bytes': self.capacity,
+                'block_cache.bytes': self.size,
+                'block_cache.blocks': len(self.entries) + len(self.pinned_entries),
+                'block_cache.pinned_blocks': len(self.pinned_entries),
+                'block_cache.hits': self.hits,
+                'block_cache.misses': self.misses,
+                'block_cache.evictions': self.evictions,
+                'block_cache.hit_bytes': self.hit_bytes,
+                'block_cache.hit_ratio': self.hits / lookups if lookups else 0.0,
+            }
@@ -1,83 +1,861 @@
 import grpc
 from dotenv import load_dotenv
+import argparse
 import os
 import sys
 import time
+import queue
+import itertools
+import json
+import re
+import hashlib
+import shutil
+import mmap
+import zlib
+import socket
+import multiprocessing
+from contextlib import contextmanager
 from concurrent import futures
 from os.path import isfile, join, exists
 from os import listdir, makedirs
-from threading import Thread
+from threading import Thread, Lock, BoundedSemaphore, get_ident
 from pathlib import Path
 
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # Windows: sin flock no hay workers, basta con los locks entre hilos
+
 proto_directory = Path(__file__).parent.parent / 'proto'
 sys.path.insert(0, str(proto_directory))
+common_directory = Path(__file__).parent.parent / 'common'
+sys.path.insert(0, str(common_directory))
 
 import dfs_pb2_grpc
 import dfs_pb2
+import grpc_pool
+import checksums
+import compression
+import aio_server
+from block_cache import BlockCache
 
 HEARTBEAT_INTERVAL = 10
+FULL_REPORT_INTERVAL = int(os.getenv("FULL_REPORT_INTERVAL", "600"))  # Segundos entre reportes completos de bloques
 BLOCK_SIZE = 1024 * 1024  # 1MB tamaño del bloque, configurable
-FILES_DIR = "files"  # Directorio para almacenar bloques
+FILES_DIR = "files"  # Directorio para almacenar bloques (--data-dir)
+# Máximo de bloques cortados en espera de ser enviados por cada subida; limita la memoria usada por UploadFile
+MAX_INFLIGHT_BLOCKS = int(os.getenv("MAX_INFLIGHT_BLOCKS", "4"))
+STREAM_CHUNK_SIZE = 64 * 1024  # Tamaño de cada mensaje de UploadBlockStream
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(1024 * 1024)))  # Tamaño de cada mensaje de DownloadFile
+DOWNLOAD_USE_MMAP = os.getenv("DOWNLOAD_USE_MMAP", "0") == "1"  # Leer con mmap en lugar de readinto
+FORWARD_QUEUE_CHUNKS = 16  # Partes de bloque en cola hacia el siguiente DataNode del pipeline
+DISTRIBUTION_WORKERS = int(os.getenv("DISTRIBUTION_WORKERS", "8"))  # Hilos que envían bloques en paralelo
+MAX_STREAMS_PER_DATANODE = int(os.getenv("MAX_STREAMS_PER_DATANODE", "4"))  # Envíos simultáneos hacia un mismo DataNode
+
+SCRUB_INTERVAL = int(os.getenv("SCRUB_INTERVAL", "3600"))  # Segundos entre pasadas completas del scrubber
+SCRUB_BYTES_PER_SEC = int(os.getenv("SCRUB_BYTES_PER_SEC", str(1024 * 1024)))  # Lectura máxima del scrubber
+REPLICATION_WORKERS = int(os.getenv("REPLICATION_WORKERS", "2"))  # Copias pedidas por el NameNode en paralelo
+REPLICATION_BYTES_PER_SEC = int(os.getenv("REPLICATION_BYTES_PER_SEC", str(10 * 1024 * 1024)))  # Ancho de banda para esas copias
+CORRUPT_DIR = "corrupt"  # Subdirectorio de FILES_DIR donde se apartan los bloques corruptos
+DATANODE_WORKERS = int(os.getenv("DATANODE_WORKERS", "1"))  # Procesos que atienden RPCs en el mismo puerto
+WORKER_STATS_INTERVAL = 1  # Segundos entre envíos de métricas de cada worker al proceso principal
+LOCKS_DIR = ".locks"  # Subdirectorio de FILES_DIR con los locks de bloque compartidos entre procesos
+LOCK_STRIPES = 256  # Archivos de lock; dos bloques sólo se esperan si caen en el mismo
+BLOCK_CODEC = os.getenv("BLOCK_CODEC", "")  # Códec para guardar los bloques cuando la subida no pide uno
+BLOCK_CACHE_BYTES = int(os.getenv("BLOCK_CACHE_BYTES", str(256 * 1024 * 1024)))  # Memoria para bloques calientes; 0 la desactiva
+
+REPLICATION_FACTOR = 2
+THROUGHPUT_SMOOTHING = 0.3  # Peso de la última medida en la media móvil de E/S
+
+# Lista de DataNodes para replicación; sólo se usa si el NameNode no puede asignar destinos
+datanodes = []  # DataNodes donde replicar si el NameNode no asigna destinos (--datanodes)
+# Direcciones del NameNode y de este DataNode, se fijan al arrancar el servidor
+namenode_address = None
+datanode_address = None
+# Identifica este arranque ante el NameNode: así distingue un reinicio de un falso "muerto"
+INCARNATION = time.time_ns()
 
-# Lista de DataNodes para replicación
-datanodes = ['127.0.0.1:50052', '127.0.0.1:50053', '127.0.0.1:50054']  # Modifica según los DataNodes disponibles
+# Con varios workers todos escuchan en el mismo puerto y el kernel reparte las conexiones
+SERVER_OPTIONS = grpc_pool.SERVER_OPTIONS + [('grpc.so_reuseport', 1)]
+
+META_SUFFIX = ".meta"  # Metadatos de cada bloque (archivo, índice, tamaño, checksum)
+BLOCK_NAME_PATTERN = re.compile(r"^(.*)_block_(\d+)$")
 
 def listFiles():
     """Lista los archivos almacenados en el directorio local 'files/'"""
     if not exists(FILES_DIR):
         makedirs(FILES_DIR)
-    files = [f for f in listdir(FILES_DIR) if isfile(join(FILES_DIR, f))]
+    # Los nombres que empiezan con "." son bloques a medio recibir
+    files = [f for f in listdir(FILES_DIR)
+             if isfile(join(FILES_DIR, f)) and not f.endswith(META_SUFFIX) and not f.startswith(".")]
     return files
 
-def distribute_block_to_datanodes(block_data, block_name, file_name):
+def read_chunks(file_path, chunk_size=None, use_mmap=None, offset=0, length=0):
+    """
+    Genera el contenido de un archivo (o de 'length' bytes desde 'offset'; 0 = hasta
+    el final) en partes de chunk_size bytes.
+    Con readinto se reutiliza un único buffer; con mmap las partes se copian
+    directamente desde la caché de páginas sin llamadas a read().
+    En ambos casos queda una sola copia por parte: la que exige el mensaje protobuf.
+    """
+    chunk_size = chunk_size or DOWNLOAD_CHUNK_SIZE
+    use_mmap = DOWNLOAD_USE_MMAP if use_mmap is None else use_mmap
+    with open(file_path, 'rb') as file:
+        file_size = os.fstat(file.fileno()).st_size
+        end = min(offset + length, file_size) if length > 0 else file_size
+        if offset >= end:
+            return
+
+        if use_mmap:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                for position in range(offset, end, chunk_size):
+                    yield mapped[position:min(position + chunk_size, end)]
+            return
+
+        file.seek(offset)
+        remaining = end - offset
+        buffer = bytearray(chunk_size)
+        view = memoryview(buffer)
+        while remaining > 0:
+            read = file.readinto(view[:min(chunk_size, remaining)])
+            if not read:
+                return
+            remaining -= read
+            yield bytes(view[:read])
+
+def read_verified_chunks(file_path, block_checksums, bytes_per_checksum, offset=0, length=0, use_mmap=None):
+    """
+    Como read_chunks, pero verifica cada parte contra sus CRC32C antes de entregarla y
+    lanza ChecksumError si no coincide. La lectura se amplía a los límites de las partes
+    con checksum y después se recorta al rango pedido. Sin checksums no verifica nada.
+    """
+    if not block_checksums:
+        yield from read_chunks(file_path, use_mmap=use_mmap, offset=offset, length=length)
+        return
+
+    file_size = os.path.getsize(file_path)
+    if len(block_checksums) != -(-file_size // bytes_per_checksum):
+        raise checksums.ChecksumError(len(block_checksums))  # El archivo se truncó o creció
+    end = min(offset + length, file_size) if length > 0 else file_size
+    if offset >= end:
+        return
+
+    start = offset - offset % bytes_per_checksum
+    aligned_end = min(end + (-end) % bytes_per_checksum, file_size)
+    chunk_size = max(bytes_per_checksum, DOWNLOAD_CHUNK_SIZE - DOWNLOAD_CHUNK_SIZE % bytes_per_checksum)
+    position = start
+    for data in read_chunks(file_path, chunk_size, use_mmap, offset=start, length=aligned_end - start):
+        checksums.verify_chunks(data, position, block_checksums, bytes_per_checksum)
+        first = max(offset - position, 0)
+        last = min(end - position, len(data))
+        yield data if first == 0 and last == len(data) else data[first:last]
+        position += len(data)
+
+def load_block(block_name, file_path):
+    """Lee y verifica un bloque completo tal como está guardado; devuelve (códec, datos) para block_cache."""
+    meta = read_block_meta(block_name)
+    data = b"".join(read_verified_chunks(file_path, meta.get('checksums'), meta.get('bytes_per_checksum', 0)))
+    return meta.get('codec', ""), data
+
+def cached_chunks(data, offset=0, length=0):
+    """Como read_chunks, pero sobre un bloque que ya está en memoria."""
+    end = min(offset + length, len(data)) if length > 0 else len(data)
+    view = memoryview(data)
+    for position in range(offset, end, DOWNLOAD_CHUNK_SIZE):
+        yield bytes(view[position:min(position + DOWNLOAD_CHUNK_SIZE, end)])
+
+def open_block(block_name, file_path, offset=0, length=0, accept_codecs=(), use_mmap=None):
+    """
+    Prepara lo que envía DownloadFile como (códec, partes, está en memoria). Un bloque
+    comprimido se envía tal cual si se pide entero y el cliente acepta su códec; si no,
+    se descomprime aquí y se envía el rango pedido. Los bloques sin comprimir que no
+    están en block_cache se leen del disco a medida que se envían.
+    """
+    block = block_cache.get(block_name, file_path)
+    if block is None:
+        meta = read_block_meta(block_name)
+        if not meta.get('codec'):
+            chunks = read_verified_chunks(file_path, meta.get('checksums'), meta.get('bytes_per_checksum', 0),
+                                          offset=offset, length=length, use_mmap=use_mmap)
+            return "", chunks, False
+        block = load_block(block_name, file_path)
+    codec, data = block
+    if codec and codec in accept_codecs and not offset and not length:
+        return codec, cached_chunks(data), True
+    return "", cached_chunks(compression.decompress(codec, data), offset, length), True
+
+# Bloques calientes en memoria, tal como están guardados (comprimidos o no); cada worker tiene la suya
+block_cache = BlockCache(BLOCK_CACHE_BYTES, load_block, weigh=lambda block: len(block[1]))
+
+def write_block_meta(block_name, file_name, index, size, checksum, block_checksums=None,
+                     bytes_per_checksum=checksums.BYTES_PER_CHECKSUM, codec="", stored_size=0):
+    """
+    Guarda junto al bloque sus metadatos para poder reportarlos al NameNode y devuelve su BlockInfo.
+    size y checksum son los del contenido sin comprimir; los CRC32C, los de los bytes guardados.
+    """
+    meta = {'fileName': file_name, 'index': index, 'size': size, 'checksum': checksum}
+    if block_checksums is not None:
+        meta['bytes_per_checksum'] = bytes_per_checksum
+        meta['checksums'] = list(block_checksums)
+    if codec:
+        meta['codec'] = codec
+        meta['stored_size'] = stored_size
+    with open(join(FILES_DIR, block_name + META_SUFFIX), 'w') as meta_file:
+        json.dump(meta, meta_file)
+    return dfs_pb2.BlockInfo(fileName=file_name, blockName=block_name, index=index, size=size, checksum=checksum)
+
+def read_block_info(block_name):
+    """
+    Construye el BlockInfo de un bloque almacenado. Los archivos sin metadatos
+    (guardados enteros, como los de ejemplo) se reportan como un único bloque.
+    """
+    try:
+        with open(join(FILES_DIR, block_name + META_SUFFIX)) as meta_file:
+            meta = json.load(meta_file)
+    except (OSError, ValueError):
+        match = BLOCK_NAME_PATTERN.match(block_name)
+        meta = {
+            'fileName': match.group(1) if match else block_name,
+            'index': int(match.group(2)) if match else 0,
+            'size': os.path.getsize(join(FILES_DIR, block_name)),
+            'checksum': ""
+        }
+    return dfs_pb2.BlockInfo(
+        fileName=meta['fileName'],
+        blockName=block_name,
+        index=meta['index'],
+        size=meta['size'],
+        checksum=meta['checksum']
+    )
+
+def read_block_meta(block_name):
+    """Metadatos guardados junto al bloque; {} si no tiene."""
+    try:
+        with open(join(FILES_DIR, block_name + META_SUFFIX)) as meta_file:
+            return json.load(meta_file)
+    except (OSError, ValueError):
+        return {}
+
+def read_block_checksums(block_name):
+    """CRC32C por partes guardados para el bloque, como (lista, bytes_per_checksum); (None, 0) si no hay."""
+    meta = read_block_meta(block_name)
+    if 'checksums' not in meta:
+        return None, 0
+    return meta['checksums'], meta['bytes_per_checksum']
+
+_stripe_locks = [Lock() for _ in range(LOCK_STRIPES)]
+
+@contextmanager
+def block_lock(block_name):
+    """
+    Lock exclusivo sobre un bloque mientras se escriben, mueven o borran sus archivos.
+    Vale entre hilos y entre los workers que comparten FILES_DIR (flock). Los bloques se
+    reparten en LOCK_STRIPES archivos para no dejar un archivo de lock por bloque.
+    """
+    stripe = zlib.crc32(block_name.encode()) % LOCK_STRIPES
+    with _stripe_locks[stripe]:
+        if fcntl is None:
+            yield
+            return
+        lock_dir = join(FILES_DIR, LOCKS_DIR)
+        makedirs(lock_dir, exist_ok=True)
+        with open(join(lock_dir, str(stripe)), 'a') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def quarantine_block(block_name):
+    """
+    Aparta un bloque corrupto (y sus metadatos) a FILES_DIR/corrupt para que no se vuelva a
+    servir ni a reportar, y avisa al NameNode para que las lecturas usen otra réplica.
+    """
+    with block_lock(block_name):
+        block_path = join(FILES_DIR, block_name)
+        if not exists(block_path):
+            return  # Otro hilo o worker ya lo apartó
+        corrupt_dir = join(FILES_DIR, CORRUPT_DIR)
+        makedirs(corrupt_dir, exist_ok=True)
+        os.replace(block_path, join(corrupt_dir, block_name))
+        if exists(block_path + META_SUFFIX):
+            os.replace(block_path + META_SUFFIX, join(corrupt_dir, block_name + META_SUFFIX))
+        block_cache.invalidate(block_name)
+        block_tracker.block_removed(block_name)
+    print(f"Bloque {block_name} corrupto, apartado en {corrupt_dir}")
+    report_bad_blocks([block_name])
+
+def report_bad_blocks(block_names):
+    """Avisa al NameNode de réplicas corruptas; si falla, el próximo heartbeat las reporta como borradas."""
+    if not namenode_address:
+        return
+    try:
+        grpc_pool.get_stub(namenode_address).ReportBadBlock(
+            dfs_pb2.BadBlockRequest(datanode=datanode_address, blockNames=block_names))
+        grpc_pool.report_success(namenode_address)
+    except grpc.RpcError as e:
+        grpc_pool.report_failure(namenode_address, e)
+        print(f"Error al reportar bloques corruptos al NameNode: {e.code()}")
+
+def blockReport():
+    """Reporte completo de los bloques de este DataNode para el NameNode."""
+    return [read_block_info(name) for name in listFiles()]
+
+class TransferStats:
+    """
+    Cuenta las transferencias en curso y los bytes leídos o escritos, para enviar
+    en cada heartbeat las métricas que usa el NameNode al colocar bloques.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.inflight = 0
+        self.bytes = 0
+        self.last_sample = time.time()
+        self.throughput = 0.0
+        self.worker_inflight = {}  # pid de cada worker -> transferencias en curso
+
+    @contextmanager
+    def track(self):
+        with self.lock:
+            self.inflight += 1
+        try:
+            yield self
+        finally:
+            with self.lock:
+                self.inflight -= 1
+
+    def add_bytes(self, count):
+        with self.lock:
+            self.bytes += count
+
+    def take(self):
+        """(transferencias en curso, bytes desde la última llamada); así informa cada worker al principal."""
+        with self.lock:
+            count, self.bytes = self.bytes, 0
+            return self.inflight, count
+
+    def merge(self, worker, inflight, count):
+        """Suma lo que informó un worker a las métricas del proceso principal."""
+        with self.lock:
+            self.worker_inflight[worker] = inflight
+            self.bytes += count
+
+    def snapshot(self):
+        """Devuelve el NodeMetrics actual y reinicia el contador de bytes."""
+        now = time.time()
+        with self.lock:
+            elapsed = max(now - self.last_sample, 1e-3)
+            rate = self.bytes / elapsed
+            self.throughput = THROUGHPUT_SMOOTHING * rate + (1 - THROUGHPUT_SMOOTHING) * self.throughput
+            self.bytes = 0
+            self.last_sample = now
+            inflight = self.inflight + sum(self.worker_inflight.values())
+        if not exists(FILES_DIR):
+            makedirs(FILES_DIR)
+        usage = shutil.disk_usage(FILES_DIR)
+        return dfs_pb2.NodeMetrics(capacity=usage.total, free_space=usage.free,
+                                   inflight_transfers=inflight, throughput_bps=self.throughput)
+
+transfer_stats = TransferStats()
+
+class BlockReportTracker:
+    """
+    Mantiene en memoria los bloques de este DataNode y los cambios aún no confirmados
+    por el NameNode, para que cada heartbeat lleve sólo lo añadido o borrado.
+    El directorio se recorre una única vez al arrancar; cada FULL_REPORT_INTERVAL
+    (o cuando el NameNode lo pide) se envía un reporte completo para reconciliar.
+    En un worker no se guarda nada: los cambios se reenvían al proceso principal, que
+    es el único que habla con el NameNode, así que éste sigue viendo un solo DataNode.
+    """
+    def __init__(self):
+        self.lock = Lock()
+        self.events = None    # Cola hacia el proceso principal, sólo en los workers
+        self.blocks = {}      # blockName -> BlockInfo
+        self.added = {}       # Cambios pendientes de confirmar
+        self.removed = set()
+        self.seq = 0
+        self.sent = None      # (seq, es_completo, añadidos, borrados) del último reporte enviado
+        self.full_needed = True
+        self.last_full = 0
+
+    def load(self):
+        with self.lock:
+            self.blocks = {info.blockName: info for info in blockReport()}
+            self.full_needed = True
+
+    def forward_to(self, events):
+        self.events = events
+
+    def block_added(self, info):
+        if self.events is not None:
+            self.events.put(('added', info))
+            return
+        with self.lock:
+            self.blocks[info.blockName] = info
+            self.added[info.blockName] = info
+            self.removed.discard(info.blockName)
+
+    def block_removed(self, block_name):
+        if self.events is not None:
+            self.events.put(('removed', block_name))
+            return
+        with self.lock:
+            self.blocks.pop(block_name, None)
+            self.added.pop(block_name, None)
+            self.removed.add(block_name)
+
+    def block_names(self):
+        with self.lock:
+            return list(self.blocks)
+
+    def next_report(self, datanode):
+        """Construye el NameNodeRequest del próximo heartbeat."""
+        with self.lock:
+            self.seq += 1
+            full = self.full_needed or time.time() - self.last_full >= FULL_REPORT_INTERVAL
+            added = dict(self.added)
+            removed = set(self.removed)
+            self.sent = (self.seq, full, added, removed)
+            if full:
+                return dfs_pb2.NameNodeRequest(conn=datanode, blocks=list(self.blocks.values()),
+                                               full_report=True, report_seq=self.seq,
+                                               metrics=transfer_stats.snapshot(), incarnation=INCARNATION)
+            return dfs_pb2.NameNodeRequest(conn=datanode, blocks=list(added.values()),
+                                           removed=sorted(removed), report_seq=self.seq,
+                                           metrics=transfer_stats.snapshot(), incarnation=INCARNATION)
+
+    def acknowledge(self, response):
+        """Descarta los cambios que el NameNode confirmó; si falló, se reenvían en el siguiente."""
+        with self.lock:
+            if response.full_report_needed:
+                self.full_needed = True
+                return
+            if self.sent is None or response.ack_seq != self.sent[0]:
+                return
+            _, full, added, removed = self.sent
+            for name, info in added.items():
+                if self.added.get(name) is info:
+                    del self.added[name]
+            for name in removed:
+                if name not in self.added:
+                    self.removed.discard(name)
+            if full:
+                self.full_needed = False
+                self.last_full = time.time()
+
+block_tracker = BlockReportTracker()
+
+class Throttler:
+    """Limita a bytes_per_sec la E/S de quienes lo compartan, repartiendo el ritmo entre hilos."""
+    def __init__(self, bytes_per_sec):
+        self.bytes_per_sec = bytes_per_sec
+        self.lock = Lock()
+        self.next_free = time.time()
+
+    def consume(self, count):
+        if self.bytes_per_sec <= 0:
+            return
+        with self.lock:
+            now = time.time()
+            self.next_free = max(self.next_free, now) + count / self.bytes_per_sec
+            delay = self.next_free - now
+        if delay > 0:
+            time.sleep(delay)
+
+replication_throttle = Throttler(REPLICATION_BYTES_PER_SEC)
+
+class BlockScrubber:
+    """
+    Recorre en segundo plano todos los bloques del nodo verificando sus CRC32C, para
+    encontrar la corrupción antes de que la encuentre un cliente. Lee como mucho
+    SCRUB_BYTES_PER_SEC para no competir con las transferencias y hace una pasada
+    completa cada SCRUB_INTERVAL segundos. Los bloques corruptos se apartan y se reportan.
+    """
+    def __init__(self, bytes_per_sec=None, interval=None):
+        self.throttle = Throttler(SCRUB_BYTES_PER_SEC if bytes_per_sec is None else bytes_per_sec)
+        self.interval = interval or SCRUB_INTERVAL
+        self.scanned_blocks = 0
+        self.corrupt_blocks = 0
+
+    def scan_block(self, block_name):
+        """Verifica un bloque; devuelve False si estaba corrupto."""
+        block_checksums, bytes_per_checksum = read_block_checksums(block_name)
+        file_path = join(FILES_DIR, block_name)
+        if not block_checksums or not exists(file_path):
+            return True
+        try:
+            for data in read_verified_chunks(file_path, block_checksums, bytes_per_checksum):
+                self.throttle.consume(len(data))
+        except checksums.ChecksumError:
+            self.corrupt_blocks += 1
+            quarantine_block(block_name)
+            return False
+        except OSError:
+            return True  # El bloque se borró mientras se leía
+        finally:
+            self.scanned_blocks += 1
+        return True
+
+    def run(self):
+        while True:
+            time.sleep(self.interval)
+            started = time.time()
+            corrupt = sum(1 for name in block_tracker.block_names() if not self.scan_block(name))
+            print(f"Scrubber: pasada completa en {time.time() - started:.1f}s, {corrupt} bloques corruptos")
+
+def store_block(block_data, block_name, codec="", compressed=None):
+    """
+    Guarda un bloque direccionado por contenido (block_name es su SHA-256) salvo que
+    el clúster ya tenga una réplica, en cuyo caso no se transfiere nada. Con un códec
+    el bloque viaja y se guarda comprimido; 'compressed' evita comprimirlo de nuevo si
+    ya llegó así del cliente. Devuelve los DataNodes donde se guardó ([] si no hizo
+    falta enviarlo) o None si falló.
+    """
+    if block_stored(block_name):
+        print(f"Bloque {block_name} ya almacenado en el clúster, no se envía")
+        return []
+    codec, payload = compression.compress_block(codec, block_data, compressed)
+    return distribute_block_to_datanodes(payload, block_name, "", codec=codec, raw_size=len(block_data))
+
+def block_stored(block_hash):
+    """Pregunta al NameNode si ya existe el bloque; si no responde se asume que no."""
+    if not namenode_address:
+        return False
+    try:
+        response = grpc_pool.get_stub(namenode_address).HasBlocks(dfs_pb2.HasBlocksRequest(hashes=[block_hash]))
+        grpc_pool.report_success(namenode_address)
+        return block_hash in response.present
+    except grpc.RpcError as e:
+        grpc_pool.report_failure(namenode_address, e)
+        return False
+
+def commit_file(file_name, refs):
+    """Fija en el NameNode la lista de bloques (hashes) del archivo recién subido."""
+    request = dfs_pb2.CommitFileRequest(fileName=file_name, blocks=refs, uploaded=True)
+    response = grpc_pool.get_stub(namenode_address).CommitFile(request)
+    grpc_pool.report_success(namenode_address)
+    return response.status == 200
+
+def commit_files(files):
+    """Fija en el NameNode un lote de archivos [(nombre, [BlockRef])]; devuelve los que rechazó."""
+    request = dfs_pb2.CommitFilesRequest(files=[dfs_pb2.CommitFileRequest(fileName=name, blocks=refs, uploaded=True)
+                                                for name, refs in files])
+    response = grpc_pool.get_stub(namenode_address).CommitFiles(request)
+    grpc_pool.report_success(namenode_address)
+    return [name for (name, _), result in zip(files, response.results) if result.status != 200]
+
+def delete_block(block_name):
+    """Borra un bloque que ningún archivo usa o una réplica que sobra, por orden del NameNode."""
+    block_path = join(FILES_DIR, block_name)
+    with block_lock(block_name):
+        for path in (block_path, block_path + META_SUFFIX):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        block_cache.invalidate(block_name)
+        block_tracker.block_removed(block_name)
+    print(f"Bloque {block_name} borrado por orden del NameNode")
+
+def distribute_block_to_datanodes(block_data, block_name, file_name, index=0, codec="", raw_size=0):
     """
     Distribuye un bloque de archivo a dos DataNodes: uno como líder y otro como seguidor.
+    El bloque se envía sólo al líder, que lo reenvía al seguidor mientras lo recibe.
+    Devuelve los DataNodes donde quedó, o None si alguna réplica no se guardó.
     """
-    leader_node, follower_node = choose_datanodes(datanodes)
+    targets = choose_datanodes(datanodes, block_name, file_name, len(block_data))
+    leader_node, followers = targets[0], targets[1:]
 
-    # Enviar el bloque al líder
-    send_block_to_datanode(leader_node, block_data, block_name, file_name, is_leader=True)
+    # Enviar el bloque al líder; él se encarga de replicarlo en los seguidores
+    with distribution_engine.reserve(targets):
+        if send_block_to_datanode(leader_node, block_data, block_name, file_name, is_leader=True,
+                                  followers=followers, index=index, codec=codec, raw_size=raw_size):
+            return targets
+    return None
 
-    # Enviar el bloque al seguidor
-    send_block_to_datanode(follower_node, block_data, block_name, file_name, is_leader=False)
+# Contador para repartir los bloques entre todos los DataNodes en lugar de usar siempre los dos primeros
+_placement_counter = itertools.count()
 
-def choose_datanodes(datanodes):
+def choose_datanodes(datanodes, block_name="", file_name="", size=0):
     """
-    Elige dos DataNodes de la lista para almacenar un bloque.
+    Pide al NameNode los DataNodes donde guardar un bloque. Si no responde, elige
+    de la lista local rotando el punto de inicio en cada llamada.
     """
-    # Simplemente devuelve los dos primeros DataNodes de la lista para este ejemplo.
-    return datanodes[0], datanodes[1]
+    if namenode_address:
+        try:
+            request = dfs_pb2.AllocateBlockRequest(fileName=file_name, blockName=block_name,
+                                                   size=size, replication=REPLICATION_FACTOR)
+            response = grpc_pool.get_stub(namenode_address).AllocateBlock(request)
+            grpc_pool.report_success(namenode_address)
+            if response.status == 200 and len(response.conns) >= REPLICATION_FACTOR:
+                return list(response.conns)
+            print(f"El NameNode no pudo asignar destinos para {block_name}: status {response.status}")
+        except grpc.RpcError as e:
+            grpc_pool.report_failure(namenode_address, e)
+            print(f"Error al pedir destinos al NameNode: {e.code()}")
+
+    if not datanodes:
+        raise RuntimeError(f"No hay DataNodes para guardar {block_name}: el NameNode no respondió y --datanodes está vacío")
+    start = next(_placement_counter) % len(datanodes)
+    return [datanodes[(start + i) % len(datanodes)] for i in range(REPLICATION_FACTOR)]
+
+def iter_block_chunks(header, block_data, chunk_size=STREAM_CHUNK_SIZE, throttle=None):
+    """Genera los mensajes de UploadBlockStream: la cabecera y luego el bloque en partes."""
+    yield dfs_pb2.UploadBlockChunk(header=header)
+    view = memoryview(block_data)
+    for offset in range(0, len(view), chunk_size):
+        if throttle is not None:
+            throttle.consume(min(chunk_size, len(view) - offset))
+        yield dfs_pb2.UploadBlockChunk(chunk_data=bytes(view[offset:offset + chunk_size]))
 
-def send_block_to_datanode(datanode_address, block_data, block_name, file_name, is_leader):
+def send_block_to_datanode(datanode_address, block_data, block_name, file_name, is_leader, followers=(), index=0,
+                           throttle=None, codec="", raw_size=0):
     """
-    Envía un bloque a un DataNode utilizando gRPC.
+    Envía un bloque a un DataNode utilizando gRPC, en partes de STREAM_CHUNK_SIZE.
+    Si se indican seguidores, el DataNode los alimenta en pipeline mientras recibe.
+    Con un Throttler el envío no supera su ancho de banda. Con un códec, block_data ya
+    está comprimido y raw_size es su tamaño original.
     """
     try:
-        # Convertir el bytearray a bytes antes de enviar
-        block_data = bytes(block_data)
-
-        # Crear un canal gRPC con el DataNode
-        with grpc.insecure_channel(datanode_address) as channel:
-            stub = dfs_pb2_grpc.dfsStub(channel)
-            
-            # Crear la solicitud
-            request = dfs_pb2.UploadBlockRequest(
-                fileName=file_name,
-                blockName=block_name,
-                chunk_data=block_data,  # Asegurarse de que sea tipo bytes
-                is_leader=is_leader
-            )
+        # Reutilizar el canal gRPC compartido con el DataNode
+        stub = grpc_pool.get_stub(datanode_address)
+
+        header = dfs_pb2.UploadBlockHeader(
+            fileName=file_name,
+            blockName=block_name,
+            is_leader=is_leader,
+            followers=followers,
+            index=index,
+            checksums=checksums.chunk_checksums(block_data),
+            bytes_per_checksum=checksums.BYTES_PER_CHECKSUM,
+            codec=codec,
+            raw_size=raw_size or len(block_data)
+        )
+
+        # Enviar el bloque
+        response = stub.UploadBlockStream(iter_block_chunks(header, block_data, throttle=throttle))
+        grpc_pool.report_success(datanode_address)
+
+        if response.status == 200:
+            print(f"Bloque {block_name} enviado con éxito a {datanode_address} (Líder: {is_leader})")
+            return True
+        print(f"Error al enviar el bloque {block_name} a {datanode_address}: status {response.status}")
 
-            # Enviar el bloque
-            response = stub.UploadBlock(request)
-            
-            if response.status == 200:
-                print(f"Bloque {block_name} enviado con éxito a {datanode_address} (Líder: {is_leader})")
-            else:
-                print(f"Error al enviar el bloque {block_name} a {datanode_address}: status {response.status}")
-    
     except Exception as e:
+        grpc_pool.report_failure(datanode_address, e)
         print(f"Error al enviar el bloque a {datanode_address}: {e}")
+    return False
+
+def replicate_block(block_name, targets):
+    """
+    Copia un bloque local a otros DataNodes por orden del NameNode (re-replicación).
+    El bloque se verifica antes de enviarlo para no propagar una réplica corrupta y
+    viaja tal como está guardado: uno comprimido no se vuelve a comprimir.
+    """
+    file_path = join(FILES_DIR, block_name)
+    meta = read_block_meta(block_name)
+    try:
+        with transfer_stats.track():
+            block_data = b"".join(read_verified_chunks(file_path, meta.get('checksums'),
+                                                       meta.get('bytes_per_checksum', 0)))
+            info = read_block_info(block_name)
+            return send_block_to_datanode(targets[0], block_data, block_name, info.fileName, is_leader=False,
+                                          followers=targets[1:], index=info.index, throttle=replication_throttle,
+                                          codec=meta.get('codec', ""), raw_size=info.size)
+    except checksums.ChecksumError:
+        quarantine_block(block_name)
+    except OSError as e:
+        print(f"No se pudo leer el bloque {block_name} para replicarlo: {e}")
+    return False
+
+replication_executor = futures.ThreadPoolExecutor(max_workers=REPLICATION_WORKERS, thread_name_prefix="block-replicator")
+
+class BlockForwarder:
+    """
+    Reenvía al siguiente DataNode del pipeline las partes de un bloque a medida que llegan.
+    La llamada saliente corre en segundo plano (future) y se alimenta desde una cola acotada.
+    """
+    def __init__(self, address, header):
+        self.address = address
+        self.queue = queue.Queue(maxsize=FORWARD_QUEUE_CHUNKS)
+        stub = grpc_pool.get_stub(address)
+        self.future = stub.UploadBlockStream.future(self._requests(header))
+
+    def _requests(self, header):
+        yield dfs_pb2.UploadBlockChunk(header=header)
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                return
+            yield dfs_pb2.UploadBlockChunk(chunk_data=chunk)
+
+    def _put(self, item):
+        # Si el nodo siguiente falla la llamada termina y nadie consume la cola
+        while not self.future.done():
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def send(self, chunk):
+        """Encola una parte para el siguiente nodo; devuelve False si el reenvío ya falló."""
+        return self._put(chunk)
+
+    def close(self):
+        """Cierra el stream y devuelve True si el siguiente nodo guardó el bloque."""
+        try:
+            self._put(None)
+            status = self.future.result().status
+            grpc_pool.report_success(self.address)
+            return status == 200
+        except grpc.RpcError as e:
+            grpc_pool.report_failure(self.address, e)
+            print(f"Error al reenviar el bloque a {self.address}: {e}")
+            return False
+
+class DistributionEngine:
+    """
+    Pool de hilos compartido por todas las subidas para enviar bloques en paralelo.
+    Además del tamaño del pool, limita cuántos envíos simultáneos recibe cada DataNode
+    para que un nodo lento no acapare todos los hilos.
+    """
+    def __init__(self, max_workers=None, per_node_limit=None):
+        self.executor = futures.ThreadPoolExecutor(max_workers=max_workers or DISTRIBUTION_WORKERS,
+                                                   thread_name_prefix="block-sender")
+        self.per_node_limit = per_node_limit or MAX_STREAMS_PER_DATANODE
+        self.node_limits = {}
+        self.lock = Lock()
+
+    def submit(self, block_data, block_name, codec="", compressed=None):
+        return self.executor.submit(store_block, block_data, block_name, codec, compressed)
+
+    def _limit(self, address):
+        with self.lock:
+            if address not in self.node_limits:
+                self.node_limits[address] = BoundedSemaphore(self.per_node_limit)
+            return self.node_limits[address]
+
+    def reserve(self, addresses):
+        """Reserva un envío en cada DataNode del pipeline; usar con 'with'."""
+        return _NodeReservation([self._limit(address) for address in sorted(set(addresses))])
+
+class _NodeReservation:
+    # Los semáforos se toman siempre en el mismo orden (direcciones ordenadas) para evitar bloqueos mutuos
+    def __init__(self, semaphores):
+        self.semaphores = semaphores
+
+    def __enter__(self):
+        for semaphore in self.semaphores:
+            semaphore.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        for semaphore in reversed(self.semaphores):
+            semaphore.release()
+        return False
+
+distribution_engine = DistributionEngine()
+
+class BlockPipeline:
+    """
+    Envía los bloques de un archivo a los DataNodes a medida que se van cortando.
+    Los bloques se despachan en paralelo al DistributionEngine, pero como mucho
+    MAX_INFLIGHT_BLOCKS a la vez por subida: si se alcanza el límite, submit() se
+    bloquea y eso frena la lectura del stream gRPC (backpressure).
+    Cada bloque se nombra con el SHA-256 de su contenido; los repetidos dentro del
+    archivo se envían una sola vez y 'refs' guarda el manifiesto para CommitFile, con
+    los DataNodes donde quedó cada bloque enviado ('stored') para que el NameNode los
+    registre sin esperar a sus heartbeats.
+    Con un códec los bloques se comprimen en los hilos del DistributionEngine.
+    """
+    def __init__(self, file_name, codec="", max_inflight=None, engine=None):
+        self.file_name = file_name
+        self.codec = codec
+        self.engine = engine or distribution_engine
+        self.slots = BoundedSemaphore(max(1, max_inflight or MAX_INFLIGHT_BLOCKS))
+        self.pending = []
+        self.refs = []
+        self.seen = set()
+        self.stored = {}  # hash -> DataNodes donde se guardó
+
+    def submit(self, block_data, compressed=None):
+        """Despacha un bloque completo; se bloquea si se alcanzó el límite de bloques en vuelo."""
+        block_name = hashlib.sha256(block_data).hexdigest()
+        self.refs.append(dfs_pb2.BlockRef(hash=block_name, size=len(block_data)))
+        if block_name in self.seen:
+            return
+        self.seen.add(block_name)
+        self.slots.acquire()
+        future = self.engine.submit(block_data, block_name, self.codec, compressed)
+        future.add_done_callback(lambda _: self.slots.release())
+        self.pending.append((block_name, future))
+
+    def close(self):
+        """Espera a que terminen todos los envíos y devuelve cuántos bloques fallaron."""
+        failed = 0
+        for block_name, future in self.pending:
+            try:
+                targets = future.result()
+            except Exception as e:
+                print(f"Error al distribuir un bloque de {self.file_name}: {e}")
+                targets = None
+            if targets is None:
+                failed += 1
+            elif targets:
+                self.stored[block_name] = targets
+        for ref in self.refs:
+            ref.replicas.extend(self.stored.get(ref.hash, ()))
+        return failed
+
+class BlockPacker:
+    """
+    Junta los archivos pequeños de un UploadPacked en bloques contenedores de hasta
+    BLOCK_SIZE. Cada archivo se añade entero al contenedor abierto y, si no cabe, éste
+    se cierra y se envía por un BlockPipeline como cualquier bloque (nombre por SHA-256,
+    códec, backpressure). 'files' guarda el manifiesto de cada archivo para CommitFiles:
+    un BlockRef con el hash del contenedor, la posición del archivo y el tamaño del contenedor.
+    """
+    def __init__(self, codec="", block_size=BLOCK_SIZE):
+        self.block_size = block_size
+        self.pipeline = BlockPipeline("archivos empaquetados", codec)
+        self.container = bytearray()
+        self.packed = []  # (nombre, posición, tamaño) de los archivos del contenedor abierto
+        self.files = []
+
+    def add(self, file_name, data):
+        if len(data) > self.block_size:
+            raise ValueError(f"{file_name} does not fit in a container block ({len(data)} bytes)")
+        if not data:
+            self.files.append((file_name, []))
+            return
+        if len(self.container) + len(data) > self.block_size:
+            self.seal()
+        self.packed.append((file_name, len(self.container), len(data)))
+        self.container.extend(data)
+
+    def seal(self):
+        """Cierra el contenedor abierto y lo despacha."""
+        if not self.packed:
+            return
+        container = bytes(self.container)
+        self.pipeline.submit(container)
+        block_hash = self.pipeline.refs[-1].hash
+        for file_name, offset, size in self.packed:
+            self.files.append((file_name, [dfs_pb2.BlockRef(hash=block_hash, size=size, offset=offset,
+                                                            block_size=len(container))]))
+        self.container = bytearray()
+        self.packed = []
+
+    def close(self):
+        """Envía el último contenedor, espera todos los envíos y devuelve cuántos fallaron."""
+        self.seal()
+        failed = self.pipeline.close()
+        for _, refs in self.files:
+            for ref in refs:
+                ref.replicas.extend(self.pipeline.stored.get(ref.hash, ()))
+        return failed
 
 class Files(dfs_pb2_grpc.dfsServicer):
     def __init__(self, namenode, datanode):
@@ -94,18 +872,36 @@ class Files(dfs_pb2_grpc.dfsServicer):
         return response
 
     def DownloadFile(self, request, context):
+        """
+        Envía un bloque (o parte de él) verificando sus CRC32C mientras se lee. Si una parte
+        no coincide, el bloque se aparta y la llamada termina con DATA_LOSS para que el
+        cliente pase a otra réplica. Los bloques calientes se sirven desde block_cache y
+        los comprimidos viajan comprimidos si el cliente acepta su códec (ver open_block).
+        """
+        if request.offset < 0 or request.length < 0:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "offset and length must not be negative")
         file_path = os.path.join(FILES_DIR, request.fileName)
         if os.path.exists(file_path):
-            with open(file_path, 'rb') as file:
-                while True:
-                    chunk_data = file.read(1024) 
-                    if not chunk_data:
-                        break
-                    yield dfs_pb2.DownloadFileResponse(chunk_data=chunk_data)
+            with transfer_stats.track():
+                try:
+                    codec, chunks, _ = open_block(request.fileName, file_path, request.offset, request.length,
+                                                  request.accept_codecs)
+                    for chunk_data in chunks:
+                        transfer_stats.add_bytes(len(chunk_data))
+                        yield dfs_pb2.DownloadFileResponse(chunk_data=chunk_data, codec=codec)
+                except checksums.ChecksumError as e:
+                    quarantine_block(request.fileName)
+                    context.abort(grpc.StatusCode.DATA_LOSS, f"Block {request.fileName} is corrupt: {e}")
         else:
             context.set_code(grpc.StatusCode.NOT_FOUND)
             context.set_details('File not found')
 
+    def GetMetrics(self, request, context):
+        """Contadores del proceso que atiende la llamada: caché de bloques y transferencias en curso."""
+        metrics = block_cache.metrics()
+        metrics['transfers.inflight'] = transfer_stats.inflight
+        return dfs_pb2.MetricsResponse(metrics=metrics, status=200)
+
     def UploadBlock(self, request, context):
         """
         Recibe un bloque de archivo y lo almacena localmente en este DataNode.
@@ -120,77 +916,446 @@ class Files(dfs_pb2_grpc.dfsServicer):
                 makedirs(FILES_DIR)
 
             # Guardar el bloque en el directorio
-            with open(file_path, 'wb') as block_file:
-                block_file.write(request.chunk_data)
-            
+            with transfer_stats.track(), block_lock(block_name):
+                with open(file_path, 'wb') as block_file:
+                    block_file.write(request.chunk_data)
+                transfer_stats.add_bytes(len(request.chunk_data))
+                block_cache.invalidate(block_name)
+                match = BLOCK_NAME_PATTERN.match(block_name)
+                block_tracker.block_added(write_block_meta(
+                    block_name, request.fileName, int(match.group(2)) if match else 0,
+                    len(request.chunk_data), hashlib.sha256(request.chunk_data).hexdigest(),
+                    checksums.chunk_checksums(request.chunk_data)))
+
             print(f"Bloque {block_name} guardado correctamente en {self.datanode}")
             return dfs_pb2.UploadBlockResponse(status=200)
         except Exception as e:
             print(f"Error al guardar el bloque {block_name}: {e}")
             return dfs_pb2.UploadBlockResponse(status=500)
 
+    def UploadBlockStream(self, request_iterator, context):
+        """
+        Recibe un bloque por partes. Si la cabecera trae seguidores, cada parte se reenvía
+        al siguiente DataNode a la vez que se escribe en disco (pipeline de replicación).
+        El bloque se escribe en un archivo temporal y se renombra al terminar con el lock
+        del bloque, así dos subidas del mismo bloque (mismo hash), aunque lleguen a workers
+        distintos, no se pisan y sólo la primera lo guarda.
+        """
+        header = next(request_iterator).header
+        block_name = header.blockName
+        if not block_name:
+            context.abort(grpc.StatusCode.INVALID_ARGUMENT, "The first message must be the block header")
+        if header.codec and header.codec not in compression.available():
+            print(f"Bloque {block_name} comprimido con un códec desconocido ({header.codec}), rechazado")
+            return dfs_pb2.UploadBlockResponse(status=415)
+        file_path = os.path.join(FILES_DIR, block_name)
+        temp_path = os.path.join(FILES_DIR, f".{block_name}.{os.getpid()}.{get_ident()}")
+        print(f"Recibiendo bloque: {block_name} en {self.datanode} (Líder: {header.is_leader})")
+
+        forwarder = None
+        if header.followers:
+            downstream = dfs_pb2.UploadBlockHeader(
+                fileName=header.fileName,
+                blockName=block_name,
+                is_leader=False,
+                followers=header.followers[1:],
+                index=header.index,
+                checksums=header.checksums,
+                bytes_per_checksum=header.bytes_per_checksum,
+                codec=header.codec,
+                raw_size=header.raw_size
+            )
+            forwarder = BlockForwarder(header.followers[0], downstream)
+
+        forwarded = True
+        try:
+            if not exists(FILES_DIR):
+                makedirs(FILES_DIR)
+
+            digest = hashlib.sha256()
+            bytes_per_checksum = header.bytes_per_checksum or checksums.BYTES_PER_CHECKSUM
+            checksummer = checksums.ChunkChecksummer(bytes_per_checksum)
+            size = 0
+            with transfer_stats.track(), open(temp_path, 'wb') as block_file:
+                for request in request_iterator:
+                    if forwarder is not None and forwarded:
+                        forwarded = forwarder.send(request.chunk_data)
+                    block_file.write(request.chunk_data)
+                    transfer_stats.add_bytes(len(request.chunk_data))
+                    if not header.codec:
+                        digest.update(request.chunk_data)
+                    checksummer.update(request.chunk_data)
+                    size += len(request.chunk_data)
+            block_checksums = checksummer.finish()
+            raw_size = size
+            if header.codec:
+                # El nombre y el tamaño que ve el NameNode son los del contenido sin comprimir
+                with open(temp_path, 'rb') as block_file:
+                    raw = compression.decompress(header.codec, block_file.read())
+                digest.update(raw)
+                raw_size = len(raw)
+                raw = None
+            # Los checksums los calcula quien cortó el bloque: si no coinciden, se dañó por el camino.
+            # Un bloque direccionado por contenido además debe tener el hash que le da nombre.
+            if (header.checksums and list(header.checksums) != block_checksums) or \
+                    (not header.fileName and digest.hexdigest() != block_name):
+                os.remove(temp_path)
+                print(f"Bloque {block_name} recibido con checksums incorrectos, descartado")
+                return dfs_pb2.UploadBlockResponse(status=422)
+            with block_lock(block_name):
+                if not header.fileName and exists(file_path):
+                    os.remove(temp_path)  # Mismo contenido ya guardado por otra subida
+                else:
+                    info = write_block_meta(block_name, header.fileName, header.index, raw_size,
+                                            digest.hexdigest(), block_checksums, bytes_per_checksum,
+                                            header.codec, size)
+                    os.replace(temp_path, file_path)
+                    block_cache.invalidate(block_name)
+                    block_tracker.block_added(info)
+        except Exception as e:
+            if exists(temp_path):
+                os.remove(temp_path)
+            print(f"Error al guardar el bloque {block_name}: {e}")
+            return dfs_pb2.UploadBlockResponse(status=500)
+        finally:
+            if forwarder is not None:
+                forwarded = forwarder.close() and forwarded
+
+        print(f"Bloque {block_name} guardado correctamente en {self.datanode}")
+        if not forwarded:
+            print(f"Error al replicar el bloque {block_name} en {header.followers[0]}")
+            return dfs_pb2.UploadBlockResponse(status=502)
+        return dfs_pb2.UploadBlockResponse(status=200)
+
     def UploadFile(self, request_iterator, context):
-        data = bytearray()
+        """
+        Recibe un archivo en streaming y lo corta en bloques a medida que llegan los datos.
+        Cada bloque se envía a los DataNodes en cuanto se completa, así que la memoria
+        usada depende de MAX_INFLIGHT_BLOCKS y no del tamaño del archivo. Al final se fija
+        en el NameNode la lista de hashes del archivo (CommitFile).
+        Si el primer mensaje trae un códec, cada parte llega comprimida con él y los bloques
+        se guardan con ese códec; si no, se usa BLOCK_CODEC. Un códec que este DataNode no
+        conoce se rechaza con UNIMPLEMENTED para que el cliente suba sin comprimir.
+        """
         print("UPLOAD Request")
+        pipeline = None
+        wire_codec = ""
+        buffer = bytearray()
 
-        for request in request_iterator:
-            if request.fileName:
-                file_name = request.fileName
-                print(f"Uploading: {request.fileName}")
-                continue
-            data.extend(request.chunk_data)
+        try:
+            for request in request_iterator:
+                if request.fileName:
+                    print(f"Uploading: {request.fileName}")
+                    wire_codec = request.codec
+                    codec = request.codec or BLOCK_CODEC
+                    if codec and codec not in compression.available():
+                        context.abort(grpc.StatusCode.UNIMPLEMENTED, f"Unsupported codec {codec!r}")
+                    pipeline = BlockPipeline(request.fileName, codec)
+                    continue
+                if pipeline is None:
+                    context.abort(grpc.StatusCode.INVALID_ARGUMENT, "fileName must be sent before chunk_data")
+                if wire_codec:
+                    try:
+                        chunk_data = compression.decompress(wire_codec, request.chunk_data)
+                    except compression.CodecError as e:
+                        context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Bad compressed chunk: {e}")
+                    if not buffer and len(chunk_data) == BLOCK_SIZE:
+                        # La parte es justo un bloque y ya viene comprimida: no se comprime otra vez
+                        pipeline.submit(chunk_data, request.chunk_data)
+                        continue
+                    buffer.extend(chunk_data)
+                else:
+                    buffer.extend(request.chunk_data)
 
-        # Dividir el archivo en bloques
-        blocks = [data[i:i+BLOCK_SIZE] for i in range(0, len(data), BLOCK_SIZE)]
+                # Cortar y despachar todos los bloques completos recibidos hasta ahora
+                while len(buffer) >= BLOCK_SIZE:
+                    pipeline.submit(bytes(buffer[:BLOCK_SIZE]))
+                    del buffer[:BLOCK_SIZE]
 
-        # Guardar los bloques en DataNodes
-        for i, block in enumerate(blocks):
-            block_name = f"{file_name}_block_{i}"
-            # Aquí distribuyes cada bloque a los DataNodes
-            distribute_block_to_datanodes(block, block_name, file_name)
+            # El último bloque puede ser más pequeño que BLOCK_SIZE
+            if pipeline is not None and buffer:
+                pipeline.submit(bytes(buffer))
+        finally:
+            failed = pipeline.close() if pipeline is not None else 0
 
+        if failed:
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"{failed} block(s) could not be stored")
+        if pipeline is not None:
+            try:
+                if not commit_file(pipeline.file_name, pipeline.refs):
+                    context.abort(grpc.StatusCode.UNAVAILABLE, "The NameNode rejected the file")
+            except grpc.RpcError as e:
+                grpc_pool.report_failure(namenode_address, e)
+                context.abort(grpc.StatusCode.UNAVAILABLE, f"Could not commit the file: {e.code()}")
         return dfs_pb2.EmptyMessage()
 
+    def UploadPacked(self, request_iterator, context):
+        """
+        Recibe muchos archivos pequeños en un solo stream: cada uno empieza con un mensaje
+        con su fileName seguido de su contenido (como en UploadFile, comprimido si el primero
+        trae códec). Se empaquetan en bloques contenedores (BlockPacker) y al final todos se
+        fijan con un único CommitFiles, así el lote cuesta unos pocos bloques y un fsync.
+        """
+        packer = None
+        wire_codec = ""
+        current = None
+        buffer = bytearray()
+
+        try:
+            for request in request_iterator:
+                if request.fileName:
+                    if packer is None:
+                        wire_codec = request.codec
+                        codec = request.codec or BLOCK_CODEC
+                        if codec and codec not in compression.available():
+                            context.abort(grpc.StatusCode.UNIMPLEMENTED, f"Unsupported codec {codec!r}")
+                        packer = BlockPacker(codec)
+                    elif current is not None:
+                        packer.add(current, bytes(buffer))
+                        buffer.clear()
+                    current = request.fileName
+                    continue
+                if packer is None:
+                    context.abort(grpc.StatusCode.INVALID_ARGUMENT, "fileName must be sent before chunk_data")
+                try:
+                    buffer.extend(compression.decompress(wire_codec, request.chunk_data))
+                except compression.CodecError as e:
+                    context.abort(grpc.StatusCode.INVALID_ARGUMENT, f"Bad compressed chunk: {e}")
+                if len(buffer) > BLOCK_SIZE:
+                    context.abort(grpc.StatusCode.INVALID_ARGUMENT,
+                                  f"{current} is too large to be packed (limit {BLOCK_SIZE} bytes)")
+            if current is not None:
+                packer.add(current, bytes(buffer))
+        finally:
+            failed = packer.close() if packer is not None else 0
+
+        if failed:
+            context.abort(grpc.StatusCode.UNAVAILABLE, f"{failed} container block(s) could not be stored")
+        if packer is not None:
+            print(f"Packed {len(packer.files)} files into {len(packer.pipeline.refs)} container blocks")
+            try:
+                rejected = commit_files(packer.files)
+            except grpc.RpcError as e:
+                grpc_pool.report_failure(namenode_address, e)
+                context.abort(grpc.StatusCode.UNAVAILABLE, f"Could not commit the files: {e.code()}")
+            if rejected:
+                context.abort(grpc.StatusCode.UNAVAILABLE, f"The NameNode rejected {len(rejected)} file(s)")
+        return dfs_pb2.EmptyMessage()
+
+class AsyncFiles(Files):
+    """
+    Servicer para el modo grpc.aio. Las descargas son generadores asíncronos que leen
+    del disco en aio_server.io_executor, así que miles de descargas a la vez no ocupan
+    un hilo cada una. Las subidas siguen siendo síncronas y corren en el pool del servidor.
+    """
+    async def ListFiles(self, request, context):
+        return await aio_server.run_blocking(super().ListFiles, request, context)
+
+    async def DownloadFile(self, request, context):
+        if request.offset < 0 or request.length < 0:
+            await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "offset and length must not be negative")
+        file_path = os.path.join(FILES_DIR, request.fileName)
+        if not await aio_server.run_blocking(os.path.exists, file_path):
+            context.set_code(grpc.StatusCode.NOT_FOUND)
+            context.set_details('File not found')
+            return
+
+        with transfer_stats.track():
+            try:
+                # Con mmap una descarga que espera al cliente no retiene un buffer propio
+                codec, chunks, in_memory = await aio_server.run_blocking(
+                    open_block, request.fileName, file_path, request.offset, request.length,
+                    request.accept_codecs, True)
+                if in_memory:
+                    # Desde memoria no hay nada que esperar: se genera en el bucle, sin pasar por hilos
+                    for chunk_data in chunks:
+                        transfer_stats.add_bytes(len(chunk_data))
+                        yield dfs_pb2.DownloadFileResponse(chunk_data=chunk_data, codec=codec)
+                    return
+                async for chunk_data in aio_server.iterate_blocking(chunks):
+                    transfer_stats.add_bytes(len(chunk_data))
+                    yield dfs_pb2.DownloadFileResponse(chunk_data=chunk_data)
+            except checksums.ChecksumError as e:
+                await aio_server.run_blocking(quarantine_block, request.fileName)
+                await context.abort(grpc.StatusCode.DATA_LOSS, f"Block {request.fileName} is corrupt: {e}")
+
 def sendHeartbeat(namenode, datanode):
     """
     Envía un heartbeat periódico al NameNode para indicar que este DataNode sigue activo.
+    El primero sale un intervalo después del registro, para que el NameNode mida intervalos reales.
     """
-    with grpc.insecure_channel(namenode) as chan:
-        stub = dfs_pb2_grpc.dfsStub(chan)
-        while True:
-            try:
-                request = dfs_pb2.NameNodeRequest(conn=datanode, files=listFiles())
-                stub.NameNodeConnection(request)
-                print("Heartbeat sent")
-            except Exception as e:
-                print(f"Failed to send heartbeat: {e}")
-            time.sleep(HEARTBEAT_INTERVAL)
+    while True:
+        time.sleep(HEARTBEAT_INTERVAL)
+        try:
+            stub = grpc_pool.get_stub(namenode)
+            request = block_tracker.next_report(datanode)
+            response = stub.NameNodeConnection(request)
+            block_tracker.acknowledge(response)
+            for command in response.replicate:
+                print(f"Replicando {command.blockName} en {', '.join(command.targets)}")
+                replication_executor.submit(replicate_block, command.blockName, list(command.targets))
+            for block_name in response.invalidate:
+                delete_block(block_name)
+            grpc_pool.report_success(namenode)
+            print(f"Heartbeat sent ({'full' if request.full_report else 'incremental'} report, {len(request.blocks)} blocks)")
+        except Exception as e:
+            grpc_pool.report_failure(namenode, e)
+            print(f"Failed to send heartbeat: {e}")
 
-def createServer(namenode, datanode):
-    print(f"Conectando al NameNode en {namenode}")
-    with grpc.insecure_channel(namenode) as chan:
-        stub = dfs_pb2_grpc.dfsStub(chan)
-        request = dfs_pb2.NameNodeRequest(conn=datanode, files=listFiles())
-        response = stub.NameNodeConnection(request)
-        if response.status == 200:
-            print("Conexión al NameNode exitosa")
-    server = grpc.server(futures.ThreadPoolExecutor())
+def collect_worker_events(events):
+    """En el proceso principal: aplica los cambios de bloques y las métricas que envían los workers."""
+    while True:
+        kind, *payload = events.get()
+        if kind == 'added':
+            block_tracker.block_added(*payload)
+        elif kind == 'removed':
+            block_tracker.block_removed(*payload)
+        elif kind == 'stats':
+            transfer_stats.merge(*payload)
+
+def report_worker_stats(events, parent):
+    """En un worker: envía sus métricas al principal y termina si el principal ya no existe."""
+    while True:
+        time.sleep(WORKER_STATS_INTERVAL)
+        if os.getppid() != parent:
+            os._exit(0)
+        events.put(('stats', os.getpid()) + transfer_stats.take())
+
+def runWorker(namenode, datanode, port, events, parent):
+    """Proceso worker: sólo atiende RPCs en el puerto compartido, sin heartbeats ni scrubber."""
+    block_tracker.forward_to(events)
+    Thread(target=report_worker_stats, args=(events, parent), daemon=True).start()
+    runServer(namenode, datanode, port, lambda: print(f"DataNode worker {os.getpid()} started, port: {port}"))
+
+def startWorkers(namenode, datanode, port, workers):
+    """
+    Lanza workers - 1 procesos más que comparten el puerto y FILES_DIR. Devuelve la cola por
+    la que informan al proceso principal, o None si se usa un único proceso.
+    """
+    if workers <= 1:
+        return None
+    if fcntl is None or not hasattr(socket, 'SO_REUSEPORT'):
+        print("DATANODE_WORKERS necesita SO_REUSEPORT y flock; se usa un único proceso")
+        return None
+    context = multiprocessing.get_context('fork')
+    events = context.Queue()
+    for _ in range(workers - 1):
+        context.Process(target=runWorker, args=(namenode, datanode, port, events, os.getpid()), daemon=True).start()
+    return events
+
+def runServer(namenode, datanode, port, on_start):
+    """Atiende RPCs en el puerto (con grpc.aio o con un pool de hilos) hasta que el servidor termine."""
+    if aio_server.enabled():
+        aio_server.serve(AsyncFiles(namenode, datanode), port, on_start=on_start, options=SERVER_OPTIONS)
+        return
+
+    server = grpc.server(futures.ThreadPoolExecutor(), options=SERVER_OPTIONS)
     dfs_pb2_grpc.add_dfsServicer_to_server(Files(namenode, datanode), server)
-    port = 80081
     server.add_insecure_port('[::]:' + str(port))
     server.start()
-    print(f"DataNode server started, port: {port}")
+    on_start()
+    server.wait_for_termination()
+
+def createServer(namenode, datanode, port, workers=DATANODE_WORKERS):
+    global namenode_address, datanode_address
+    namenode_address = namenode
+    datanode_address = datanode
+    # Los workers se crean antes de abrir cualquier canal: gRPC no soporta fork con canales abiertos
+    events = startWorkers(namenode, datanode, port, workers)
+    print(f"Conectando al NameNode en {namenode}")
+    block_tracker.load()
+    stub = grpc_pool.get_stub(namenode)
+    response = stub.NameNodeConnection(block_tracker.next_report(datanode))
+    block_tracker.acknowledge(response)
+    if response.status == 200:
+        print("Conexión al NameNode exitosa")
+    runServer(namenode, datanode, port, lambda: startBackgroundTasks(namenode, datanode, port, events))
 
+def startBackgroundTasks(namenode, datanode, port, events=None):
+    """Arranca el heartbeat y el scrubber una vez que el servidor acepta conexiones."""
+    print(f"DataNode server started, port: {port}")
+    if events is not None:
+        events_thread = Thread(target=collect_worker_events, args=(events,), daemon=True)
+        events_thread.start()
     heartbeat_thread = Thread(target=sendHeartbeat, args=(namenode, datanode), daemon=True)
     heartbeat_thread.start()
 
-    server.wait_for_termination()
+    scrubber_thread = Thread(target=BlockScrubber().run, daemon=True)
+    scrubber_thread.start()
 
-def main():
+def parse_args(argv=None):
+    """
+    Configuración del DataNode. Cada opción se puede dar como argumento o por variable de
+    entorno (también en el .env), así que un mismo main.py sirve para cualquier número de nodos.
+    """
     load_dotenv()
-    namenode = os.getenv("namenode")
-    datanode = os.getenv("datanode")
-    createServer(namenode, datanode)
+    parser = argparse.ArgumentParser(description="DataNode del DFS")
+    parser.add_argument('--port', type=int, default=int(os.getenv("DATANODE_PORT", "0")),
+                        help="Puerto de escucha (DATANODE_PORT); por defecto el de --advertise")
+    parser.add_argument('--data-dir', default=os.getenv("DATANODE_DATA_DIR", FILES_DIR),
+                        help="Directorio de los bloques (DATANODE_DATA_DIR)")
+    parser.add_argument('--advertise', default=os.getenv("datanode"),
+                        help="host:puerto con el que lo ven el NameNode y los demás DataNodes (datanode); "
+                             "por defecto 127.0.0.1:--port")
+    parser.add_argument('--namenode', default=os.getenv("namenode"), help="host:puerto del NameNode (namenode)")
+    parser.add_argument('--datanodes', default=os.getenv("DATANODES", ""),
+                        help="DataNodes separados por comas donde replicar si el NameNode no asigna destinos (DATANODES)")
+    parser.add_argument('--workers', type=int, default=int(os.getenv("DATANODE_WORKERS", str(DATANODE_WORKERS))),
+                        help="Procesos que atienden RPCs en el mismo puerto (DATANODE_WORKERS)")
+    parser.add_argument('--cache-bytes', type=int,
+                        default=int(os.getenv("BLOCK_CACHE_BYTES", str(BLOCK_CACHE_BYTES))),
+                        help="Memoria para bloques calientes, por proceso; 0 la desactiva (BLOCK_CACHE_BYTES)")
+    parser.add_argument('--cache-pin', default=os.getenv("BLOCK_CACHE_PIN", ""),
+                        help="Bloques separados por comas que nunca salen de la caché (BLOCK_CACHE_PIN)")
+    parser.add_argument('--codec', default=os.getenv("BLOCK_CODEC", BLOCK_CODEC), choices=[""] + compression.available(),
+                        help="Códec con el que se guardan los bloques si el cliente no pide uno (BLOCK_CODEC)")
+    args = parser.parse_args(argv)
+    if not args.namenode:
+        parser.error("falta la dirección del NameNode (--namenode o namenode en el .env)")
+    if not args.port and not args.advertise:
+        parser.error("falta el puerto (--port) o la dirección anunciada (--advertise)")
+    if not args.advertise:
+        args.advertise = f"127.0.0.1:{args.port}"
+    if not args.port:
+        args.port = int(args.advertise.rsplit(':', 1)[1])
+    return args
+
+def load_settings():
+    """
+    Vuelve a leer del entorno los ajustes sin argumento propio. Se llama después de
+    load_dotenv(): al importar el módulo el .env aún no estaba cargado.
+    """
+    global MAX_INFLIGHT_BLOCKS, DISTRIBUTION_WORKERS, MAX_STREAMS_PER_DATANODE, distribution_engine
+    global FULL_REPORT_INTERVAL, DOWNLOAD_CHUNK_SIZE, DOWNLOAD_USE_MMAP, SCRUB_INTERVAL, SCRUB_BYTES_PER_SEC
+    global REPLICATION_WORKERS, REPLICATION_BYTES_PER_SEC, replication_executor, replication_throttle
+    MAX_INFLIGHT_BLOCKS = int(os.getenv("MAX_INFLIGHT_BLOCKS", str(MAX_INFLIGHT_BLOCKS)))
+    DISTRIBUTION_WORKERS = int(os.getenv("DISTRIBUTION_WORKERS", str(DISTRIBUTION_WORKERS)))
+    MAX_STREAMS_PER_DATANODE = int(os.getenv("MAX_STREAMS_PER_DATANODE", str(MAX_STREAMS_PER_DATANODE)))
+    # Aún no envió nada (sus hilos se crean con el primer envío): se reemplaza con los valores nuevos
+    distribution_engine = DistributionEngine()
+    FULL_REPORT_INTERVAL = int(os.getenv("FULL_REPORT_INTERVAL", str(FULL_REPORT_INTERVAL)))
+    DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(DOWNLOAD_CHUNK_SIZE)))
+    DOWNLOAD_USE_MMAP = os.getenv("DOWNLOAD_USE_MMAP", "1" if DOWNLOAD_USE_MMAP else "0") == "1"
+    SCRUB_INTERVAL = int(os.getenv("SCRUB_INTERVAL", str(SCRUB_INTERVAL)))
+    SCRUB_BYTES_PER_SEC = int(os.getenv("SCRUB_BYTES_PER_SEC", str(SCRUB_BYTES_PER_SEC)))
+    REPLICATION_WORKERS = int(os.getenv("REPLICATION_WORKERS", str(REPLICATION_WORKERS)))
+    REPLICATION_BYTES_PER_SEC = int(os.getenv("REPLICATION_BYTES_PER_SEC", str(REPLICATION_BYTES_PER_SEC)))
+    replication_throttle = Throttler(REPLICATION_BYTES_PER_SEC)
+    replication_executor = futures.ThreadPoolExecutor(max_workers=REPLICATION_WORKERS,
+                                                      thread_name_prefix="block-replicator")
+
+def main(argv=None):
+    global FILES_DIR, BLOCK_CODEC, datanodes
+    args = parse_args(argv)
+    load_settings()
+    FILES_DIR = args.data_dir
+    BLOCK_CODEC = args.codec
+    datanodes = [address.strip() for address in args.datanodes.split(',') if address.strip()]
+    block_cache.resize(args.cache_bytes)
+    for block_name in args.cache_pin.split(','):
+        if block_name.strip():
+            block_cache.pin(block_name.strip())
+    createServer(args.namenode, args.advertise, args.port, args.workers)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,75 @@
+"""
+Pruebas del corte y envío de bloques de una subida, sin DataNodes ni NameNode:
+
+    python -m unittest test_upload
+"""
+import hashlib
+import unittest
+from concurrent import futures
+
+import main
+
+
+class FakeEngine:
+    """DistributionEngine que no envía nada: cada bloque 'se guarda' en los nodos indicados."""
+    def __init__(self, targets=('dn1', 'dn2'), present=(), failing=()):
+        self.targets = list(targets)
+        self.present = set(present)
+        self.failing = set(failing)
+        self.sent = []
+
+    def submit(self, block_data, block_name, codec="", compressed=None):
+        future = futures.Future()
+        if block_name in self.failing:
+            future.set_result(None)
+        elif block_name in self.present:
+            future.set_result([])
+        else:
+            self.sent.append(block_name)
+            future.set_result(self.targets)
+        return future
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class BlockPipelineTest(unittest.TestCase):
+    def test_refs_carry_the_nodes_that_stored_each_block(self):
+        engine = FakeEngine()
+        pipeline = main.BlockPipeline("f", engine=engine)
+        for data in (b"a" * 10, b"b" * 10, b"a" * 10):
+            pipeline.submit(data)
+        self.assertEqual(pipeline.close(), 0)
+
+        self.assertEqual(engine.sent, [digest(b"a" * 10), digest(b"b" * 10)])
+        self.assertEqual([ref.hash for ref in pipeline.refs],
+                         [digest(b"a" * 10), digest(b"b" * 10), digest(b"a" * 10)])
+        for ref in pipeline.refs:
+            self.assertEqual(list(ref.replicas), ['dn1', 'dn2'])
+
+    def test_blocks_already_in_the_cluster_carry_no_replicas(self):
+        pipeline = main.BlockPipeline("f", engine=FakeEngine(present=[digest(b"a")]))
+        pipeline.submit(b"a")
+        self.assertEqual(pipeline.close(), 0)
+        self.assertEqual(list(pipeline.refs[0].replicas), [])
+
+    def test_failed_blocks_are_counted(self):
+        pipeline = main.BlockPipeline("f", engine=FakeEngine(failing=[digest(b"a")]))
+        pipeline.submit(b"a")
+        pipeline.submit(b"b")
+        self.assertEqual(pipeline.close(), 1)
+
+    def test_packed_files_carry_the_container_replicas(self):
+        packer = main.BlockPacker(block_size=8)
+        packer.pipeline.engine = FakeEngine()
+        for name in ("x", "y", "z"):
+            packer.add(name, b"12345")
+        self.assertEqual(packer.close(), 0)
+        self.assertEqual(len(packer.files), 3)
+        for _, refs in packer.files:
+            self.assertEqual(list(refs[0].replicas), ['dn1', 'dn2'])
+
+
+if __name__ == '__main__':
+    unittest.main()
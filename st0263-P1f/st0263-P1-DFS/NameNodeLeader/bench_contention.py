@@ -0,0 +1,161 @@
+"""
+Benchmark de contención del NameNode con muchos clientes a la vez.
+
+Levanta un NameNode (el servicer de main.py) en un proceso aparte con --files
+archivos repartidos en --nodes DataNodes, y lanza --procs procesos con --clients
+hilos cada uno que piden mapas de bloques (NameNodeDownload, GetBlockRange y
+FindFile) sin pausa. Se mide dos veces: sólo con consultas y con todos los
+DataNodes mandando reportes completos de bloques en bucle, para comprobar que
+las consultas no esperan a que se procese un heartbeat.
+
+    python bench_contention.py --files 20000 --nodes 10 --procs 4 --clients 16
+"""
+import argparse
+import multiprocessing
+import random
+import time
+from concurrent import futures
+from threading import Thread, Event
+
+import grpc
+
+import main
+from main import dfs_pb2, dfs_pb2_grpc, grpc_pool
+
+
+def node_name(index):
+    return f"10.0.0.{index}:50052"
+
+
+def block_reports(files, nodes, blocks_per_file, replication):
+    """Reporte completo de cada DataNode: cada bloque en 'replication' nodos consecutivos."""
+    reports = {node_name(node): [] for node in range(nodes)}
+    for file_index in range(files):
+        for index in range(blocks_per_file):
+            info = dfs_pb2.BlockInfo(fileName=f"file-{file_index}", blockName=f"file-{file_index}_block_{index}",
+                                     index=index, size=1024 * 1024)
+            first = (file_index + index) % nodes
+            for copy in range(replication):
+                reports[node_name((first + copy) % nodes)].append(info)
+    return reports
+
+
+def serve(args, ready):
+    reports = block_reports(args.files, args.nodes, args.blocks_per_file, main.REPLICATION_FACTOR)
+    for node, blocks in reports.items():
+        main.namespace.apply_block_report(node, blocks)
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=main.RPC_WORKERS), options=grpc_pool.SERVER_OPTIONS,
+                         maximum_concurrent_rpcs=main.MAX_CONCURRENT_RPCS)
+    dfs_pb2_grpc.add_dfsServicer_to_server(main.Files(), server)
+    port = server.add_insecure_port('127.0.0.1:0')
+    server.start()
+    ready.put(port)
+    server.wait_for_termination()
+
+
+def client(port, files, seconds, stop):
+    stub = dfs_pb2_grpc.dfsStub(grpc.insecure_channel(f"127.0.0.1:{port}"))
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline and not stop.is_set():
+        name = f"file-{random.randrange(files)}"
+        operation = random.random()
+        started = time.perf_counter()
+        try:
+            if operation < 0.6:
+                stub.NameNodeDownload(dfs_pb2.DownloadFileRequest(fileName=name))
+            elif operation < 0.8:
+                stub.GetBlockRange(dfs_pb2.DownloadFileRequest(fileName=name, offset=512 * 1024, length=1024 * 1024))
+            else:
+                stub.FindFile(dfs_pb2.FindFileRequest(fileName=name))
+        except grpc.RpcError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - started)
+    return latencies, errors
+
+
+def client_process(port, files, clients, seconds):
+    """Un proceso de clientes: cada hilo con su propio canal, como clientes independientes."""
+    stop = Event()
+    with futures.ThreadPoolExecutor(max_workers=clients) as pool:
+        jobs = [pool.submit(client, port, files, seconds, stop) for _ in range(clients)]
+        results = [job.result() for job in jobs]
+    return [latency for latencies, _ in results for latency in latencies], sum(errors for _, errors in results)
+
+
+def heartbeat_process(port, args, seconds):
+    """Todos los DataNodes mandan reportes completos seguidos; devuelve cuánto tardó cada uno."""
+    reports = block_reports(args.files, args.nodes, args.blocks_per_file, main.REPLICATION_FACTOR)
+    requests = [dfs_pb2.NameNodeRequest(conn=node, blocks=blocks, full_report=True)
+                for node, blocks in reports.items()]
+    stub = dfs_pb2_grpc.dfsStub(grpc.insecure_channel(f"127.0.0.1:{port}", options=grpc_pool.CHANNEL_OPTIONS))
+    latencies = []
+    deadline = time.perf_counter() + seconds
+
+    def send(request):
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            stub.NameNodeConnection(request)
+            latencies.append(time.perf_counter() - started)
+
+    threads = [Thread(target=send, args=(request,)) for request in requests]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run_round(pool, port, args, with_heartbeats):
+    jobs = [pool.apply_async(client_process, (port, args.files, args.clients, args.seconds))
+            for _ in range(args.procs)]
+    heartbeats = pool.apply_async(heartbeat_process, (port, args, args.seconds)) if with_heartbeats else None
+    latencies = []
+    errors = 0
+    for job in jobs:
+        found, failed = job.get()
+        latencies.extend(found)
+        errors += failed
+    label = "con reportes completos" if with_heartbeats else "sin heartbeats"
+    print(f"Consultas {label}: {len(latencies) / args.seconds:.0f} RPC/s, "
+          f"p50 {1000 * percentile(latencies, 0.5):.2f} ms, p99 {1000 * percentile(latencies, 0.99):.2f} ms, "
+          f"{errors} errores")
+    if heartbeats is not None:
+        reports = heartbeats.get()
+        print(f"  {len(reports)} reportes completos de {args.files * args.blocks_per_file * main.REPLICATION_FACTOR // args.nodes} "
+              f"bloques, p50 {1000 * percentile(reports, 0.5):.0f} ms")
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=20000)
+    parser.add_argument('--nodes', type=int, default=10)
+    parser.add_argument('--blocks-per-file', type=int, default=2)
+    parser.add_argument('--procs', type=int, default=4, help='Procesos de clientes')
+    parser.add_argument('--clients', type=int, default=16, help='Hilos por proceso de clientes')
+    parser.add_argument('--seconds', type=float, default=10)
+    args = parser.parse_args()
+
+    # 'spawn' porque gRPC no soporta fork después de crear canales o servidores
+    context = multiprocessing.get_context('spawn')
+    ready = context.Queue()
+    server = context.Process(target=serve, args=(args, ready), daemon=True)
+    server.start()
+    port = ready.get()
+    try:
+        with context.Pool(args.procs + 1) as pool:
+            run_round(pool, port, args, with_heartbeats=False)
+            run_round(pool, port, args, with_heartbeats=True)
+    finally:
+        server.terminate()
+
+
+if __name__ == "__main__":
+    main_bench()
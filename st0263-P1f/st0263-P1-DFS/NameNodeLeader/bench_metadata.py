@@ -0,0 +1,96 @@
+"""
+Benchmark de la persistencia de metadatos del NameNode.
+
+1. Registra --files manifiestos desde --threads hilos a la vez (como CommitFile)
+   y mide ediciones/s y cuántas ediciones comparte cada fsync (group commit).
+2. Guarda un snapshot, registra --tail ediciones más y mide el arranque en frío:
+   cargar el snapshot y reaplicar la cola del registro.
+
+    python bench_metadata.py --files 1000000 --threads 16
+"""
+import argparse
+import gc
+import os
+import tempfile
+import time
+from concurrent import futures
+from threading import Lock
+
+from editlog import EditLog
+from metadata import Namespace, encode_manifests
+
+
+class Ref:
+    __slots__ = ('hash', 'size')
+    offset = 0
+    block_size = 0
+
+    def __init__(self, block_hash, size):
+        self.hash = block_hash
+        self.size = size
+
+
+def commit(namespace, edit_log, lock, index, blocks_per_file):
+    refs = [Ref(f"{index:032x}{block:032x}", 1024 * 1024) for block in range(blocks_per_file)]
+    with lock:
+        namespace.commit_file(f"file-{index}", refs, uploaded=True)
+        txid = edit_log.log_edit({'op': 'commit', 'file': f"file-{index}",
+                                  'blocks': [[ref.hash, ref.size] for ref in refs]})
+    edit_log.sync(txid)
+
+
+def run_commits(namespace, edit_log, first, count, threads, blocks_per_file):
+    lock = Lock()
+    start = time.perf_counter()
+    with futures.ThreadPoolExecutor(max_workers=threads) as pool:
+        jobs = [pool.submit(commit, namespace, edit_log, lock, index, blocks_per_file)
+                for index in range(first, first + count)]
+        for job in jobs:
+            job.result()
+    return time.perf_counter() - start
+
+
+def main_bench():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=200000)
+    parser.add_argument('--tail', type=int, default=10000, help='Ediciones posteriores al snapshot')
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--blocks-per-file', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        namespace = Namespace()
+        edit_log = EditLog(directory)
+        edit_log.load()
+
+        elapsed = run_commits(namespace, edit_log, 0, args.files, args.threads, args.blocks_per_file)
+        metrics = edit_log.metrics()
+        print(f"{args.files} commits en {elapsed:.2f}s: {args.files / elapsed:.0f} ediciones/s, "
+              f"{metrics['editlog.edits_per_sync']:.1f} ediciones por fsync, "
+              f"{metrics['editlog.avg_sync_ms']:.2f} ms por fsync")
+
+        start = time.perf_counter()
+        txid = edit_log.roll()
+        edit_log.save_snapshot(encode_manifests(namespace.manifest_state()), txid)
+        size_mb = os.path.getsize(os.path.join(directory, 'fsimage.json')) / (1024 * 1024)
+        print(f"Snapshot de {size_mb:.1f} MB en {time.perf_counter() - start:.2f}s")
+
+        run_commits(namespace, edit_log, args.files, args.tail, args.threads, args.blocks_per_file)
+        edit_log.segment.close()
+
+        start = time.perf_counter()
+        gc.disable()  # Igual que restoreMetadata en main.py
+        restored = Namespace()
+        state, edits = EditLog(directory).load()
+        restored.load_state(state)
+        for record in edits:
+            restored.apply_edit(record)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        assert len(restored.manifests) == args.files + args.tail
+        print(f"Arranque en frío: {len(restored.manifests)} archivos ({len(edits)} ediciones reaplicadas) "
+              f"en {elapsed:.2f}s")
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,190 @@
+"""
+Persistencia de los metadatos del NameNode: registro de ediciones y snapshots.
+
+Cada cambio del espacio de nombres que no se puede reconstruir con los reportes
+de los DataNodes (hoy, los manifiestos de CommitFile) se añade como una línea
+JSON a un segmento del registro (edits_<primer txid>.log) antes de responder.
+Los hilos que escriben a la vez comparten un mismo fsync (group commit): el
+primero que llega sincroniza todo lo acumulado y los demás sólo esperan.
+Cada cierto tiempo se guarda un snapshot completo (fsimage.json) y se borran
+los segmentos que ya contiene; al arrancar se carga el snapshot y se aplica la
+cola del registro. La ubicación de las réplicas no se guarda: llega con el
+primer reporte completo de cada DataNode.
+"""
+import json
+import os
+import time
+from threading import Lock, Condition
+
+SNAPSHOT_FILE = "fsimage.json"
+SEGMENT_PREFIX = "edits_"
+SEGMENT_SUFFIX = ".log"
+
+
+class EditLog:
+    def __init__(self, directory):
+        self.directory = directory
+        self.lock = Lock()
+        self.synced = Condition(self.lock)
+        self.buffer = []
+        self.txid = 0           # Última edición registrada
+        self.synced_txid = 0    # Última edición ya en disco
+        self.syncing = False
+        self.segment = None
+        self.snapshot_txid = 0
+        self.syncs = 0
+        self.synced_edits = 0
+        self.sync_seconds = 0.0
+
+    def load(self):
+        """
+        Lee el snapshot y las ediciones posteriores. Devuelve (estado del snapshot o None,
+        lista de ediciones en orden) y deja el registro listo para seguir escribiendo.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        state = None
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, encoding="utf-8") as snapshot:
+                state = json.load(snapshot)
+            self.snapshot_txid = state["txid"]
+        self.txid = self.snapshot_txid
+
+        edits = []
+        for name in self._segments():
+            path = os.path.join(self.directory, name)
+            with open(path, "rb") as segment:
+                offset = 0
+                for line in segment:
+                    try:
+                        if not line.endswith(b"\n"):
+                            raise ValueError("incomplete line")
+                        record = json.loads(line)
+                    except ValueError:
+                        # Línea a medio escribir antes de una caída: nunca se confirmó al cliente.
+                        # Se corta para que lo que se escriba después en este segmento sea legible.
+                        segment.close()
+                        os.truncate(path, offset)
+                        break
+                    offset += len(line)
+                    if record["txid"] > self.txid:
+                        edits.append(record)
+                        self.txid = record["txid"]
+        self.synced_txid = self.txid
+        self._open_segment()
+        return state, edits
+
+    def _segments(self):
+        names = [name for name in os.listdir(self.directory)
+                 if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)]
+        return sorted(names, key=lambda name: int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+
+    def _open_segment(self):
+        # Cada arranque y cada snapshot abren un segmento nuevo, que empieza en la siguiente edición
+        name = f"{SEGMENT_PREFIX}{self.txid + 1}{SEGMENT_SUFFIX}"
+        self.segment = open(os.path.join(self.directory, name), "ab")
+        _fsync_directory(self.directory)
+
+    def log_edit(self, record):
+        """
+        Añade una edición al buffer y devuelve su txid. No espera al disco: llamar a
+        sync(txid) antes de responder al cliente, idealmente fuera de otros locks.
+        """
+        with self.lock:
+            self.txid += 1
+            record["txid"] = self.txid
+            self.buffer.append(json.dumps(record, separators=(",", ":")))
+            return self.txid
+
+    def sync(self, txid):
+        """Espera a que la edición txid esté en disco; si nadie está sincronizando, lo hace este hilo."""
+        with self.lock:
+            while self.synced_txid < txid and self.syncing:
+                self.synced.wait()
+            if self.synced_txid >= txid:
+                return
+            self.syncing = True
+            batch, self.buffer = self.buffer, []
+            last = self.txid
+            segment = self.segment
+
+        started = time.time()
+        synced = False
+        try:
+            segment.write(("\n".join(batch) + "\n").encode("utf-8"))
+            segment.flush()
+            os.fsync(segment.fileno())
+            synced = True
+        finally:
+            with self.lock:
+                self.syncing = False
+                if synced:
+                    self.synced_txid = last
+                    self.syncs += 1
+                    self.synced_edits += len(batch)
+                    self.sync_seconds += time.time() - started
+                else:
+                    # Se reintenta en el próximo sync; al reproducir se ignoran los txid repetidos
+                    self.buffer[:0] = batch
+                self.synced.notify_all()
+
+    def roll(self):
+        """
+        Cierra el segmento actual y abre otro; devuelve el último txid del cerrado.
+        Se llama con las escrituras del espacio de nombres detenidas, justo antes de
+        copiar el estado para el snapshot.
+        """
+        with self.lock:
+            last = self.txid
+        self.sync(last)
+        with self.lock:
+            self.segment.close()
+            self._open_segment()
+        return last
+
+    def save_snapshot(self, state, txid):
+        """Escribe el snapshot del estado hasta txid y borra los segmentos que ya incluye."""
+        state = dict(state, txid=txid)
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        temp_path = path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as snapshot:
+            json.dump(state, snapshot, separators=(",", ":"))
+            snapshot.flush()
+            os.fsync(snapshot.fileno())
+        os.replace(temp_path, path)  # Un snapshot a medias nunca reemplaza al anterior
+        _fsync_directory(self.directory)
+        self.snapshot_txid = txid
+
+        segments = self._segments()
+        for name, following in zip(segments, segments[1:]):
+            # Un segmento está contenido en el snapshot si el siguiente empieza después de txid
+            if int(following[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) <= txid + 1:
+                os.remove(os.path.join(self.directory, name))
+
+    def pending_edits(self):
+        """Ediciones registradas desde el último snapshot."""
+        return self.txid - self.snapshot_txid
+
+    def metrics(self):
+        with self.lock:
+            return {
+                'editlog.txid': self.txid,
+                'editlog.syncs': self.syncs,
+                'editlog.edits_per_sync': self.synced_edits / self.syncs if self.syncs else 0.0,
+                'editlog.avg_sync_ms': 1000 * self.sync_seconds / self.syncs if self.syncs else 0.0,
+                'editlog.edits_since_snapshot': self.txid - self.snapshot_txid,
+            }
+
+
+def _fsync_directory(directory):
+    # Hace durable la creación o el renombrado de archivos; en Windows no se puede abrir un directorio
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
@@ -0,0 +1,162 @@
+"""
+Detector de fallos de los DataNodes (phi-accrual con límite por tiempo).
+
+Cada heartbeat registra el intervalo desde el anterior. Con la media y la
+desviación de los últimos intervalos se calcula
+phi = -log10(P(el heartbeat aún puede llegar)) con una distribución normal
+(aproximación logística, como en Akka). Si phi supera SUSPECT_PHI el nodo pasa a
+sospechoso y deja de recibir tráfico nuevo; si pasan DEAD_AFTER segundos sin
+heartbeat se declara muerto. Un nodo sospechoso o muerto que vuelve a enviar
+heartbeat cuenta como falso positivo, salvo que haya reiniciado: cada heartbeat
+trae la 'incarnation' del proceso (su momento de arranque) y si cambió el nodo sí
+estaba caído. Los nodos muertos se olvidan tras FORGET_AFTER segundos.
+"""
+import math
+import time
+from collections import deque
+from threading import Lock
+
+ALIVE = 'alive'
+SUSPECT = 'suspect'
+DEAD = 'dead'
+
+SUSPECT_PHI = 8.0  # phi >= 8 equivale a una probabilidad de 1e-8 de que el heartbeat aún llegue
+DEAD_AFTER = 30  # Segundos sin heartbeat para declarar un nodo muerto
+WINDOW = 20  # Intervalos recientes usados para estimar la media
+FORGET_AFTER = 3600  # Segundos que se recuerda un nodo muerto antes de sacarlo del detector
+
+
+class _NodeState:
+    __slots__ = ('state', 'last_heartbeat', 'intervals', 'suspected_at', 'incarnation')
+
+    def __init__(self, now, expected_interval, incarnation=0):
+        self.state = ALIVE
+        self.last_heartbeat = now
+        self.intervals = deque([expected_interval], maxlen=WINDOW)
+        self.suspected_at = None
+        self.incarnation = incarnation
+
+
+class FailureDetector:
+    def __init__(self, expected_interval, suspect_phi=SUSPECT_PHI, dead_after=DEAD_AFTER,
+                 forget_after=FORGET_AFTER):
+        self.expected_interval = expected_interval
+        self.forget_after = forget_after
+        # Sin un mínimo, heartbeats muy regulares darían una desviación ~0 y sospechas al menor retraso
+        self.min_std_dev = expected_interval / 10
+        self.suspect_phi = suspect_phi
+        self.dead_after = dead_after
+        self.lock = Lock()
+        self.nodes = {}
+        self.counters = {
+            'suspicions': 0,
+            'false_suspicions': 0,   # Sospechosos que volvieron antes de declararse muertos
+            'deaths': 0,
+            'false_deaths': 0,       # Declarados muertos que volvieron a enviar heartbeat sin reiniciar
+            'restarts': 0,           # Nodos que volvieron con otra incarnation
+        }
+        self.detection_latencies = deque(maxlen=100)  # Segundos desde el último heartbeat hasta declararlo muerto
+
+    def heartbeat(self, node, now=None, incarnation=0):
+        """
+        Registra un heartbeat. Devuelve True si el nodo era nuevo o estaba muerto.
+        incarnation identifica el arranque del proceso; 0 si el DataNode no la envía.
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            info = self.nodes.get(node)
+            if info is None:
+                self.nodes[node] = _NodeState(now, self.expected_interval, incarnation)
+                return True
+
+            revived = info.state == DEAD
+            restarted = incarnation != info.incarnation
+            info.incarnation = incarnation
+            if restarted:
+                self.counters['restarts'] += 1
+                print(f"-- Node restarted: {node}")
+            elif info.state == SUSPECT:
+                self.counters['false_suspicions'] += 1
+                print(f"-- Node recovered from suspicion: {node}")
+            elif revived:
+                self.counters['false_deaths'] += 1
+                print(f"-- Node came back after being declared dead: {node}")
+
+            if not revived:
+                info.intervals.append(now - info.last_heartbeat)
+            info.last_heartbeat = now
+            info.state = ALIVE
+            info.suspected_at = None
+            return revived
+
+    def phi(self, info, now):
+        intervals = info.intervals
+        mean = sum(intervals) / len(intervals)
+        variance = sum((x - mean) ** 2 for x in intervals) / len(intervals)
+        std_dev = max(math.sqrt(variance), self.min_std_dev)
+
+        y = (now - info.last_heartbeat - mean) / std_dev
+        y = min(max(y, -10.0), 10.0)  # Evita desbordes de exp(); fuera de este rango phi ya es ~0 o enorme
+        e = math.exp(-y * (1.5976 + 0.070566 * y * y))
+        if y > 0:
+            return -math.log10(e / (1.0 + e))
+        return -math.log10(1.0 - 1.0 / (1.0 + e))
+
+    def check(self, now=None):
+        """Actualiza el estado de todos los nodos y devuelve la lista de recién declarados muertos."""
+        now = time.time() if now is None else now
+        dead = []
+        with self.lock:
+            for node, info in list(self.nodes.items()):
+                if info.state == DEAD:
+                    if now - info.last_heartbeat >= self.forget_after:
+                        del self.nodes[node]
+                    continue
+                elapsed = now - info.last_heartbeat
+                if elapsed >= self.dead_after:
+                    info.state = DEAD
+                    self.counters['deaths'] += 1
+                    self.detection_latencies.append(elapsed)
+                    dead.append(node)
+                elif info.state == ALIVE and self.phi(info, now) >= self.suspect_phi:
+                    info.state = SUSPECT
+                    info.suspected_at = now
+                    self.counters['suspicions'] += 1
+                    print(f"-- Node suspected: {node} ({elapsed:.1f}s without heartbeat)")
+        return dead
+
+    def state(self, node):
+        info = self.nodes.get(node)
+        return info.state if info is not None else DEAD
+
+    def is_alive(self, node):
+        return self.state(node) == ALIVE
+
+    def alive_nodes(self):
+        return [node for node, info in list(self.nodes.items()) if info.state == ALIVE]
+
+    def forget(self, node):
+        with self.lock:
+            self.nodes.pop(node, None)
+
+    def metrics(self):
+        with self.lock:
+            states = [info.state for info in self.nodes.values()]
+            latencies = list(self.detection_latencies)
+            counters = dict(self.counters)
+
+        metrics = {
+            'liveness.nodes_alive': states.count(ALIVE),
+            'liveness.nodes_suspect': states.count(SUSPECT),
+            'liveness.nodes_dead': states.count(DEAD),
+        }
+        for name, value in counters.items():
+            metrics['liveness.' + name] = value
+        metrics['liveness.suspicion_false_positive_rate'] = (
+            counters['false_suspicions'] / counters['suspicions'] if counters['suspicions'] else 0.0)
+        metrics['liveness.death_false_positive_rate'] = (
+            counters['false_deaths'] / counters['deaths'] if counters['deaths'] else 0.0)
+        if latencies:
+            metrics['liveness.detection_latency_avg_s'] = sum(latencies) / len(latencies)
+            metrics['liveness.detection_latency_max_s'] = max(latencies)
+        return metrics
@@ -1,121 +1,446 @@
+import asyncio
 import grpc
+import gc
+import os
 import sys
 import random
 from concurrent import futures
 import time
-from threading import Thread
+from threading import Thread, Lock
 from pathlib import Path
 
 proto_directory = Path(__file__).parent.parent / 'proto'
 
 sys.path.append(str(proto_directory))
+sys.path.append(str(Path(__file__).parent.parent / 'common'))
 import dfs_pb2_grpc
 import dfs_pb2
+import grpc_pool
+import aio_server
+from metadata import Namespace, BlockSlice, encode_manifests, encode_refs
+from liveness import FailureDetector
+from placement import PlacementEngine
+from replication import ReplicationManager
+from editlog import EditLog
 
 HEARTBEAT_INTERVAL = 10
 DISCONNECT_THRESHOLD = 30
+LIVENESS_CHECK_INTERVAL = 1  # Segundos entre revisiones del detector de fallos
+REPLICATION_INTERVAL = 3  # Segundos entre rondas del planificador de re-replicación
+REPLICATION_SCAN_INTERVAL = 60  # Segundos entre revisiones completas de bloques con pocas réplicas
+ORPHAN_GRACE = 600  # Segundos que un bloque sin archivos que lo usen espera antes de borrarse
+UPLOAD_LEASE = 3600  # Segundos que los bloques de una subida sin CommitFile quedan a salvo de ese borrado
+PORT = int(os.getenv("NAMENODE_PORT", "50051"))  # Puerto de escucha
+METADATA_DIR = os.getenv("NAMENODE_METADATA_DIR", "metadata")  # Registro de ediciones y snapshots
+CHECKPOINT_INTERVAL = 300  # Segundos máximos entre snapshots si hubo cambios
+CHECKPOINT_EDITS = 10000   # Ediciones tras las que se hace un snapshot sin esperar al intervalo
+REPLICATION_FACTOR = 2
+RPC_WORKERS = int(os.getenv("NAMENODE_RPC_WORKERS", "32"))  # Hilos que atienden RPCs
+MAX_CONCURRENT_RPCS = RPC_WORKERS * 4  # Más allá de esto gRPC rechaza con RESOURCE_EXHAUSTED en vez de encolar sin límite
+WATCH_HEARTBEAT = 5  # Segundos sin cambios tras los que WatchNamespace manda un mensaje vacío
+WATCH_LEASE = 3 * WATCH_HEARTBEAT  # Tiempo que un cliente puede confiar en su caché sin recibir nada
+WATCH_POLL_INTERVAL = 0.1  # En modo aio, cada cuánto se revisa la versión del espacio de nombres
+# En modo threads cada WatchNamespace ocupa un hilo de RPC mientras dura; el resto queda para las demás RPCs
+MAX_WATCHERS = RPC_WORKERS // 2
 
 # Diccionario para almacenar nodos y sus métricas (carga, espacio disponible, última señal)
 nodes = {}
-files = {}
+# Espacio de nombres: archivo -> bloques -> réplicas, alimentado por los reportes de bloques
+namespace = Namespace()
+# Última respuesta de ListFiles y la versión del listado con la que se construyó
+list_files_cache = (None, None)
+# Estado de vida de cada DataNode (vivo, sospechoso, muerto)
+detector = FailureDetector(HEARTBEAT_INTERVAL, dead_after=DISCONNECT_THRESHOLD)
+# Decide en qué DataNodes va cada réplica según las métricas de los heartbeats
+placement = PlacementEngine(detector)
+# Cola de bloques con pocas réplicas y copias en curso entre DataNodes
+replication = ReplicationManager(namespace, detector, placement, REPLICATION_FACTOR)
+# Réplicas reportadas como corruptas desde el arranque
+corrupt_replicas = 0
+# Subidas resueltas sólo con CommitFile porque el clúster ya tenía todos los bloques
+deduplicated_uploads = 0
+# Archivos fijados dentro de bloques contenedores (UploadPacked)
+packed_files = 0
+# Clientes suscritos a WatchNamespace
+watchers = 0
+# Protege los contadores anteriores, que se actualizan desde varios hilos de RPC
+counters_lock = Lock()
+# Registro durable de los cambios de los manifiestos
+edit_log = EditLog(METADATA_DIR)
 
 class Files(dfs_pb2_grpc.dfsServicer):        
     def NameNodeConnection(self, request, context):
         # Registro de DataNodes con métricas
-        if request.conn and request.conn not in nodes:
-            nodes[request.conn] = {
-                'files': request.files,
+        if not request.conn:
+            return dfs_pb2.HeartbeatResponse(status=400)
+
+        # Cada heartbeat trae un reporte de bloques: completo o sólo con los cambios
+        if request.full_report:
+            namespace.apply_block_report(request.conn, request.blocks)
+        elif request.files:
+            namespace.apply_file_list(request.conn, request.files)
+        elif namespace.knows_node(request.conn):
+            namespace.apply_block_delta(request.conn, request.blocks, request.removed)
+        else:
+            # Nodo desconocido (p. ej. tras reiniciar el NameNode): los cambios no sirven sin la base
+            print(f"-- Full block report requested from {request.conn}")
+            return dfs_pb2.HeartbeatResponse(status=200, full_report_needed=True)
+
+        detector.heartbeat(request.conn, incarnation=request.incarnation)
+        # Se trabaja sobre la entrada local: checkHeartbeat puede sacar el nodo en cualquier momento
+        node = nodes.get(request.conn)
+        if node is None:
+            node = nodes.setdefault(request.conn, {
                 'last_heartbeat': time.time(),
-                'load': len(request.files),  # Usamos la cantidad de archivos como proxy de carga
-                'available_space': 1000  # Puedes implementar un sistema real para calcular espacio disponible
-            }
-            files[request.conn] = request.files
+                'load': 0,
+                'available_space': 0
+            })
             print(f"-- Connection established: {request.conn}")
+        node['last_heartbeat'] = time.time()
+        node['load'] = namespace.block_count(request.conn)
+        if request.HasField('metrics'):
+            node['available_space'] = request.metrics.free_space
+            placement.update(request.conn, request.metrics)
 
-        return dfs_pb2.StatusMessage(status=200)
+        # Las órdenes de re-replicación viajan en la respuesta al heartbeat del nodo origen
+        commands = [dfs_pb2.ReplicationCommand(blockName=block_name, targets=targets)
+                    for block_name, targets in replication.commands_for(request.conn)]
+        # También las órdenes de borrado: bloques sin archivos que los usen y réplicas sobrantes
+        invalidate = namespace.invalidations_for(request.conn) + replication.trims_for(request.conn)
+        return dfs_pb2.HeartbeatResponse(status=200, ack_seq=request.report_seq, replicate=commands,
+                                         invalidate=invalidate)
 
     def NameNodeDownload(self, request, context):
-        fileName = request.fileName
-        nodeAddresses = [node for node, node_info in files.items() if fileName in node_info]
-        
-        if nodeAddresses:
-            selected_node = random.choice(nodeAddresses)
-            return dfs_pb2.DataNodeResponse(conns=[selected_node], status=200)
-        else:
-            return dfs_pb2.DataNodeResponse(status=404)
+        """Devuelve el mapa de bloques del archivo, en orden, con todas sus réplicas."""
+        # La versión se lee antes que los bloques: cualquier cambio posterior llega por WatchNamespace
+        version = namespace.version
+        if request.offset < 0 or request.length < 0:
+            return dfs_pb2.BlockLocationsResponse(status=400, version=version)
+        layout = namespace.get_layout(request.fileName)
+        if not layout:
+            return dfs_pb2.BlockLocationsResponse(status=404, version=version)
+
+        blocks, offsets, size = layout
+        return self.build_locations(request.fileName, zip(range(len(blocks)), blocks, offsets), size, version)
+
+    def GetBlockRange(self, request, context):
+        """Devuelve sólo los bloques que cubren el rango offset/length del archivo."""
+        version = namespace.version
+        if request.offset < 0 or request.length < 0:
+            return dfs_pb2.BlockLocationsResponse(status=400, version=version)
+        found = namespace.blocks_in_range(request.fileName, request.offset, request.length)
+        if found is None:
+            return dfs_pb2.BlockLocationsResponse(status=404, version=version)
+
+        covering, size = found
+        return self.build_locations(request.fileName, covering, size, version)
 
     def NameNodeUpload(self, request, context):
-        if len(nodes) < 2:
+        if len(detector.alive_nodes()) < 2:
             print("Not enough DataNodes available.")
             return dfs_pb2.DataNodeResponse(status=400)
 
         # Seleccionar dos nodos con menor carga
-        selected_nodes = self.select_best_datanodes(2)
+        selected_nodes = self.select_best_datanodes(REPLICATION_FACTOR)
         if selected_nodes:
             response = dfs_pb2.DataNodeResponse(conns=selected_nodes, status=200)
             return response
         else:
             return dfs_pb2.DataNodeResponse(status=500)
 
-    def select_best_datanodes(self, num_nodes=2):
+    def AllocateBlock(self, request, context):
+        """Los DataNodes preguntan aquí a qué nodos enviar cada bloque que cortan."""
+        replication = request.replication or REPLICATION_FACTOR
+        selected_nodes = self.select_best_datanodes(replication, request.size, request.exclude)
+        if len(selected_nodes) < replication:
+            print(f"Not enough DataNodes available for {request.blockName}.")
+            return dfs_pb2.DataNodeResponse(conns=selected_nodes, status=503)
+        if request.blockName:
+            # Hasta su CommitFile el bloque no tiene archivos que lo usen: que no se borre antes
+            namespace.lease_blocks([request.blockName], UPLOAD_LEASE)
+        return dfs_pb2.DataNodeResponse(conns=selected_nodes, status=200)
+
+    def build_locations(self, fileName, blocks_with_offsets, size, version):
+        """Arma la respuesta con las réplicas de cada bloque y su posición dentro del archivo."""
+        locations = []
+        for index, block, offset in blocks_with_offsets:
+            # Las réplicas vivas primero; las de nodos sospechosos quedan como último recurso
+            replicas = sorted(block.replicas, key=lambda node: (not detector.is_alive(node), node))
+            alive = [node for node in replicas if detector.is_alive(node)]
+            locations.append(dfs_pb2.BlockLocation(
+                blockName=block.blockName,
+                datanode=random.choice(alive or replicas),  # Repartir las lecturas entre réplicas
+                index=index,
+                size=block.size,
+                checksum=block.checksum,
+                replicas=replicas,
+                offset=offset,
+                packed=isinstance(block, BlockSlice),
+                block_offset=block.offset
+            ))
+
+        return dfs_pb2.BlockLocationsResponse(
+            blockLocations=locations,
+            status=200,
+            fileName=fileName,
+            fileSize=size,
+            version=version
+        )
+
+    def select_best_datanodes(self, num_nodes=2, size=0, exclude=()):
         """
-        Selecciona los mejores DataNodes según la menor carga (nodos con menos archivos).
+        Selecciona los mejores DataNodes según el espacio libre, las transferencias en
+        curso y la E/S reciente que reporta cada uno. Sólo se consideran nodos vivos.
         """
-        # Ordenar los DataNodes por carga (número de archivos o bloques)
-        sorted_nodes = sorted(nodes.items(), key=lambda item: item[1]['load'])
-        
-        # Seleccionar los nodos con menor carga
-        return [node for node, info in sorted_nodes[:num_nodes]]
+        return placement.choose(num_nodes, size, exclude)
 
     def ListFiles(self, request, context):
+        global list_files_cache
         print("LIST Request")
-        listFiles = set()
-    
-        for i in files:
-            for file in files[i]:
-                listFiles.add(file)
-
-        uniqueListFiles = list(listFiles)
-        print(uniqueListFiles)
-        return dfs_pb2.ListFilesResponse(files=uniqueListFiles, status=200)
+        version, response = list_files_cache
+        if version != namespace.listing_version:
+            version = namespace.listing_version
+            response = dfs_pb2.ListFilesResponse(version=version, files=namespace.file_names(), status=200)
+            list_files_cache = (version, response)
+        print(f"{len(response.files)} files")
+        return response
     
     def FindFile(self, request, context):
-        fileName = request.fileName
-        nodeAddresses = []
-        for node, fileList in files.items():
-            if fileName in fileList:
-                nodeAddresses.append(node)
+        version = namespace.version
+        nodeAddresses = namespace.nodes_for_file(request.fileName)
         if nodeAddresses:
-            return dfs_pb2.FindFileResponse(nodeAddresses=nodeAddresses, status=200)
+            return dfs_pb2.FindFileResponse(nodeAddresses=nodeAddresses, status=200, version=version)
         else:
-            return dfs_pb2.FindFileResponse(status=404)
+            return dfs_pb2.FindFileResponse(status=404, version=version)
+
+    def WatchNamespace(self, request, context):
+        """
+        Entrega a un cliente los cambios del espacio de nombres desde su versión 'since'
+        apenas ocurren, y un mensaje vacío cada WATCH_HEARTBEAT segundos sin cambios.
+        Cada mensaje renueva la concesión (lease_ms) durante la que el cliente puede usar
+        su caché de metadatos sin preguntar al NameNode.
+        """
+        global watchers
+        with counters_lock:
+            if watchers >= MAX_WATCHERS:
+                context.abort(grpc.StatusCode.RESOURCE_EXHAUSTED, "Too many watchers")
+            watchers += 1
+        try:
+            since = request.since
+            while context.is_active():
+                change = namespace_change(since)
+                since = change.version
+                yield change
+                namespace.wait_for_change(since, WATCH_HEARTBEAT)
+        finally:
+            with counters_lock:
+                watchers -= 1
+
+    def ReportBadBlock(self, request, context):
+        """Un DataNode encontró réplicas corruptas: las lecturas pasan a las demás réplicas."""
+        global corrupt_replicas
+        for block_name in request.blockNames:
+            if namespace.report_bad_block(request.datanode, block_name):
+                with counters_lock:
+                    corrupt_replicas += 1
+                print(f"-- Corrupt replica of {block_name} at {request.datanode}")
+        replication.replica_lost(request.blockNames)
+        return dfs_pb2.StatusMessage(status=200)
+
+    def CommitFile(self, request, context):
+        """
+        Fija los bloques de un archivo. Si el clúster ya tiene todos, el archivo queda
+        subido sin transferir datos; si no, responde 409 con los que faltan. Tras una
+        subida (uploaded) también responde 409 si alguno de sus bloques ya se mandó borrar.
+        """
+        global deduplicated_uploads
+        # El lock de escritura del espacio de nombres ordena igual el cambio y su edición
+        with namespace.write_lock:
+            missing = namespace.commit_file(request.fileName, request.blocks, request.uploaded)
+            if missing:
+                return dfs_pb2.CommitFileResponse(status=409, missing=missing)
+            txid = edit_log.log_edit({'op': 'commit', 'file': request.fileName,
+                                      'blocks': encode_refs(request.blocks)})
+        # El fsync se hace fuera del lock para que varios CommitFile compartan uno solo
+        edit_log.sync(txid)
+        if not request.uploaded:
+            with counters_lock:
+                deduplicated_uploads += 1
+        print(f"Committed: {request.fileName} ({len(request.blocks)} blocks)")
+        return dfs_pb2.CommitFileResponse(status=200)
+
+    def CommitFiles(self, request, context):
+        """
+        CommitFile de un lote de archivos (los de un UploadPacked): una sola pasada por
+        el lock de escritura, un solo cambio del listado y un solo fsync para todo el lote.
+        """
+        global packed_files
+        results = []
+        txid = 0
+        with namespace.write_lock:
+            all_missing = namespace.commit_files([(file.fileName, file.blocks, file.uploaded)
+                                                  for file in request.files])
+            for file, missing in zip(request.files, all_missing):
+                if missing:
+                    results.append(dfs_pb2.CommitFileResponse(status=409, missing=missing))
+                    continue
+                txid = edit_log.log_edit({'op': 'commit', 'file': file.fileName,
+                                          'blocks': encode_refs(file.blocks)})
+                results.append(dfs_pb2.CommitFileResponse(status=200))
+        if txid:
+            edit_log.sync(txid)
+        with counters_lock:
+            packed_files += sum(1 for file in request.files if any(block.block_size for block in file.blocks))
+        print(f"Committed: {len(request.files)} files")
+        return dfs_pb2.CommitFilesResponse(results=results)
+
+    def HasBlocks(self, request, context):
+        """Bloques que ya tiene el clúster; quedan con concesión porque la subida los usará en su CommitFile."""
+        with namespace.write_lock:
+            present = [h for h in request.hashes if namespace.has_block(h)]
+            namespace.lease_blocks(present, UPLOAD_LEASE)
+        return dfs_pb2.HasBlocksResponse(present=present)
+
+    def GetMetrics(self, request, context):
+        metrics = detector.metrics()
+        metrics.update(placement.metrics())
+        metrics.update(replication.metrics())
+        metrics.update(edit_log.metrics())
+        metrics['corrupt_replicas'] = corrupt_replicas
+        metrics['dedup.referenced_blocks'] = len(namespace.refs)
+        metrics['dedup.unreferenced_blocks'] = len(namespace.unreferenced)
+        metrics['dedup.deduplicated_uploads'] = deduplicated_uploads
+        metrics['packing.packed_files'] = packed_files
+        metrics['namespace.version'] = namespace.version
+        metrics['namespace.watchers'] = watchers
+        return dfs_pb2.MetricsResponse(metrics=metrics, status=200)
+
+class AsyncFiles(Files):
+    """
+    Servicer para el modo grpc.aio. Las consultas que sólo leen memoria se atienden en
+    el bucle de eventos, sin pasar por un hilo; el resto (heartbeats, CommitFile con su
+    fsync) sigue siendo síncrono y corre en el pool acotado del servidor.
+    """
+    async def NameNodeDownload(self, request, context):
+        return super().NameNodeDownload(request, context)
+
+    async def GetBlockRange(self, request, context):
+        return super().GetBlockRange(request, context)
+
+    async def FindFile(self, request, context):
+        return super().FindFile(request, context)
+
+    async def WatchNamespace(self, request, context):
+        # Sin hilo por suscriptor: se revisa la versión cada WATCH_POLL_INTERVAL segundos
+        since = request.since
+        while True:
+            change = namespace_change(since)
+            since = change.version
+            yield change
+            waited = 0
+            while namespace.version <= since and waited < WATCH_HEARTBEAT:
+                await asyncio.sleep(WATCH_POLL_INTERVAL)
+                waited += WATCH_POLL_INTERVAL
+
+def namespace_change(since):
+    """Mensaje de WatchNamespace con los cambios posteriores a 'since'."""
+    version, files, listing_version, reset = namespace.changes_since(since)
+    return dfs_pb2.NamespaceChange(version=version, files=files, listing_version=listing_version,
+                                   reset=reset, lease_ms=WATCH_LEASE * 1000)
 
 def checkHeartbeat():
+    """Revisa periódicamente el detector de fallos y olvida las réplicas de los nodos muertos."""
     while True:
-        disconnectedDataNodes = []
-        current_time = time.time()
-
-        for node, node_info in list(nodes.items()):
-            if current_time - node_info['last_heartbeat'] > DISCONNECT_THRESHOLD:
-                print(f"-- Connection lost: {node}")
-                disconnectedDataNodes.append(node)
-                del files[node]
+        for node in detector.check():
+            print(f"-- Connection lost: {node}")
+            lost_blocks = namespace.remove_node(node)
+            nodes.pop(node, None)
+            placement.forget(node)
+            replication.node_lost(node, lost_blocks)
 
-        for node in disconnectedDataNodes:
-            del nodes[node]
+        time.sleep(LIVENESS_CHECK_INTERVAL)
 
-        time.sleep(HEARTBEAT_INTERVAL)
+def replicationMonitor():
+    """
+    Planifica las copias de los bloques con pocas réplicas y, de vez en cuando, revisa
+    todo el espacio de nombres y manda borrar los bloques que ningún archivo usa.
+    """
+    last_scan = time.time()
+    while True:
+        time.sleep(REPLICATION_INTERVAL)
+        if time.time() - last_scan >= REPLICATION_SCAN_INTERVAL:
+            collected = namespace.collect_orphans(ORPHAN_GRACE)
+            if collected:
+                print(f"-- {collected} unreferenced blocks scheduled for deletion")
+            replication.scan()
+            last_scan = time.time()
+        replication.schedule()
     
+def restoreMetadata():
+    """Carga el último snapshot y reaplica las ediciones posteriores antes de atender peticiones."""
+    started = time.time()
+    # Con millones de objetos nuevos el recolector de ciclos dobla el tiempo de carga y no libera nada
+    gc.disable()
+    try:
+        state, edits = edit_log.load()
+        if state:
+            namespace.load_state(state)
+        for record in edits:
+            namespace.apply_edit(record)
+        state = None
+    finally:
+        gc.enable()
+    if hasattr(gc, 'freeze'):
+        gc.freeze()  # Los metadatos cargados viven todo el proceso: que el recolector no los vuelva a recorrer
+    print(f"Metadata restored: {len(namespace.manifests)} files, {len(edits)} edits replayed "
+          f"in {time.time() - started:.2f}s")
+    if len(edits) >= CHECKPOINT_EDITS:
+        checkpoint()
+
+def checkpoint():
+    """Guarda un snapshot de los manifiestos y descarta los segmentos del registro que ya contiene."""
+    with namespace.write_lock:
+        txid = edit_log.roll()
+        manifests = namespace.manifest_state()
+    edit_log.save_snapshot(encode_manifests(manifests), txid)
+    print(f"-- Checkpoint saved at txid {txid} ({len(manifests)} files)")
+
+def checkpointMonitor():
+    """Hace un snapshot cuando se acumulan CHECKPOINT_EDITS ediciones o pasa CHECKPOINT_INTERVAL con cambios."""
+    last_checkpoint = time.time()
+    while True:
+        time.sleep(1)
+        pending = edit_log.pending_edits()
+        if pending >= CHECKPOINT_EDITS or (pending and time.time() - last_checkpoint >= CHECKPOINT_INTERVAL):
+            checkpoint()
+            last_checkpoint = time.time()
+
 def startServer():
-    server = grpc.server(futures.ThreadPoolExecutor())
-    dfs_pb2_grpc.add_dfsServicer_to_server(Files(), server)
+    restoreMetadata()
+    port = PORT
+    if aio_server.enabled():
+        aio_server.serve(AsyncFiles(), port, on_start=lambda: startMonitors(port),
+                         maximum_concurrent_rpcs=MAX_CONCURRENT_RPCS)
+        return
 
-    port = 80080
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=RPC_WORKERS), options=grpc_pool.SERVER_OPTIONS,
+                         maximum_concurrent_rpcs=MAX_CONCURRENT_RPCS)
+    dfs_pb2_grpc.add_dfsServicer_to_server(Files(), server)
     server.add_insecure_port('[::]:'+str(port))
     server.start()
-    print("server started, port: "+str(port))
+    startMonitors(port)
     server.wait_for_termination()
 
+def startMonitors(port):
+    """Arranca los hilos de fondo una vez que el servidor acepta conexiones."""
+    print("server started, port: "+str(port))
+    heartbeat_thread = Thread(target=checkHeartbeat, daemon=True)
+    heartbeat_thread.start()
+    replication_thread = Thread(target=replicationMonitor, daemon=True)
+    replication_thread.start()
+    checkpoint_thread = Thread(target=checkpointMonitor, daemon=True)
+    checkpoint_thread.start()
+
 def main():
     # Iniciar el servidor
     startServer()
@@ -0,0 +1,621 @@
+"""
+Modelo de metadatos del NameNode: archivo -> bloques ordenados -> réplicas.
+
+El espacio de nombres se construye con los reportes de bloques que envía cada
+DataNode: un reporte completo reemplaza lo que se sabía de ese nodo y un
+reporte incremental sólo añade o quita las réplicas que cambiaron.
+Además se mantiene un índice invertido archivo -> DataNodes y un listado
+ordenado en caché, actualizados de forma incremental, para que FindFile y
+NameNodeDownload sean O(1) y ListFiles no recorra todos los nodos.
+
+Los archivos nuevos se guardan direccionados por contenido: cada bloque se
+llama como el SHA-256 de sus bytes y el archivo es un manifiesto con la lista
+de hashes, fijado con CommitFile. Un mismo bloque puede estar en varios
+archivos; se cuentan sus referencias y cuando ningún archivo lo usa durante
+un tiempo se ordena a los DataNodes borrarlo. Los bloques que una subida en curso
+pidió (AllocateBlock) o encontró ya guardados (HasBlocks) tienen una concesión que
+los protege de ese borrado hasta su CommitFile, por larga que sea la subida. Los
+bloques del formato anterior ({archivo}_block_{i}) siguen perteneciendo a un único archivo.
+
+Los archivos pequeños subidos con UploadPacked comparten bloques contenedores: su
+manifiesto tiene una única entrada BlockSlice con la posición del archivo dentro
+del contenedor, y para el resto (referencias, réplicas, layout) el contenedor es un
+bloque más. Así miles de archivos cuestan un bloque en los DataNodes y en los reportes.
+
+Concurrencia: los cambios (reportes, CommitFile, nodos muertos) se serializan
+con write_lock, pero las consultas no toman ese lock. Todo lo que leen se
+publica como copia nueva en lugar de modificarse en su lugar (réplicas de cada
+bloque, bloques y nodos de cada archivo), así una consulta nunca ve un estado a
+medias ni espera a que termine un reporte de bloques. Las cachés por archivo
+se protegen con locks repartidos por el hash del nombre (lock striping).
+
+Cada cambio que puede dejar obsoleta la copia de un cliente (otro manifiesto,
+réplicas perdidas, archivos nuevos o borrados) sube la versión del espacio de
+nombres y queda en un registro corto de cambios, que WatchNamespace entrega a
+los clientes para que invaliden su caché de metadatos.
+"""
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from functools import wraps
+from threading import Condition, Lock, RLock
+
+LAYOUT_STRIPES = 64  # Locks de las cachés por archivo; dos consultas sólo compiten si caen en el mismo
+CHANGE_LOG_SIZE = 4096  # Cambios recordados; un cliente más atrasado vacía toda su caché
+
+
+def _writer(method):
+    """Ejecuta el método con write_lock tomado; es reentrante, así que un cambio puede llamar a otro."""
+    @wraps(method)
+    def locked(self, *args, **kwargs):
+        with self.write_lock:
+            return method(self, *args, **kwargs)
+    return locked
+
+
+class BlockMeta:
+    """
+    Un bloque y los DataNodes que tienen una réplica. Los bloques direccionados por
+    contenido no tienen fileName: los archivos que los usan están en Namespace.refs.
+    replicas es un frozenset que se reemplaza entero en cada cambio.
+    """
+    __slots__ = ('fileName', 'blockName', 'index', 'size', 'checksum', 'replicas')
+    offset = 0  # Un bloque completo empieza en 0; ver BlockSlice
+
+    def __init__(self, fileName, blockName, index, size, checksum):
+        self.fileName = fileName
+        self.blockName = blockName
+        self.index = index
+        self.size = size
+        self.checksum = checksum
+        self.replicas = frozenset()
+
+
+class BlockSlice:
+    """
+    Entrada del manifiesto de un archivo empaquetado: los 'size' bytes desde 'offset'
+    de un bloque contenedor. Se comporta como el bloque en todo lo demás.
+    """
+    __slots__ = ('block', 'offset', 'size')
+    fileName = ""
+    index = 0
+
+    def __init__(self, block, offset, size):
+        self.block = block
+        self.offset = offset
+        self.size = size
+
+    @property
+    def blockName(self):
+        return self.block.blockName
+
+    @property
+    def checksum(self):
+        return self.block.checksum
+
+    @property
+    def replicas(self):
+        return self.block.replicas
+
+
+class Namespace:
+    def __init__(self):
+        self.write_lock = RLock()
+        self._stripes = [Lock() for _ in range(LAYOUT_STRIPES)]
+        self._listing_lock = Lock()
+        self.files = {}        # fileName -> {index: BlockMeta}, se reemplaza entero en cada cambio
+        self.blocks = {}       # blockName -> BlockMeta
+        self.node_blocks = {}  # DataNode -> set(blockName)
+        self.file_nodes = {}   # fileName -> {DataNode: bloques del archivo en ese nodo}, ídem
+        self.listing_version = 0  # Cambia cada vez que aparece o desaparece un archivo
+        self.version = 0       # Cambia con cada entrada de _changes
+        self._changes = deque(maxlen=CHANGE_LOG_SIZE)  # (versión, archivo o None si cambió el listado)
+        self._changed = Condition(Lock())
+        self._listing = None
+        self._layouts = {}     # fileName -> (bloques, offset de cada bloque, tamaño total)
+        self.manifests = {}    # fileName -> [BlockMeta o BlockSlice] de los archivos direccionados por contenido
+        self.refs = {}         # hash -> {fileName: veces que aparece en su manifiesto}
+        self.unreferenced = {} # hash -> desde cuándo tiene réplicas pero ningún archivo lo usa
+        self.invalidated = {}  # DataNode -> set(hash) que debe borrar, se entrega en su heartbeat
+        self.deleting = {}     # hash -> DataNodes con la orden de borrarlo aún sin entregar
+        self.deleted = {}      # hash -> cuándo se entregó la orden de borrarlo; un CommitFile que lo use se rechaza
+        self.leases = {}       # hash -> hasta cuándo lo protege la concesión de una subida en curso
+
+    @_writer
+    def apply_block_report(self, node, block_infos):
+        """Reemplaza los bloques conocidos de un DataNode por los de su reporte."""
+        reported = set()
+        for info in block_infos:
+            self._add_replica(node, info)
+            reported.add(info.blockName)
+
+        for block_name in self.node_blocks.get(node, set()) - reported:
+            self._remove_replica(node, block_name)
+        self.node_blocks[node] = reported
+
+    @_writer
+    def apply_block_delta(self, node, added, removed):
+        """Aplica un reporte incremental; es idempotente, así que reenviarlo no hace daño."""
+        node_blocks = self.node_blocks.setdefault(node, set())
+        for info in added:
+            self._add_replica(node, info)
+            node_blocks.add(info.blockName)
+        for block_name in removed:
+            self._remove_replica(node, block_name)
+            node_blocks.discard(block_name)
+
+    def knows_node(self, node):
+        return node in self.node_blocks
+
+    @_writer
+    def apply_file_list(self, node, file_names):
+        """Reporte en el formato antiguo: cada archivo completo es un único bloque."""
+        self.apply_block_report(node, [_LegacyBlock(name) for name in file_names])
+
+    @_writer
+    def report_bad_block(self, node, block_name):
+        """Olvida una réplica que su DataNode encontró corrupta; devuelve True si se conocía."""
+        return self.drop_replica(node, block_name)
+
+    @_writer
+    def drop_replica(self, node, block_name):
+        """Olvida una réplica (corrupta o sobrante) antes de que llegue el reporte; True si se conocía."""
+        known = block_name in self.node_blocks.get(node, ())
+        self.node_blocks.get(node, set()).discard(block_name)
+        self._remove_replica(node, block_name)
+        return known
+
+    @_writer
+    def remove_node(self, node):
+        """Olvida todas las réplicas del nodo y devuelve los bloques que tenía."""
+        block_names = list(self.node_blocks.pop(node, ()))
+        for block_hash in self.invalidated.pop(node, ()):
+            self._forget_delete(block_hash, node)
+        for block_name in block_names:
+            self._remove_replica(node, block_name)
+        return block_names
+
+    def _add_replica(self, node, info):
+        block = self.blocks.get(info.blockName)
+        if block is None:
+            block = BlockMeta(info.fileName, info.blockName, info.index, info.size, info.checksum)
+            self.blocks[info.blockName] = block
+            if block.fileName:
+                file_blocks = self.files.get(block.fileName)
+                self.files[block.fileName] = {**(file_blocks or {}), block.index: block}
+                if file_blocks is None:
+                    self._listing_changed()
+                self._invalidate_layout(block.fileName)
+            elif info.blockName not in self.refs:
+                # Bloque de una subida aún sin CommitFile (o que nunca lo tendrá)
+                self.unreferenced[info.blockName] = time.time()
+            # Una réplica nueva de un bloque ya borrado: se volvió a subir
+            self.deleted.pop(info.blockName, None)
+        elif info.size and not block.size:
+            block.size = info.size
+            block.checksum = info.checksum
+            for file_name in self._files_of(block):
+                self._invalidate_layout(file_name)
+
+        if node not in block.replicas:
+            block.replicas = block.replicas | {node}
+            for file_name, count in self._files_of(block).items():
+                self._count(file_name, node, count)
+
+    def _remove_replica(self, node, block_name):
+        block = self.blocks.get(block_name)
+        if block is None or node not in block.replicas:
+            return
+        block.replicas = block.replicas - {node}
+
+        for file_name, count in self._files_of(block).items():
+            self._uncount(file_name, node, count)
+            self._record_change(file_name)  # Los clientes podrían seguir leyendo de este nodo
+
+        if not block.replicas and not block.fileName:
+            if block_name in self.refs:
+                # Los archivos que lo usan quedan incompletos hasta que vuelva una réplica
+                for file_name in self.refs[block_name]:
+                    self._invalidate_layout(file_name)
+            else:
+                del self.blocks[block_name]
+                self.unreferenced.pop(block_name, None)
+        elif not block.replicas:
+            # Ningún DataNode tiene ya este bloque
+            del self.blocks[block_name]
+            file_blocks = {index: other for index, other in self.files.get(block.fileName, {}).items()
+                           if index != block.index}
+            if file_blocks:
+                self.files[block.fileName] = file_blocks
+            else:
+                self.files.pop(block.fileName, None)
+                self._listing_changed()
+            self._invalidate_layout(block.fileName)
+
+    def _files_of(self, block):
+        """Archivos que usan el bloque y cuántas veces cada uno."""
+        if block.fileName:
+            return {block.fileName: 1}
+        return self.refs.get(block.blockName, {})
+
+    def _count(self, file_name, node, count):
+        counts = dict(self.file_nodes.get(file_name, {}))
+        counts[node] = counts.get(node, 0) + count
+        self.file_nodes[file_name] = counts
+
+    def _uncount(self, file_name, node, count):
+        counts = dict(self.file_nodes.get(file_name, {}))
+        counts[node] = counts.get(node, count) - count
+        if counts[node] <= 0:
+            del counts[node]
+        if counts:
+            self.file_nodes[file_name] = counts
+        else:
+            self.file_nodes.pop(file_name, None)
+
+    def _stripe(self, fileName):
+        return self._stripes[hash(fileName) % LAYOUT_STRIPES]
+
+    def _invalidate_layout(self, fileName):
+        # Siempre después de publicar el cambio: una consulta que ya tenía el lock guarda
+        # un layout viejo, pero se borra aquí mismo
+        with self._stripe(fileName):
+            self._layouts.pop(fileName, None)
+        self._record_change(fileName)
+
+    def _record_change(self, fileName):
+        with self._changed:
+            self.version += 1
+            self._changes.append((self.version, fileName))
+            self._changed.notify_all()
+
+    def changes_since(self, since):
+        """
+        Cambios posteriores a la versión 'since' como (versión actual, archivos cambiados,
+        listing_version, reset). reset indica que el registro ya no llega tan atrás y
+        el cliente debe olvidar todo lo que tenga en caché.
+        """
+        with self._changed:
+            version = self.version
+            if since >= version:
+                return version, [], self.listing_version, False
+            if not self._changes or self._changes[0][0] > since + 1:
+                return version, [], self.listing_version, True
+            files = set()
+            for changed_version, fileName in reversed(self._changes):
+                if changed_version <= since:
+                    break
+                if fileName is not None:
+                    files.add(fileName)
+            return version, sorted(files), self.listing_version, False
+
+    def wait_for_change(self, since, timeout):
+        """Espera hasta 'timeout' segundos a que la versión pase de 'since'; devuelve True si cambió."""
+        with self._changed:
+            return self._changed.wait_for(lambda: self.version > since, timeout)
+
+    def has_block(self, block_hash):
+        """
+        True si algún DataNode tiene una réplica del bloque. Un bloque con borrado pendiente
+        cuenta como ausente: un manifiesto que lo use lo tiene que volver a subir.
+        """
+        block = self.blocks.get(block_hash)
+        return block is not None and bool(block.replicas) and block_hash not in self.deleting
+
+    @_writer
+    def lease_blocks(self, block_hashes, duration, now=None):
+        """
+        Protege del borrado de huérfanos, durante 'duration' segundos o hasta su CommitFile,
+        los bloques que una subida va a escribir o ya encontró en el clúster.
+        """
+        expires = (now or time.time()) + duration
+        for block_hash in block_hashes:
+            self.leases[block_hash] = max(self.leases.get(block_hash, 0), expires)
+            # Se vuelve a subir un bloque borrado: el CommitFile que lo use ya es válido
+            self.deleted.pop(block_hash, None)
+
+    @_writer
+    def commit_file(self, fileName, refs, uploaded=False):
+        """
+        Fija el manifiesto (lista de BlockRef) de un archivo direccionado por contenido.
+        Devuelve los hashes que impiden fijarlo; vacío si se fijó. Sin 'uploaded' son los
+        que no tienen réplicas conocidas. Con 'uploaded' los bloques se acaban de escribir
+        y su reporte puede no haber llegado, así que sólo se rechazan los que ya se mandaron
+        borrar: el cliente los tiene que volver a subir. Las réplicas que trae cada BlockRef
+        se registran ya, para que el archivo se pueda leer sin esperar a los heartbeats.
+        """
+        missing, created = self._commit(fileName, refs, uploaded)
+        if created:
+            self._listing_changed()
+        return missing
+
+    @_writer
+    def commit_files(self, files):
+        """
+        commit_file de una lista de (archivo, refs, uploaded), como hace UploadPacked. El
+        listado cambia una sola vez para todo el lote. Devuelve los faltantes de cada archivo.
+        """
+        results = []
+        created = False
+        for fileName, refs, uploaded in files:
+            missing, new_file = self._commit(fileName, refs, uploaded)
+            results.append(missing)
+            created = created or new_file
+        if created:
+            self._listing_changed()
+        return results
+
+    def _commit(self, fileName, refs, uploaded):
+        """Devuelve (hashes que impiden fijarlo, si el archivo es nuevo en el listado)."""
+        if uploaded:
+            missing = [ref.hash for ref in refs if ref.hash in self.deleted]
+        else:
+            missing = [ref.hash for ref in refs if not self.has_block(ref.hash)]
+        if missing:
+            return missing, False
+
+        blocks = []
+        for ref in refs:
+            # En un archivo empaquetado el bloque es el contenedor entero
+            block_size = ref.block_size or ref.size
+            block = self.blocks.get(ref.hash)
+            if block is None:
+                block = BlockMeta("", ref.hash, 0, block_size, ref.hash)
+                self.blocks[ref.hash] = block
+            elif not block.size:
+                block.size = block_size
+            for node in ref.replicas:
+                # Un nodo desconocido debe mandar antes su reporte completo
+                if node in self.node_blocks:
+                    self._add_replica(node, block)
+                    self.node_blocks[node].add(ref.hash)
+            blocks.append(BlockSlice(block, ref.offset, ref.size) if ref.block_size else block)
+
+        previous = self.manifests.get(fileName)
+        if previous is not None:
+            self._release(fileName, previous)
+        self.manifests[fileName] = blocks
+        for block in blocks:
+            self._reference(fileName, block)
+        self._invalidate_layout(fileName)
+        return missing, previous is None and fileName not in self.files
+
+    @_writer
+    def manifest_state(self):
+        """
+        Copia de los manifiestos para el snapshot. Es barata porque commit_file nunca
+        modifica una lista ya fijada; se codifica después con encode_manifests, fuera de locks.
+        """
+        return dict(self.manifests)
+
+    @_writer
+    def load_state(self, state):
+        """
+        Restaura los manifiestos de un snapshot al arrancar, con el espacio de nombres vacío.
+        Como aún no hay réplicas se evita el trabajo de commit_file; llegan después con los reportes.
+        """
+        blocks = self.blocks
+        refs = self.refs
+        for name, entries in state.get('files', {}).items():
+            manifest = []
+            for entry in entries:
+                block_hash, size = entry[0], entry[1]
+                # Las entradas de archivos empaquetados traen además [offset, tamaño del contenedor]
+                block_size = entry[3] if len(entry) > 2 else size
+                block = blocks.get(block_hash)
+                if block is None:
+                    block = blocks[block_hash] = BlockMeta("", block_hash, 0, block_size, block_hash)
+                files = refs.get(block_hash)
+                if files is None:
+                    refs[block_hash] = {name: 1}
+                else:
+                    files[name] = files.get(name, 0) + 1
+                manifest.append(BlockSlice(block, entry[2], size) if len(entry) > 2 else block)
+            self.manifests[name] = manifest
+        self._listing_changed()
+
+    @_writer
+    def apply_edit(self, record):
+        """Reaplica una edición del registro al arrancar."""
+        if record['op'] == 'commit':
+            blocks = [_BlockRef(*entry) for entry in record['blocks']]
+            self.commit_file(record['file'], blocks, uploaded=True)
+
+    def _reference(self, fileName, block):
+        files = self.refs.setdefault(block.blockName, {})
+        files[fileName] = files.get(fileName, 0) + 1
+        self.unreferenced.pop(block.blockName, None)
+        self.leases.pop(block.blockName, None)
+        # Si se había ordenado borrarlo y la orden aún no salió, se cancela
+        for node in self.deleting.pop(block.blockName, ()):
+            self.invalidated.get(node, set()).discard(block.blockName)
+        for node in block.replicas:
+            self._count(fileName, node, 1)
+
+    def _release(self, fileName, blocks):
+        """Quita las referencias de un manifiesto reemplazado; los bloques sin uso quedan a la espera de borrarse."""
+        for block in blocks:
+            files = self.refs.get(block.blockName, {})
+            files[fileName] = files.get(fileName, 1) - 1
+            if files[fileName] <= 0:
+                del files[fileName]
+            for node in block.replicas:
+                self._uncount(fileName, node, 1)
+            if not files:
+                self.refs.pop(block.blockName, None)
+                if block.replicas:
+                    self.unreferenced[block.blockName] = time.time()
+                else:
+                    self.blocks.pop(block.blockName, None)
+
+    @_writer
+    def collect_orphans(self, grace, now=None):
+        """
+        Ordena borrar los bloques que llevan más de 'grace' segundos sin ningún archivo
+        que los use (manifiestos reemplazados o subidas que nunca hicieron CommitFile).
+        Los bloques con la concesión de una subida en curso esperan a que venza.
+        """
+        now = now or time.time()
+        for block_hash, expires in list(self.leases.items()):
+            if expires <= now:
+                del self.leases[block_hash]
+        for block_hash, since in list(self.deleted.items()):
+            if now - since >= grace:
+                del self.deleted[block_hash]
+        collected = 0
+        for block_hash, since in list(self.unreferenced.items()):
+            if now - since < grace or block_hash in self.leases:
+                continue
+            del self.unreferenced[block_hash]
+            block = self.blocks.get(block_hash)
+            if block is None:
+                continue
+            for node in block.replicas:
+                self.invalidated.setdefault(node, set()).add(block_hash)
+                self.deleting.setdefault(block_hash, set()).add(node)
+            collected += 1
+        return collected
+
+    @_writer
+    def invalidations_for(self, node):
+        """
+        Bloques que el DataNode debe borrar; se entregan una sola vez. Desde ese momento
+        la réplica ya no cuenta, aunque su reporte de borrado llegue después. Si una subida
+        volvió a pedir el bloque después de ordenar el borrado, la orden no se entrega.
+        """
+        now = time.time()
+        block_hashes = []
+        for block_hash in sorted(self.invalidated.pop(node, ())):
+            self._forget_delete(block_hash, node)
+            if self.leases.get(block_hash, 0) > now:
+                self.unreferenced.setdefault(block_hash, now)
+                continue
+            self.deleted[block_hash] = now
+            self.node_blocks.get(node, set()).discard(block_hash)
+            self._remove_replica(node, block_hash)
+            block_hashes.append(block_hash)
+        return block_hashes
+
+    def _forget_delete(self, block_hash, node):
+        nodes = self.deleting.get(block_hash)
+        if nodes is not None:
+            nodes.discard(node)
+            if not nodes:
+                del self.deleting[block_hash]
+
+    def _listing_changed(self):
+        with self._listing_lock:
+            self.listing_version += 1
+            self._listing = None
+        self._record_change(None)
+
+    def get_blocks(self, fileName):
+        """
+        Devuelve los bloques del archivo ordenados por índice, o None si el archivo
+        no existe o le falta algún bloque.
+        """
+        manifest = self.manifests.get(fileName)
+        if manifest is not None:
+            return manifest if all(block.replicas for block in manifest) else None
+
+        file_blocks = self.files.get(fileName)
+        if not file_blocks:
+            return None
+        ordered = [file_blocks.get(index) for index in range(len(file_blocks))]
+        if None in ordered:
+            return None
+        return ordered
+
+    def get_layout(self, fileName):
+        """
+        Devuelve (bloques, offset de inicio de cada bloque, tamaño del archivo) o None.
+        Se guarda en caché hasta que cambian los bloques del archivo.
+        """
+        layout = self._layouts.get(fileName)
+        if layout is not None:
+            return layout
+        with self._stripe(fileName):
+            layout = self._layouts.get(fileName)
+            if layout is None:
+                blocks = self.get_blocks(fileName)
+                if blocks is None:
+                    return None
+                offsets = []
+                total = 0
+                for block in blocks:
+                    offsets.append(total)
+                    total += block.size
+                layout = (blocks, offsets, total)
+                self._layouts[fileName] = layout
+            return layout
+
+    def blocks_in_range(self, fileName, offset, length):
+        """
+        Bloques que cubren [offset, offset + length) (length 0 = hasta el final) como
+        (posición, bloque, offset del bloque), junto con el tamaño del archivo; None si no existe.
+        """
+        if offset < 0 or length < 0:
+            raise ValueError("offset and length must not be negative")
+        layout = self.get_layout(fileName)
+        if layout is None:
+            return None
+        blocks, offsets, total = layout
+        end = min(offset + length, total) if length > 0 else total
+        if offset >= end:
+            return [], total
+        first = bisect_right(offsets, offset) - 1
+        last = bisect_left(offsets, end)
+        return [(i, blocks[i], offsets[i]) for i in range(first, last)], total
+
+    def file_names(self):
+        """Listado ordenado de archivos; sólo se reconstruye si cambió desde la última vez."""
+        with self._listing_lock:
+            if self._listing is None:
+                self._listing = sorted(set(self.files) | set(self.manifests))
+            return self._listing
+
+    def nodes_for_file(self, fileName):
+        """DataNodes que tienen al menos un bloque del archivo."""
+        return sorted(self.file_nodes.get(fileName, ()))
+
+    def block_count(self, node):
+        return len(self.node_blocks.get(node, ()))
+
+
+def encode_manifests(manifests):
+    """
+    Formato del snapshot: {'files': {archivo: [[hash, tamaño], ...]}}; las entradas de
+    archivos empaquetados son [hash, tamaño, offset, tamaño del contenedor].
+    """
+    return {'files': {name: [[block.blockName, block.size, block.offset, block.block.size]
+                             if isinstance(block, BlockSlice) else [block.blockName, block.size]
+                             for block in blocks]
+                      for name, blocks in manifests.items()}}
+
+
+def encode_refs(refs):
+    """Bloques de CommitFile en el formato del registro de ediciones, el mismo del snapshot."""
+    return [[ref.hash, ref.size, ref.offset, ref.block_size] if ref.block_size else [ref.hash, ref.size]
+            for ref in refs]
+
+
+class _BlockRef:
+    __slots__ = ('hash', 'size', 'offset', 'block_size')
+    replicas = ()  # Al reaplicar el registro las réplicas llegan con los reportes
+
+    def __init__(self, block_hash, size, offset=0, block_size=0):
+        self.hash = block_hash
+        self.size = size
+        self.offset = offset
+        self.block_size = block_size
+
+
+class _LegacyBlock:
+    __slots__ = ('fileName', 'blockName', 'index', 'size', 'checksum')
+
+    def __init__(self, name):
+        self.fileName = name
+        self.blockName = name
+        self.index = 0
+        self.size = 0
+        self.checksum = ""
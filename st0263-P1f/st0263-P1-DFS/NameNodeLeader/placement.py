@@ -0,0 +1,103 @@
+"""
+Motor de colocación de réplicas del NameNode.
+
+Elige los DataNodes de cada bloque con las métricas que cada nodo envía en su
+heartbeat (espacio libre, transferencias en curso y E/S reciente). Entre dos
+heartbeats también cuenta lo que ya se le asignó a cada nodo, para que una
+ráfaga de bloques no caiga toda en el mismo nodo.
+"""
+import random
+from threading import Lock
+
+USAGE_WEIGHT = 1.0       # Peso de la fracción de disco ocupada
+TRANSFER_WEIGHT = 0.5    # Peso de las transferencias en curso (incluidas las asignadas)
+THROUGHPUT_WEIGHT = 0.25 # Peso de la E/S reciente, relativa al nodo más ocupado
+TRANSFER_SCALE = 8       # Transferencias a partir de las cuales el término de carga vale 1
+
+
+class _NodeLoad:
+    __slots__ = ('capacity', 'free_space', 'inflight', 'throughput', 'pending_bytes', 'pending_transfers')
+
+    def __init__(self):
+        self.capacity = 0
+        self.free_space = 0
+        self.inflight = 0
+        self.throughput = 0.0
+        self.pending_bytes = 0
+        self.pending_transfers = 0
+
+
+class PlacementEngine:
+    def __init__(self, detector):
+        self.detector = detector
+        self.lock = Lock()
+        self.loads = {}
+
+    def update(self, node, metrics):
+        """Guarda las métricas del heartbeat; las asignaciones anteriores ya están reflejadas en ellas."""
+        with self.lock:
+            load = self.loads.setdefault(node, _NodeLoad())
+            load.capacity = metrics.capacity
+            load.free_space = metrics.free_space
+            load.inflight = metrics.inflight_transfers
+            load.throughput = metrics.throughput_bps
+            load.pending_bytes = 0
+            load.pending_transfers = 0
+
+    def forget(self, node):
+        with self.lock:
+            self.loads.pop(node, None)
+
+    def choose(self, count, size=0, exclude=()):
+        """
+        Devuelve hasta 'count' DataNodes vivos para un bloque de 'size' bytes,
+        ordenados del más al menos conveniente, y les anota la asignación.
+        """
+        with self.lock:
+            candidates = [node for node in self.detector.alive_nodes() if node not in exclude]
+            max_throughput = max([self._load(node).throughput for node in candidates] + [1.0])
+
+            scored = []
+            for node in candidates:
+                load = self._load(node)
+                if load.capacity and load.free_space - load.pending_bytes < size:
+                    continue  # No cabe el bloque
+                # El desempate aleatorio reparte los nodos con la misma puntuación
+                scored.append((self._score(load, max_throughput), random.random(), node))
+            scored.sort()
+
+            chosen = [node for _, _, node in scored[:count]]
+            for node in chosen:
+                load = self._load(node)
+                load.pending_bytes += size
+                load.pending_transfers += 1
+            return chosen
+
+    def busiest(self, nodes):
+        """El más cargado de 'nodes' según la misma puntuación que choose."""
+        with self.lock:
+            max_throughput = max([self._load(node).throughput for node in nodes] + [1.0])
+            return max(nodes, key=lambda node: (self._score(self._load(node), max_throughput), node))
+
+    def _load(self, node):
+        return self.loads.setdefault(node, _NodeLoad())
+
+    def _score(self, load, max_throughput):
+        if load.capacity:
+            usage = 1.0 - (load.free_space - load.pending_bytes) / load.capacity
+        else:
+            usage = 0.5  # Nodo que aún no reportó métricas
+        transfers = min((load.inflight + load.pending_transfers) / TRANSFER_SCALE, 1.0)
+        throughput = load.throughput / max_throughput
+        return USAGE_WEIGHT * usage + TRANSFER_WEIGHT * transfers + THROUGHPUT_WEIGHT * throughput
+
+    def metrics(self):
+        with self.lock:
+            loads = dict(self.loads)
+        metrics = {}
+        for node, load in loads.items():
+            if load.capacity:
+                metrics[f'placement.{node}.usage'] = 1.0 - load.free_space / load.capacity
+            metrics[f'placement.{node}.inflight'] = load.inflight + load.pending_transfers
+            metrics[f'placement.{node}.throughput_bps'] = load.throughput
+        return metrics
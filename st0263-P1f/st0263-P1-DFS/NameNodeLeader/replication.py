@@ -0,0 +1,214 @@
+"""
+Gestor de re-replicación del NameNode.
+
+Cuando un DataNode muere o reporta una réplica corrupta, sus bloques quedan con
+menos réplicas que REPLICATION_FACTOR. Esos bloques entran en una cola de prioridad
+ordenada por réplicas restantes (primero los que sólo tienen una) y un planificador
+periódico asigna copias DataNode -> DataNode. Las órdenes viajan en la respuesta al
+heartbeat del nodo origen; la copia se da por terminada cuando el destino reporta el
+bloque, o se reintenta si no lo hace a tiempo. Cada nodo participa como mucho en
+max_streams copias a la vez (como origen o como destino), para no saturar el clúster.
+
+Al revés, un bloque con más réplicas vivas que REPLICATION_FACTOR (p. ej. cuando vuelve
+un nodo que se dio por muerto y ya se había re-replicado) pierde las que sobran: se
+ordena borrar la del nodo más cargado, también en la respuesta a su heartbeat.
+"""
+import heapq
+import itertools
+import time
+from threading import Lock
+
+MAX_STREAMS_PER_NODE = 2  # Copias simultáneas en las que puede participar un DataNode
+COPY_TIMEOUT = 60         # Segundos para que el destino reporte la copia antes de reintentarla
+
+
+class ReplicationManager:
+    def __init__(self, namespace, detector, placement, replication=2,
+                 max_streams=MAX_STREAMS_PER_NODE, copy_timeout=COPY_TIMEOUT):
+        self.namespace = namespace
+        self.detector = detector
+        self.placement = placement
+        self.replication = replication
+        self.max_streams = max_streams
+        self.copy_timeout = copy_timeout
+        self.lock = Lock()
+        self.queue = []        # (réplicas restantes, orden de llegada, blockName)
+        self.queued = set()
+        self.pending = {}      # blockName -> {destino: (origen, inicio)}
+        self.commands = {}     # origen -> [(blockName, [destinos])] por entregar en su heartbeat
+        self.trims = {}        # DataNode -> set(blockName) de réplicas sobrantes que debe borrar
+        self.trimming = set()  # Bloques con una réplica sobrante ya elegida para borrar
+        self.streams = {}      # DataNode -> copias en curso
+        self.order = itertools.count()
+        self.completed = 0
+        self.timeouts = 0
+        self.trimmed = 0
+        self.copy_seconds = 0.0
+        self.recovery_started = None
+        self.last_recovery = 0.0
+
+    def replica_lost(self, block_names):
+        """Encola los bloques que perdieron una réplica y arranca el reloj de recuperación."""
+        with self.lock:
+            added = sum(1 for name in block_names if self._check(name))
+            if added and self.recovery_started is None:
+                self.recovery_started = time.time()
+
+    def node_lost(self, node, block_names):
+        """Un DataNode murió: se cancelan sus copias y se encolan los bloques que tenía."""
+        with self.lock:
+            self.commands.pop(node, None)
+            for block_name in self.trims.pop(node, ()):
+                self.trimming.discard(block_name)
+            for block_name, copies in list(self.pending.items()):
+                for target, (source, _) in list(copies.items()):
+                    if node in (source, target):
+                        self._finish(block_name, target, source)
+        self.replica_lost(block_names)
+
+    def scan(self):
+        """Revisa todos los bloques, por si alguno quedó corto sin pasar por replica_lost (p. ej. una subida parcial)."""
+        with self.lock:
+            for block_name in list(self.namespace.blocks):
+                self._check(block_name)
+
+    def _check(self, block_name):
+        block = self.namespace.blocks.get(block_name)
+        if block is None or not block.replicas or block_name in self.queued:
+            return False
+        if block_name in self.namespace.unreferenced:
+            return False  # Se va a borrar: no vale la pena copiarlo
+        remaining = len(block.replicas)
+        if remaining + len(self.pending.get(block_name, ())) >= self.replication:
+            self._check_excess(block_name, block)
+            return False
+        heapq.heappush(self.queue, (remaining, next(self.order), block_name))
+        self.queued.add(block_name)
+        return True
+
+    def _check_excess(self, block_name, block):
+        """Si sobran réplicas vivas, elige la del nodo más cargado para borrarla."""
+        if block_name in self.trimming or block_name in self.pending:
+            return
+        alive = [node for node in block.replicas if self.detector.is_alive(node)]
+        if len(alive) <= self.replication:
+            return
+        node = self.placement.busiest(alive)
+        self.trims.setdefault(node, set()).add(block_name)
+        self.trimming.add(block_name)
+
+    def trims_for(self, node):
+        """
+        Réplicas sobrantes que el DataNode debe borrar; se entregan una sola vez. Se vuelve
+        a comprobar que sigan sobrando y desde ese momento la réplica ya no cuenta.
+        """
+        with self.lock:
+            trimmed = []
+            for block_name in sorted(self.trims.pop(node, ())):
+                self.trimming.discard(block_name)
+                block = self.namespace.blocks.get(block_name)
+                if block is None or node not in block.replicas or block_name in self.pending:
+                    continue
+                others = [other for other in block.replicas if other != node and self.detector.is_alive(other)]
+                if len(others) < self.replication:
+                    continue
+                self.namespace.drop_replica(node, block_name)
+                trimmed.append(block_name)
+            self.trimmed += len(trimmed)
+            return trimmed
+
+    def _has_slot(self, node):
+        return self.streams.get(node, 0) < self.max_streams
+
+    def _finish(self, block_name, target, source):
+        copies = self.pending.get(block_name, {})
+        copies.pop(target, None)
+        if not copies:
+            self.pending.pop(block_name, None)
+        for node in (source, target):
+            self.streams[node] = self.streams.get(node, 1) - 1
+            if self.streams[node] <= 0:
+                del self.streams[node]
+
+    def _collect(self, now):
+        """Da por terminadas las copias que el destino ya reportó y reencola las que vencieron."""
+        for block_name, copies in list(self.pending.items()):
+            block = self.namespace.blocks.get(block_name)
+            for target, (source, started) in list(copies.items()):
+                if block is not None and target in block.replicas:
+                    self.completed += 1
+                    self.copy_seconds += now - started
+                    self._finish(block_name, target, source)
+                elif block is None or now - started > self.copy_timeout:
+                    self.timeouts += 1
+                    self._finish(block_name, target, source)
+                    self._check(block_name)
+
+    def schedule(self, now=None):
+        """Asigna copias en orden de prioridad respetando el límite de copias por nodo."""
+        now = now or time.time()
+        with self.lock:
+            self._collect(now)
+            deferred = []
+            while self.queue:
+                item = heapq.heappop(self.queue)
+                block_name = item[2]
+                self.queued.discard(block_name)
+                block = self.namespace.blocks.get(block_name)
+                if block is None:
+                    continue
+                copies = self.pending.setdefault(block_name, {})
+                missing = self.replication - len(block.replicas) - len(copies)
+                if missing <= 0:
+                    if not copies:
+                        del self.pending[block_name]
+                    continue
+
+                # El origen debe estar vivo (no sólo sospechoso) y con capacidad libre
+                sources = [node for node in block.replicas if self.detector.is_alive(node) and self._has_slot(node)]
+                busy = [node for node in self.streams if not self._has_slot(node)]
+                exclude = set(block.replicas) | set(copies) | set(busy)
+                targets = self.placement.choose(missing, block.size, exclude) if sources else []
+                for target in targets:
+                    source = min((node for node in sources if self._has_slot(node)),
+                                 key=lambda node: self.streams.get(node, 0), default=None)
+                    if source is None:
+                        break
+                    copies[target] = (source, now)
+                    self.commands.setdefault(source, []).append((block_name, [target]))
+                    for node in (source, target):
+                        self.streams[node] = self.streams.get(node, 0) + 1
+                    missing -= 1
+                if not copies:
+                    del self.pending[block_name]
+                if missing > 0:
+                    deferred.append(item)
+
+            for item in deferred:
+                heapq.heappush(self.queue, item)
+                self.queued.add(item[2])
+
+            if self.recovery_started is not None and not self.queue and not self.pending:
+                self.last_recovery = now - self.recovery_started
+                self.recovery_started = None
+                print(f"-- Replication recovered in {self.last_recovery:.1f}s")
+
+    def commands_for(self, node):
+        """Órdenes de copia pendientes para el DataNode origen; se entregan una sola vez."""
+        with self.lock:
+            return self.commands.pop(node, [])
+
+    def metrics(self):
+        with self.lock:
+            recovering = time.time() - self.recovery_started if self.recovery_started is not None else 0.0
+            return {
+                'replication.under_replicated': len(self.queue),
+                'replication.pending_copies': sum(len(copies) for copies in self.pending.values()),
+                'replication.over_replicated': len(self.trimming),
+                'replication.trimmed_replicas': self.trimmed,
+                'replication.completed_copies': self.completed,
+                'replication.timed_out_copies': self.timeouts,
+                'replication.avg_copy_seconds': self.copy_seconds / self.completed if self.completed else 0.0,
+                'replication.recovering_seconds': recovering,
+                'replication.last_recovery_seconds': self.last_recovery,
+            }
@@ -0,0 +1,108 @@
+"""
+Pruebas del espacio de nombres sin levantar el NameNode:
+
+    python -m unittest test_metadata
+"""
+import unittest
+
+from metadata import Namespace, _BlockRef
+
+
+class Ref(_BlockRef):
+    """BlockRef de CommitFile con las réplicas que informa el DataNode que subió el archivo."""
+    __slots__ = ('replicas',)
+
+    def __init__(self, block_hash, size, replicas=(), offset=0, block_size=0):
+        super().__init__(block_hash, size, offset, block_size)
+        self.replicas = list(replicas)
+
+
+class Stored:
+    """BlockInfo de un bloque direccionado por contenido, como llega en un reporte."""
+    def __init__(self, block_hash, size=10):
+        self.fileName = ""
+        self.blockName = block_hash
+        self.index = 0
+        self.size = size
+        self.checksum = block_hash
+
+
+class ReadAfterPutTest(unittest.TestCase):
+    def setUp(self):
+        self.namespace = Namespace()
+        # Nodos ya registrados, con su reporte completo
+        self.namespace.apply_block_report('dn1', [])
+        self.namespace.apply_block_report('dn2', [])
+
+    def test_file_is_readable_right_after_commit(self):
+        refs = [Ref('a', 10, ['dn1', 'dn2']), Ref('b', 5, ['dn1', 'dn2'])]
+        self.assertEqual(self.namespace.commit_file('f', refs, uploaded=True), [])
+
+        blocks, offsets, size = self.namespace.get_layout('f')
+        self.assertEqual([block.blockName for block in blocks], ['a', 'b'])
+        self.assertEqual(offsets, [0, 10])
+        self.assertEqual(size, 15)
+        self.assertEqual(blocks[0].replicas, {'dn1', 'dn2'})
+        self.assertEqual(self.namespace.nodes_for_file('f'), ['dn1', 'dn2'])
+        self.assertEqual(self.namespace.block_count('dn1'), 2)
+
+    def test_packed_files_are_readable_right_after_commit(self):
+        self.namespace.commit_files([
+            ('p1', [Ref('c', 4, ['dn1', 'dn2'], offset=0, block_size=10)], True),
+            ('p2', [Ref('c', 6, ['dn1', 'dn2'], offset=4, block_size=10)], True),
+        ])
+        found, size = self.namespace.blocks_in_range('p2', 0, 0)
+        self.assertEqual(size, 6)
+        self.assertEqual(found[0][1].offset, 4)
+        self.assertEqual(found[0][1].replicas, {'dn1', 'dn2'})
+
+    def test_unknown_nodes_wait_for_their_full_report(self):
+        self.namespace.commit_file('f', [Ref('a', 10, ['dn1', 'dn9'])], uploaded=True)
+        self.assertEqual(self.namespace.blocks['a'].replicas, {'dn1'})
+        self.assertFalse(self.namespace.knows_node('dn9'))
+
+    def test_later_block_report_is_idempotent(self):
+        self.namespace.commit_file('f', [Ref('a', 10, ['dn1'])], uploaded=True)
+        self.namespace.apply_block_delta('dn1', [Stored('a')], [])
+        self.assertEqual(self.namespace.nodes_for_file('f'), ['dn1'])
+        self.assertNotIn('a', self.namespace.unreferenced)
+
+
+class UploadLeaseTest(unittest.TestCase):
+    def setUp(self):
+        self.namespace = Namespace()
+        self.namespace.apply_block_report('dn1', [])
+
+    def report_old_block(self, block_hash):
+        self.namespace.apply_block_delta('dn1', [Stored(block_hash)], [])
+        self.namespace.unreferenced[block_hash] -= 1000
+
+    def test_leased_block_survives_orphan_collection(self):
+        self.namespace.lease_blocks(['a'], 3600)
+        self.report_old_block('a')
+        self.assertEqual(self.namespace.collect_orphans(600), 0)
+        self.assertEqual(self.namespace.commit_file('f', [Ref('a', 10)], uploaded=True), [])
+        self.assertIsNotNone(self.namespace.get_blocks('f'))
+
+    def test_commit_of_deleted_block_is_rejected_until_uploaded_again(self):
+        self.report_old_block('a')
+        self.assertEqual(self.namespace.collect_orphans(600), 1)
+        self.assertEqual(self.namespace.invalidations_for('dn1'), ['a'])
+
+        self.assertEqual(self.namespace.commit_file('f', [Ref('a', 10)], uploaded=True), ['a'])
+        self.assertNotIn('f', self.namespace.manifests)
+
+        self.namespace.lease_blocks(['a'], 3600)
+        self.assertEqual(self.namespace.commit_file('f', [Ref('a', 10, ['dn1'])], uploaded=True), [])
+        self.assertIsNotNone(self.namespace.get_blocks('f'))
+
+    def test_delete_is_withheld_if_an_upload_asks_for_the_block(self):
+        self.report_old_block('a')
+        self.assertEqual(self.namespace.collect_orphans(600), 1)
+        self.namespace.lease_blocks(['a'], 3600)
+        self.assertEqual(self.namespace.invalidations_for('dn1'), [])
+        self.assertEqual(self.namespace.blocks['a'].replicas, {'dn1'})
+
+
+if __name__ == '__main__':
+    unittest.main()
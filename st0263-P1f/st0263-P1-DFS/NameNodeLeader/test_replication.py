@@ -0,0 +1,103 @@
+"""
+Pruebas del gestor de re-replicación con un espacio de nombres real y nodos simulados:
+
+    python -m unittest test_replication
+"""
+import unittest
+
+from metadata import Namespace
+from replication import ReplicationManager
+from test_metadata import Ref
+
+
+class FakeDetector:
+    def __init__(self, alive):
+        self.alive = set(alive)
+
+    def is_alive(self, node):
+        return node in self.alive
+
+    def alive_nodes(self):
+        return sorted(self.alive)
+
+
+class FakePlacement:
+    """Carga fija por nodo; choose devuelve los menos cargados y busiest el más cargado."""
+    def __init__(self, loads):
+        self.loads = loads
+
+    def choose(self, count, size=0, exclude=()):
+        return sorted((node for node in self.loads if node not in exclude), key=self.loads.get)[:count]
+
+    def busiest(self, nodes):
+        return max(nodes, key=self.loads.get)
+
+
+class OverReplicationTest(unittest.TestCase):
+    def setUp(self):
+        self.namespace = Namespace()
+        for node in ('dn1', 'dn2', 'dn3'):
+            self.namespace.apply_block_report(node, [])
+        self.detector = FakeDetector(['dn1', 'dn2', 'dn3'])
+        self.placement = FakePlacement({'dn1': 0.1, 'dn2': 0.9, 'dn3': 0.5})
+        self.replication = ReplicationManager(self.namespace, self.detector, self.placement, replication=2)
+
+    def commit(self, block_hash, replicas):
+        self.namespace.commit_file('f-' + block_hash, [Ref(block_hash, 10, replicas)], uploaded=True)
+
+    def test_extra_replica_on_the_busiest_node_is_trimmed(self):
+        self.commit('a', ['dn1', 'dn2', 'dn3'])
+        self.replication.scan()
+
+        self.assertEqual(self.replication.trims_for('dn1'), [])
+        self.assertEqual(self.replication.trims_for('dn2'), ['a'])
+        self.assertEqual(self.namespace.blocks['a'].replicas, {'dn1', 'dn3'})
+        self.assertEqual(self.namespace.nodes_for_file('f-a'), ['dn1', 'dn3'])
+        self.assertEqual(self.replication.metrics()['replication.trimmed_replicas'], 1)
+
+        # Ya no sobra nada: otra revisión no ordena más borrados
+        self.replication.scan()
+        self.assertEqual(self.replication.trims_for('dn1') + self.replication.trims_for('dn3'), [])
+
+    def test_replicas_on_dead_nodes_do_not_count(self):
+        self.commit('a', ['dn1', 'dn2', 'dn3'])
+        self.detector.alive.discard('dn3')
+        self.replication.scan()
+        self.assertEqual(self.replication.trims_for('dn2'), [])
+        self.assertEqual(self.namespace.blocks['a'].replicas, {'dn1', 'dn2', 'dn3'})
+
+    def test_trim_is_withheld_if_a_replica_was_lost_meanwhile(self):
+        self.commit('a', ['dn1', 'dn2', 'dn3'])
+        self.replication.scan()
+        self.namespace.report_bad_block('dn1', 'a')
+        self.assertEqual(self.replication.trims_for('dn2'), [])
+        self.assertEqual(self.namespace.blocks['a'].replicas, {'dn2', 'dn3'})
+
+    def test_returning_node_after_re_replication(self):
+        self.commit('a', ['dn1', 'dn2'])
+        self.detector.alive.discard('dn2')
+        lost = self.namespace.remove_node('dn2')
+        self.replication.node_lost('dn2', lost)
+        self.replication.schedule()
+        self.assertEqual(self.replication.commands_for('dn1'), [('a', ['dn3'])])
+
+        # La copia llega a dn3 y luego vuelve dn2 con su reporte completo
+        self.namespace.apply_block_delta('dn3', [self.namespace.blocks['a']], [])
+        self.replication.schedule()
+        self.detector.alive.add('dn2')
+        self.namespace.apply_block_report('dn2', [self.namespace.blocks['a']])
+        self.replication.scan()
+
+        self.assertEqual(self.replication.trims_for('dn2'), ['a'])
+        self.assertEqual(self.namespace.blocks['a'].replicas, {'dn1', 'dn3'})
+
+    def test_under_replicated_blocks_are_still_copied(self):
+        self.commit('a', ['dn1'])
+        self.replication.scan()
+        self.replication.schedule()
+        self.assertEqual(self.replication.commands_for('dn1'), [('a', ['dn3'])])
+        self.assertEqual(self.replication.trims_for('dn1'), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+"""
+Modo asyncio (grpc.aio) para los servidores del NameNode y de los DataNodes.
+
+Con GRPC_SERVER_MODE=aio el servidor corre en un bucle de eventos. Los métodos del
+servicer escritos como corrutinas o generadores asíncronos se atienden sin ocupar un
+hilo por llamada; los que siguen siendo síncronos se ejecutan en un pool acotado de
+AIO_SYNC_WORKERS hilos. La E/S de disco de los métodos asíncronos se hace en io_executor
+(run_blocking, iterate_blocking) para que el bucle nunca espere al disco.
+
+La configuración se lee al arrancar el servidor (enabled, serve) y no al importar este
+módulo, así vale también la que el main carga del .env.
+"""
+import asyncio
+import os
+from concurrent import futures
+
+import grpc
+
+import dfs_pb2_grpc
+import grpc_pool
+
+SERVER_MODE = "threads"  # GRPC_SERVER_MODE: "threads" (grpc.server) o "aio" (grpc.aio.server)
+IO_WORKERS = 16          # AIO_IO_WORKERS: lecturas de disco simultáneas de los métodos asíncronos
+SYNC_WORKERS = 32        # AIO_SYNC_WORKERS: hilos para los métodos que siguen siendo síncronos
+
+io_executor = None  # Se crea en serve(), en el proceso que atiende las llamadas
+
+_DONE = object()
+
+
+def enabled():
+    return os.getenv("GRPC_SERVER_MODE", SERVER_MODE) == "aio"
+
+
+async def run_blocking(function, *args):
+    """Ejecuta una función bloqueante en io_executor y espera su resultado sin bloquear el bucle."""
+    return await asyncio.get_running_loop().run_in_executor(io_executor, function, *args)
+
+
+async def iterate_blocking(iterator):
+    """
+    Recorre un iterador síncrono (p. ej. un generador que lee de disco) pidiendo cada
+    elemento en io_executor. Entre elemento y elemento la llamada no ocupa ningún hilo.
+    """
+    iterator = iter(iterator)
+    try:
+        while True:
+            item = await run_blocking(next, iterator, _DONE)
+            if item is _DONE:
+                return
+            yield item
+    finally:
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            try:
+                close()
+            except ValueError:
+                pass  # Cancelada mientras un hilo leía: el generador se cierra cuando se libere
+
+
+def raise_file_limit():
+    """Sube el límite de descriptores abiertos al máximo permitido: cada descarga en curso tiene su archivo abierto."""
+    try:
+        import resource
+    except ImportError:
+        return  # Windows
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+        except (ValueError, OSError):
+            pass
+
+
+def serve(servicer, port, on_start=None, maximum_concurrent_rpcs=None, options=grpc_pool.SERVER_OPTIONS):
+    """Arranca un servidor grpc.aio con el servicer en el puerto y bloquea hasta que termine."""
+    global io_executor
+    io_executor = futures.ThreadPoolExecutor(max_workers=int(os.getenv("AIO_IO_WORKERS", str(IO_WORKERS))),
+                                             thread_name_prefix="aio-io")
+    asyncio.run(_serve(servicer, port, on_start, maximum_concurrent_rpcs, options))
+
+
+async def _serve(servicer, port, on_start, maximum_concurrent_rpcs, options):
+    raise_file_limit()
+    sync_workers = int(os.getenv("AIO_SYNC_WORKERS", str(SYNC_WORKERS)))
+    server = grpc.aio.server(migration_thread_pool=futures.ThreadPoolExecutor(max_workers=sync_workers),
+                             options=options, maximum_concurrent_rpcs=maximum_concurrent_rpcs)
+    dfs_pb2_grpc.add_dfsServicer_to_server(servicer, server)
+    server.add_insecure_port('[::]:' + str(port))
+    await server.start()
+    if on_start is not None:
+        on_start()
+    await server.wait_for_termination()
@@ -0,0 +1,109 @@
+"""
+Checksums CRC32C por partes para los bloques del DFS.
+
+Cada bloque se divide en partes de BYTES_PER_CHECKSUM bytes y de cada una se
+guarda su CRC32C. Así un DataNode puede verificar sólo las partes que lee (por
+ejemplo en una lectura por rango) y detectar corrupción sin releer el bloque entero.
+El paquete 'crc32c' está en los requirements del DataNode y del CLI (también sirve
+'google-crc32c'). Sin ninguno se usa una versión en Python puro, correcta pero unas
+cien veces más lenta (unos 6 MB/s), y se avisa al importar el módulo.
+"""
+import warnings
+
+BYTES_PER_CHECKSUM = 64 * 1024
+
+try:
+    from crc32c import crc32c as _native_crc32c
+except ImportError:
+    try:
+        from google_crc32c import extend as _google_extend
+
+        def _native_crc32c(data, value=0):
+            return _google_extend(value, bytes(data))
+    except ImportError:
+        _native_crc32c = None
+
+
+class ChecksumError(Exception):
+    """Los datos leídos no coinciden con el checksum guardado."""
+    def __init__(self, chunk_index):
+        super().__init__(f"checksum mismatch in chunk {chunk_index}")
+        self.chunk_index = chunk_index
+
+
+def _make_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = (crc >> 1) ^ 0x82F63B78 if crc & 1 else crc >> 1
+        table.append(crc)
+    return table
+
+_TABLE = _make_table()
+
+
+def _python_crc32c(data, value=0):
+    crc = value ^ 0xFFFFFFFF
+    table = _TABLE
+    for byte in bytes(data):
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+crc32c = _native_crc32c or _python_crc32c
+NATIVE = _native_crc32c is not None
+if not NATIVE:
+    warnings.warn("CRC32C nativo no disponible: se usa la versión en Python puro, que limita "
+                  "lecturas y subidas a unos 6 MB/s. Instalar con: pip install crc32c", RuntimeWarning)
+
+
+def chunk_checksums(data, bytes_per_checksum=BYTES_PER_CHECKSUM):
+    """CRC32C de cada parte de bytes_per_checksum bytes de data."""
+    view = memoryview(data)
+    return [crc32c(view[start:start + bytes_per_checksum]) for start in range(0, len(view), bytes_per_checksum)]
+
+
+def verify_chunks(data, position, checksums, bytes_per_checksum=BYTES_PER_CHECKSUM):
+    """
+    Verifica data, que empieza en 'position' (múltiplo de bytes_per_checksum) dentro
+    del bloque, contra los checksums guardados. Lanza ChecksumError si alguna parte no coincide.
+    """
+    view = memoryview(data)
+    first = position // bytes_per_checksum
+    for i, start in enumerate(range(0, len(view), bytes_per_checksum)):
+        index = first + i
+        if index >= len(checksums) or crc32c(view[start:start + bytes_per_checksum]) != checksums[index]:
+            raise ChecksumError(index)
+
+
+class ChunkChecksummer:
+    """
+    Calcula los checksums por partes de un bloque que llega en mensajes de cualquier
+    tamaño, sin guardar más de una parte en memoria.
+    """
+    def __init__(self, bytes_per_checksum=BYTES_PER_CHECKSUM):
+        self.bytes_per_checksum = bytes_per_checksum
+        self.checksums = []
+        self.pending = bytearray()
+
+    def update(self, data):
+        view = memoryview(data)
+        if self.pending:
+            take = self.bytes_per_checksum - len(self.pending)
+            self.pending.extend(view[:take])
+            view = view[take:]
+            if len(self.pending) < self.bytes_per_checksum:
+                return
+            self.checksums.append(crc32c(self.pending))
+            self.pending.clear()
+        whole = len(view) - len(view) % self.bytes_per_checksum
+        self.checksums.extend(chunk_checksums(view[:whole], self.bytes_per_checksum))
+        self.pending.extend(view[whole:])
+
+    def finish(self):
+        """Devuelve la lista de checksums, incluida la última parte incompleta."""
+        if self.pending:
+            self.checksums.append(crc32c(self.pending))
+            self.pending.clear()
+        return self.checksums
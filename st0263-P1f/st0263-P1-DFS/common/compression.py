@@ -0,0 +1,140 @@
+"""
+Códecs de compresión por bloque, compartidos por el CLI y los DataNodes.
+
+Un códec se identifica por su nombre, que viaja en los mensajes y se guarda en los
+metadatos de cada bloque; "" significa sin comprimir. Vienen zlib y lzma de la
+biblioteca estándar y zstd si está instalado el paquete 'zstandard'. Se pueden
+añadir otros con register(). Los bloques se nombran siempre por el SHA-256 de su
+contenido sin comprimir, así la deduplicación no depende del códec.
+"""
+import lzma
+import zlib
+from abc import ABC, abstractmethod
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MIN_SAVING = 0.1  # Un bloque que no se reduce al menos esta fracción se guarda sin comprimir
+
+
+class CodecError(ValueError):
+    """Un bloque no se pudo descomprimir (datos dañados o códec equivocado)."""
+
+
+class UnsupportedCodec(CodecError):
+    """El códec pedido no está registrado en este proceso."""
+    def __init__(self, name):
+        super().__init__(f"unsupported codec {name!r}")
+        self.name = name
+
+
+class Codec(ABC):
+    """
+    Interfaz de un códec: un nombre único y compress/decompress de bloques completos.
+    Un códec al que le falte alguno de los dos falla al crearlo, no a mitad de una subida.
+    """
+    name = ""
+
+    @abstractmethod
+    def compress(self, data):
+        """Devuelve el bloque comprimido."""
+
+    @abstractmethod
+    def decompress(self, data):
+        """Devuelve el contenido original de un bloque comprimido con compress()."""
+
+
+class ZlibCodec(Codec):
+    name = "zlib"
+
+    def __init__(self, level=6):
+        self.level = level
+
+    def compress(self, data):
+        return zlib.compress(data, self.level)
+
+    def decompress(self, data):
+        return zlib.decompress(data)
+
+
+class LzmaCodec(Codec):
+    """Comprime más que zlib a costa de CPU; el preset bajo lo mantiene usable en las subidas."""
+    name = "lzma"
+
+    def __init__(self, preset=1):
+        self.preset = preset
+
+    def compress(self, data):
+        return lzma.compress(data, preset=self.preset)
+
+    def decompress(self, data):
+        return lzma.decompress(data)
+
+
+class ZstdCodec(Codec):
+    name = "zstd"
+
+    def __init__(self, level=3):
+        self.compressor = zstandard.ZstdCompressor(level=level)
+        self.decompressor = zstandard.ZstdDecompressor()
+
+    def compress(self, data):
+        return self.compressor.compress(data)
+
+    def decompress(self, data):
+        # El tamaño original va en la cabecera del frame que escribe compress()
+        return self.decompressor.decompress(data)
+
+
+_codecs = {}
+
+
+def register(codec):
+    """Añade (o reemplaza) un códec; debe registrarse igual en quien comprime y en quien descomprime."""
+    _codecs[codec.name] = codec
+
+
+def get(name):
+    try:
+        return _codecs[name]
+    except KeyError:
+        raise UnsupportedCodec(name) from None
+
+
+def available():
+    """Nombres de los códecs registrados, para anunciarlos al negociar."""
+    return sorted(_codecs)
+
+
+def compress_block(name, data, compressed=None):
+    """
+    Comprime un bloque con el códec 'name' y devuelve (códec, datos). Si no hay códec
+    o el resultado no ahorra al menos MIN_SAVING, devuelve ("", data) sin comprimir.
+    'compressed' es el bloque ya comprimido con ese códec, si se tiene.
+    """
+    if not name:
+        return "", data
+    if compressed is None:
+        compressed = get(name).compress(data)
+    if len(compressed) > len(data) * (1 - MIN_SAVING):
+        return "", data
+    return name, compressed
+
+
+def decompress(name, data):
+    """Contenido original de un bloque guardado o enviado con el códec 'name'."""
+    if not name:
+        return data
+    codec = get(name)
+    try:
+        return codec.decompress(data)
+    except Exception as e:
+        raise CodecError(f"{name}: {e}") from e
+
+
+register(ZlibCodec())
+register(LzmaCodec())
+if zstandard is not None:
+    register(ZstdCodec())
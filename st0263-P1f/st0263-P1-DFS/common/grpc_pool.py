@@ -0,0 +1,169 @@
+"""
+Pool compartido de canales gRPC para el CLI, los DataNodes y el NameNode.
+
+Cada dirección tiene un único canal (y su stub) que se reutiliza entre llamadas,
+así que sólo se paga el handshake TCP/HTTP2 la primera vez. Los canales usan
+keepalive para detectar conexiones muertas y se descartan si fallan varias
+llamadas seguidas o si llevan demasiado tiempo sin pedirse. Descartar un canal sólo
+lo saca del pool: las llamadas que siguen en curso sobre él (streams largos como
+WatchNamespace o una descarga) terminan normalmente y el canal se libera cuando
+ya nadie lo usa. Sólo close() cierra los canales de verdad.
+"""
+import time
+from threading import Lock
+
+import grpc
+
+import dfs_pb2_grpc
+
+MAX_MESSAGE_LENGTH = 64 * 1024 * 1024  # Permite mensajes más grandes que el límite por defecto de 4MB
+IDLE_TIMEOUT = 300  # Segundos sin pedirse antes de sacar un canal del pool
+MAX_FAILURES = 3  # Fallos de conexión seguidos antes de descartar un canal
+SWEEP_INTERVAL = 60  # Cada cuánto se buscan canales inactivos
+
+CHANNEL_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.max_pings_without_data', 0),
+    ('grpc.max_send_message_length', MAX_MESSAGE_LENGTH),
+    ('grpc.max_receive_message_length', MAX_MESSAGE_LENGTH),
+]
+
+# Opciones para los servidores: deben aceptar los pings de keepalive de los clientes
+SERVER_OPTIONS = [
+    ('grpc.keepalive_time_ms', 30000),
+    ('grpc.keepalive_timeout_ms', 10000),
+    ('grpc.keepalive_permit_without_calls', 1),
+    ('grpc.http2.min_ping_interval_without_data_ms', 10000),
+    ('grpc.max_send_message_length', MAX_MESSAGE_LENGTH),
+    ('grpc.max_receive_message_length', MAX_MESSAGE_LENGTH),
+]
+
+# Códigos que indican un problema con la conexión y no con la petición
+CONNECTION_ERRORS = (grpc.StatusCode.UNAVAILABLE, grpc.StatusCode.DEADLINE_EXCEEDED)
+
+
+class _Entry:
+    def __init__(self, channel):
+        self.channel = channel
+        self.stub = dfs_pb2_grpc.dfsStub(channel)
+        self.last_used = time.time()
+        self.failures = 0
+        self.state = None
+
+    def on_state(self, state):
+        self.state = state
+
+
+class ChannelPool:
+    def __init__(self, options=CHANNEL_OPTIONS, idle_timeout=IDLE_TIMEOUT, max_failures=MAX_FAILURES):
+        self.options = options
+        self.idle_timeout = idle_timeout
+        self.max_failures = max_failures
+        self._entries = {}
+        self._lock = Lock()
+        self._last_sweep = time.time()
+
+    def _entry(self, address):
+        address = normalize_address(address)
+        now = time.time()
+        with self._lock:
+            if now - self._last_sweep > SWEEP_INTERVAL:
+                self._sweep(now)
+            entry = self._entries.get(address)
+            if entry is None or entry.state == grpc.ChannelConnectivity.SHUTDOWN:
+                entry = _Entry(grpc.insecure_channel(address, options=self.options))
+                entry.channel.subscribe(entry.on_state)
+                self._entries[address] = entry
+            entry.last_used = now
+            return entry
+
+    def channel(self, address):
+        """Devuelve el canal compartido para la dirección, creándolo si no existe."""
+        return self._entry(address).channel
+
+    def stub(self, address):
+        """Devuelve el stub dfs compartido para la dirección."""
+        return self._entry(address).stub
+
+    def report_success(self, address):
+        entry = self._entries.get(normalize_address(address))
+        if entry is not None:
+            entry.failures = 0
+
+    def report_failure(self, address, error=None):
+        """
+        Registra un fallo de llamada. Los errores de conexión cuentan para descartar
+        el canal; los demás (p. ej. NOT_FOUND) no dicen nada de su salud.
+        """
+        if isinstance(error, grpc.RpcError) and error.code() not in CONNECTION_ERRORS:
+            return
+        address = normalize_address(address)
+        with self._lock:
+            entry = self._entries.get(address)
+            if entry is None:
+                return
+            entry.failures += 1
+            if entry.failures >= self.max_failures:
+                self._drop(address)
+
+    def is_healthy(self, address):
+        """False si el canal existe y está en TRANSIENT_FAILURE o ya acumuló fallos."""
+        entry = self._entries.get(normalize_address(address))
+        if entry is None:
+            return True
+        return entry.state != grpc.ChannelConnectivity.TRANSIENT_FAILURE and entry.failures == 0
+
+    def evict(self, address):
+        with self._lock:
+            self._drop(normalize_address(address))
+
+    def close(self):
+        """Cierra todos los canales, cancelando las llamadas en curso; para apagar el proceso."""
+        with self._lock:
+            for address in list(self._entries):
+                entry = self._drop(address)
+                entry.channel.close()
+
+    def _drop(self, address):
+        # Sin close(): las llamadas en curso mantienen vivo el canal hasta terminar
+        entry = self._entries.pop(address, None)
+        if entry is not None:
+            entry.channel.unsubscribe(entry.on_state)
+        return entry
+
+    def _sweep(self, now):
+        self._last_sweep = now
+        for address, entry in list(self._entries.items()):
+            if now - entry.last_used > self.idle_timeout:
+                self._drop(address)
+
+
+def normalize_address(address):
+    if isinstance(address, bytes):
+        return address.decode('utf-8')
+    return address
+
+
+default_pool = ChannelPool()
+
+
+def get_stub(address):
+    return default_pool.stub(address)
+
+
+def get_channel(address):
+    return default_pool.channel(address)
+
+
+def report_success(address):
+    default_pool.report_success(address)
+
+
+def report_failure(address, error=None):
+    default_pool.report_failure(address, error)
+
+
+def is_healthy(address):
+    return default_pool.is_healthy(address)
@@ -24,13 +24,15 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tdfs.proto\x12\x05\x66iles\"\x0e\n\x0c\x45mptyMessage\"\x1f\n\rStatusMessage\x12\x0e\n\x06status\x18\x01 \x01(\x05\" \n\x11PingFilesResponse\x12\x0b\n\x03\x61\x63k\x18\x01 \x01(\t\"2\n\x11ListFilesResponse\x12\r\n\x05\x66iles\x18\x01 \x03(\t\x12\x0e\n\x06status\x18\x02 \x01(\x05\"#\n\x0f\x46indFileRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\"9\n\x10\x46indFileResponse\x12\x15\n\rnodeAddresses\x18\x01 \x03(\t\x12\x0e\n\x06status\x18\x02 \x01(\x05\"\'\n\x13\x44ownloadFileRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\"*\n\x14\x44ownloadFileResponse\x12\x12\n\nchunk_data\x18\x01 \x01(\x0c\"H\n\x11UploadFileRequest\x12\x12\n\x08\x66ileName\x18\x01 \x01(\tH\x00\x12\x14\n\nchunk_data\x18\x02 \x01(\x0cH\x00\x42\t\n\x07request\"`\n\x12UploadBlockRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x11\n\tblockName\x18\x02 \x01(\t\x12\x12\n\nchunk_data\x18\x03 \x01(\x0c\x12\x11\n\tis_leader\x18\x04 \x01(\x08\"%\n\x13UploadBlockResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\".\n\x0fNameNodeRequest\x12\x0c\n\x04\x63onn\x18\x01 \x01(\t\x12\r\n\x05\x66iles\x18\x02 \x03(\t\"4\n\rBlockLocation\x12\x11\n\tblockName\x18\x01 \x01(\t\x12\x10\n\x08\x64\x61tanode\x18\x02 \x01(\t\"V\n\x16\x42lockLocationsResponse\x12,\n\x0e\x62lockLocations\x18\x01 \x03(\x0b\x32\x14.files.BlockLocation\x12\x0e\n\x06status\x18\x02 \x01(\x05\"1\n\x10\x44\x61taNodeResponse\x12\r\n\x05\x63onns\x18\x01 \x03(\t\x12\x0e\n\x06status\x18\x02 \x01(\x05\x32\xdd\x04\n\x03\x64\x66s\x12:\n\tPingFiles\x12\x13.files.EmptyMessage\x1a\x18.files.PingFilesResponse\x12:\n\tListFiles\x12\x13.files.EmptyMessage\x1a\x18.files.ListFilesResponse\x12I\n\x0c\x44ownloadFile\x12\x1a.files.DownloadFileRequest\x1a\x1b.files.DownloadFileResponse0\x01\x12=\n\nUploadFile\x12\x18.files.UploadFileRequest\x1a\x13.files.EmptyMessage(\x01\x12\x44\n\x0bUploadBlock\x12\x19.files.UploadBlockRequest\x1a\x1a.files.UploadBlockResponse\x12\x42\n\x12NameNodeConnection\x12\x16.files.NameNodeRequest\x1a\x14.files.StatusMessage\x12M\n\x10NameNodeDownload\x12\x1a.files.DownloadFileRequest\x1a\x1d.files.BlockLocationsResponse\x12>\n\x0eNameNodeUpload\x12\x13.files.EmptyMessage\x1a\x17.files.DataNodeResponse\x12;\n\x08\x46indFile\x12\x16.files.FindFileRequest\x1a\x17.files.FindFileResponseb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\tdfs.proto\x12\x05\x66iles\"\x0e\n\x0c\x45mptyMessage\"\x1f\n\rStatusMessage\x12\x0e\n\x06status\x18\x01 \x01(\x05\" \n\x11PingFilesResponse\x12\x0b\n\x03\x61\x63k\x18\x01 \x01(\t\"C\n\x11ListFilesResponse\x12\r\n\x05\x66iles\x18\x01 \x03(\t\x12\x0e\n\x06status\x18\x02 \x01(\x05\x12\x0f\n\x07version\x18\x03 \x01(\x03\"#\n\x0f\x46indFileRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\"J\n\x10\x46indFileResponse\x12\x15\n\rnodeAddresses\x18\x01 \x03(\t\x12\x0e\n\x06status\x18\x02 \x01(\x05\x12\x0f\n\x07version\x18\x03 \x01(\x03\"^\n\x13\x44ownloadFileRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x0e\n\x06offset\x18\x02 \x01(\x03\x12\x0e\n\x06length\x18\x03 \x01(\x03\x12\x15\n\raccept_codecs\x18\x04 \x03(\t\"9\n\x14\x44ownloadFileResponse\x12\x12\n\nchunk_data\x18\x01 \x01(\x0c\x12\r\n\x05\x63odec\x18\x02 \x01(\t\"W\n\x11UploadFileRequest\x12\x12\n\x08\x66ileName\x18\x01 \x01(\tH\x00\x12\x14\n\nchunk_data\x18\x02 \x01(\x0cH\x00\x12\r\n\x05\x63odec\x18\x03 \x01(\tB\t\n\x07request\"`\n\x12UploadBlockRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x11\n\tblockName\x18\x02 \x01(\t\x12\x12\n\nchunk_data\x18\x03 \x01(\x0c\x12\x11\n\tis_leader\x18\x04 \x01(\x08\"\xbd\x01\n\x11UploadBlockHeader\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x11\n\tblockName\x18\x02 \x01(\t\x12\x11\n\tis_leader\x18\x03 \x01(\x08\x12\x11\n\tfollowers\x18\x04 \x03(\t\x12\r\n\x05index\x18\x05 \x01(\x05\x12\x11\n\tchecksums\x18\x06 \x03(\r\x12\x1a\n\x12\x62ytes_per_checksum\x18\x07 \x01(\x05\x12\r\n\x05\x63odec\x18\x08 \x01(\t\x12\x10\n\x08raw_size\x18\t \x01(\x03\"_\n\x10UploadBlockChunk\x12*\n\x06header\x18\x01 \x01(\x0b\x32\x18.files.UploadBlockHeaderH\x00\x12\x14\n\nchunk_data\x18\x02 \x01(\x0cH\x00\x42\t\n\x07request\"%\n\x13UploadBlockResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\"_\n\tBlockInfo\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x11\n\tblockName\x18\x02 \x01(\t\x12\r\n\x05index\x18\x03 \x01(\x05\x12\x0c\n\x04size\x18\x04 \x01(\x03\x12\x10\n\x08\x63hecksum\x18\x05 \x01(\t\"\xc4\x01\n\x0fNameNodeRequest\x12\x0c\n\x04\x63onn\x18\x01 \x01(\t\x12\r\n\x05\x66iles\x18\x02 \x03(\t\x12 \n\x06\x62locks\x18\x03 \x03(\x0b\x32\x10.files.BlockInfo\x12\x0f\n\x07removed\x18\x04 \x03(\t\x12\x13\n\x0b\x66ull_report\x18\x05 \x01(\x08\x12\x12\n\nreport_seq\x18\x06 \x01(\x03\x12#\n\x07metrics\x18\x07 \x01(\x0b\x32\x12.files.NodeMetrics\x12\x13\n\x0bincarnation\x18\x08 \x01(\x03\"g\n\x0bNodeMetrics\x12\x10\n\x08\x63\x61pacity\x18\x01 \x01(\x03\x12\x12\n\nfree_space\x18\x02 \x01(\x03\x12\x1a\n\x12inflight_transfers\x18\x03 \x01(\x05\x12\x16\n\x0ethroughput_bps\x18\x04 \x01(\x01\"o\n\x14\x41llocateBlockRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x11\n\tblockName\x18\x02 \x01(\t\x12\x0c\n\x04size\x18\x03 \x01(\x03\x12\x13\n\x0breplication\x18\x04 \x01(\x05\x12\x0f\n\x07\x65xclude\x18\x05 \x03(\t\"\x92\x01\n\x11HeartbeatResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\x0f\n\x07\x61\x63k_seq\x18\x02 \x01(\x03\x12\x1a\n\x12\x66ull_report_needed\x18\x03 \x01(\x08\x12,\n\treplicate\x18\x04 \x03(\x0b\x32\x19.files.ReplicationCommand\x12\x12\n\ninvalidate\x18\x05 \x03(\t\"8\n\x12ReplicationCommand\x12\x11\n\tblockName\x18\x01 \x01(\t\x12\x0f\n\x07targets\x18\x02 \x03(\t\"\xab\x01\n\rBlockLocation\x12\x11\n\tblockName\x18\x01 \x01(\t\x12\x10\n\x08\x64\x61tanode\x18\x02 \x01(\t\x12\r\n\x05index\x18\x03 \x01(\x05\x12\x0c\n\x04size\x18\x04 \x01(\x03\x12\x10\n\x08\x63hecksum\x18\x05 \x01(\t\x12\x10\n\x08replicas\x18\x06 \x03(\t\x12\x0e\n\x06offset\x18\x07 \x01(\x03\x12\x0e\n\x06packed\x18\x08 \x01(\x08\x12\x14\n\x0c\x62lock_offset\x18\t \x01(\x03\"\x8b\x01\n\x16\x42lockLocationsResponse\x12,\n\x0e\x62lockLocations\x18\x01 \x03(\x0b\x32\x14.files.BlockLocation\x12\x0e\n\x06status\x18\x02 \x01(\x05\x12\x10\n\x08\x66ileName\x18\x03 \x01(\t\x12\x10\n\x08\x66ileSize\x18\x04 \x01(\x03\x12\x0f\n\x07version\x18\x05 \x01(\x03\"1\n\x10\x44\x61taNodeResponse\x12\r\n\x05\x63onns\x18\x01 \x03(\t\x12\x0e\n\x06status\x18\x02 \x01(\x05\"7\n\x0f\x42\x61\x64\x42lockRequest\x12\x10\n\x08\x64\x61tanode\x18\x01 \x01(\t\x12\x12\n\nblockNames\x18\x02 \x03(\t\"\\\n\x08\x42lockRef\x12\x0c\n\x04hash\x18\x01 \x01(\t\x12\x0c\n\x04size\x18\x02 \x01(\x03\x12\x0e\n\x06offset\x18\x03 \x01(\x03\x12\x12\n\nblock_size\x18\x04 \x01(\x03\x12\x10\n\x08replicas\x18\x05 \x03(\t\"X\n\x11\x43ommitFileRequest\x12\x10\n\x08\x66ileName\x18\x01 \x01(\t\x12\x1f\n\x06\x62locks\x18\x02 \x03(\x0b\x32\x0f.files.BlockRef\x12\x10\n\x08uploaded\x18\x03 \x01(\x08\"5\n\x12\x43ommitFileResponse\x12\x0e\n\x06status\x18\x01 \x01(\x05\x12\x0f\n\x07missing\x18\x02 \x03(\t\"=\n\x12\x43ommitFilesRequest\x12\'\n\x05\x66iles\x18\x01 \x03(\x0b\x32\x18.files.CommitFileRequest\"A\n\x13\x43ommitFilesResponse\x12*\n\x07results\x18\x01 \x03(\x0b\x32\x19.files.CommitFileResponse\"\"\n\x10HasBlocksRequest\x12\x0e\n\x06hashes\x18\x01 \x03(\t\"$\n\x11HasBlocksResponse\x12\x0f\n\x07present\x18\x01 \x03(\t\"\x1d\n\x0cWatchRequest\x12\r\n\x05since\x18\x01 \x01(\x03\"k\n\x0fNamespaceChange\x12\x0f\n\x07version\x18\x01 \x01(\x03\x12\r\n\x05\x66iles\x18\x02 \x03(\t\x12\x17\n\x0flisting_version\x18\x03 \x01(\x03\x12\r\n\x05reset\x18\x04 \x01(\x08\x12\x10\n\x08lease_ms\x18\x05 \x01(\x03\"\x87\x01\n\x0fMetricsResponse\x12\x34\n\x07metrics\x18\x01 \x03(\x0b\x32#.files.MetricsResponse.MetricsEntry\x12\x0e\n\x06status\x18\x02 \x01(\x05\x1a.\n\x0cMetricsEntry\x12\x0b\n\x03key\x18\x01 \x01(\t\x12\r\n\x05value\x18\x02 \x01(\x01:\x02\x38\x01\x32\x86\n\n\x03\x64\x66s\x12:\n\tPingFiles\x12\x13.files.EmptyMessage\x1a\x18.files.PingFilesResponse\x12:\n\tListFiles\x12\x13.files.EmptyMessage\x1a\x18.files.ListFilesResponse\x12I\n\x0c\x44ownloadFile\x12\x1a.files.DownloadFileRequest\x1a\x1b.files.DownloadFileResponse0\x01\x12=\n\nUploadFile\x12\x18.files.UploadFileRequest\x1a\x13.files.EmptyMessage(\x01\x12?\n\x0cUploadPacked\x12\x18.files.UploadFileRequest\x1a\x13.files.EmptyMessage(\x01\x12\x44\n\x0bUploadBlock\x12\x19.files.UploadBlockRequest\x1a\x1a.files.UploadBlockResponse\x12J\n\x11UploadBlockStream\x12\x17.files.UploadBlockChunk\x1a\x1a.files.UploadBlockResponse(\x01\x12\x46\n\x12NameNodeConnection\x12\x16.files.NameNodeRequest\x1a\x18.files.HeartbeatResponse\x12M\n\x10NameNodeDownload\x12\x1a.files.DownloadFileRequest\x1a\x1d.files.BlockLocationsResponse\x12J\n\rGetBlockRange\x12\x1a.files.DownloadFileRequest\x1a\x1d.files.BlockLocationsResponse\x12>\n\x0eNameNodeUpload\x12\x13.files.EmptyMessage\x1a\x17.files.DataNodeResponse\x12\x45\n\rAllocateBlock\x12\x1b.files.AllocateBlockRequest\x1a\x17.files.DataNodeResponse\x12;\n\x08\x46indFile\x12\x16.files.FindFileRequest\x1a\x17.files.FindFileResponse\x12\x39\n\nGetMetrics\x12\x13.files.EmptyMessage\x1a\x16.files.MetricsResponse\x12>\n\x0eReportBadBlock\x12\x16.files.BadBlockRequest\x1a\x14.files.StatusMessage\x12\x41\n\nCommitFile\x12\x18.files.CommitFileRequest\x1a\x19.files.CommitFileResponse\x12\x44\n\x0b\x43ommitFiles\x12\x19.files.CommitFilesRequest\x1a\x1a.files.CommitFilesResponse\x12>\n\tHasBlocks\x12\x17.files.HasBlocksRequest\x1a\x18.files.HasBlocksResponse\x12?\n\x0eWatchNamespace\x12\x13.files.WatchRequest\x1a\x16.files.NamespaceChange0\x01\x62\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
 _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'dfs_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   DESCRIPTOR._loaded_options = None
+  _globals['_METRICSRESPONSE_METRICSENTRY']._loaded_options = None
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_options = b'8\001'
   _globals['_EMPTYMESSAGE']._serialized_start=20
   _globals['_EMPTYMESSAGE']._serialized_end=34
   _globals['_STATUSMESSAGE']._serialized_start=36
@@ -38,29 +40,67 @@ if not _descriptor._USE_C_DESCRIPTORS:
   _globals['_PINGFILESRESPONSE']._serialized_start=69
   _globals['_PINGFILESRESPONSE']._serialized_end=101
   _globals['_LISTFILESRESPONSE']._serialized_start=103
-  _globals['_LISTFILESRESPONSE']._serialized_end=153
-  _globals['_FINDFILEREQUEST']._serialized_start=155
-  _globals['_FINDFILEREQUEST']._serialized_end=190
-  _globals['_FINDFILERESPONSE']._serialized_start=192
-  _globals['_FINDFILERESPONSE']._serialized_end=249
-  _globals['_DOWNLOADFILEREQUEST']._serialized_start=251
-  _globals['_DOWNLOADFILEREQUEST']._serialized_end=290
-  _globals['_DOWNLOADFILERESPONSE']._serialized_start=292
-  _globals['_DOWNLOADFILERESPONSE']._serialized_end=334
-  _globals['_UPLOADFILEREQUEST']._serialized_start=336
-  _globals['_UPLOADFILEREQUEST']._serialized_end=408
-  _globals['_UPLOADBLOCKREQUEST']._serialized_start=410
-  _globals['_UPLOADBLOCKREQUEST']._serialized_end=506
-  _globals['_UPLOADBLOCKRESPONSE']._serialized_start=508
-  _globals['_UPLOADBLOCKRESPONSE']._serialized_end=545
-  _globals['_NAMENODEREQUEST']._serialized_start=547
-  _globals['_NAMENODEREQUEST']._serialized_end=593
-  _globals['_BLOCKLOCATION']._serialized_start=595
-  _globals['_BLOCKLOCATION']._serialized_end=647
-  _globals['_BLOCKLOCATIONSRESPONSE']._serialized_start=649
-  _globals['_BLOCKLOCATIONSRESPONSE']._serialized_end=735
-  _globals['_DATANODERESPONSE']._serialized_start=737
-  _globals['_DATANODERESPONSE']._serialized_end=786
-  _globals['_DFS']._serialized_start=789
-  _globals['_DFS']._serialized_end=1394
+  _globals['_LISTFILESRESPONSE']._serialized_end=170
+  _globals['_FINDFILEREQUEST']._serialized_start=172
+  _globals['_FINDFILEREQUEST']._serialized_end=207
+  _globals['_FINDFILERESPONSE']._serialized_start=209
+  _globals['_FINDFILERESPONSE']._serialized_end=283
+  _globals['_DOWNLOADFILEREQUEST']._serialized_start=285
+  _globals['_DOWNLOADFILEREQUEST']._serialized_end=379
+  _globals['_DOWNLOADFILERESPONSE']._serialized_start=381
+  _globals['_DOWNLOADFILERESPONSE']._serialized_end=438
+  _globals['_UPLOADFILEREQUEST']._serialized_start=440
+  _globals['_UPLOADFILEREQUEST']._serialized_end=527
+  _globals['_UPLOADBLOCKREQUEST']._serialized_start=529
+  _globals['_UPLOADBLOCKREQUEST']._serialized_end=625
+  _globals['_UPLOADBLOCKHEADER']._serialized_start=628
+  _globals['_UPLOADBLOCKHEADER']._serialized_end=817
+  _globals['_UPLOADBLOCKCHUNK']._serialized_start=819
+  _globals['_UPLOADBLOCKCHUNK']._serialized_end=914
+  _globals['_UPLOADBLOCKRESPONSE']._serialized_start=916
+  _globals['_UPLOADBLOCKRESPONSE']._serialized_end=953
+  _globals['_BLOCKINFO']._serialized_start=955
+  _globals['_BLOCKINFO']._serialized_end=1050
+  _globals['_NAMENODEREQUEST']._serialized_start=1053
+  _globals['_NAMENODEREQUEST']._serialized_end=1249
+  _globals['_NODEMETRICS']._serialized_start=1251
+  _globals['_NODEMETRICS']._serialized_end=1354
+  _globals['_ALLOCATEBLOCKREQUEST']._serialized_start=1356
+  _globals['_ALLOCATEBLOCKREQUEST']._serialized_end=1467
+  _globals['_HEARTBEATRESPONSE']._serialized_start=1470
+  _globals['_HEARTBEATRESPONSE']._serialized_end=1616
+  _globals['_REPLICATIONCOMMAND']._serialized_start=1618
+  _globals['_REPLICATIONCOMMAND']._serialized_end=1674
+  _globals['_BLOCKLOCATION']._serialized_start=1677
+  _globals['_BLOCKLOCATION']._serialized_end=1848
+  _globals['_BLOCKLOCATIONSRESPONSE']._serialized_start=1851
+  _globals['_BLOCKLOCATIONSRESPONSE']._serialized_end=1990
+  _globals['_DATANODERESPONSE']._serialized_start=1992
+  _globals['_DATANODERESPONSE']._serialized_end=2041
+  _globals['_BADBLOCKREQUEST']._serialized_start=2043
+  _globals['_BADBLOCKREQUEST']._serialized_end=2098
+  _globals['_BLOCKREF']._serialized_start=2100
+  _globals['_BLOCKREF']._serialized_end=2192
+  _globals['_COMMITFILEREQUEST']._serialized_start=2194
+  _globals['_COMMITFILEREQUEST']._serialized_end=2282
+  _globals['_COMMITFILERESPONSE']._serialized_start=2284
+  _globals['_COMMITFILERESPONSE']._serialized_end=2337
+  _globals['_COMMITFILESREQUEST']._serialized_start=2339
+  _globals['_COMMITFILESREQUEST']._serialized_end=2400
+  _globals['_COMMITFILESRESPONSE']._serialized_start=2402
+  _globals['_COMMITFILESRESPONSE']._serialized_end=2467
+  _globals['_HASBLOCKSREQUEST']._serialized_start=2469
+  _globals['_HASBLOCKSREQUEST']._serialized_end=2503
+  _globals['_HASBLOCKSRESPONSE']._serialized_start=2505
+  _globals['_HASBLOCKSRESPONSE']._serialized_end=2541
+  _globals['_WATCHREQUEST']._serialized_start=2543
+  _globals['_WATCHREQUEST']._serialized_end=2572
+  _globals['_NAMESPACECHANGE']._serialized_start=2574
+  _globals['_NAMESPACECHANGE']._serialized_end=2681
+  _globals['_METRICSRESPONSE']._serialized_start=2684
+  _globals['_METRICSRESPONSE']._serialized_end=2819
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_start=2773
+  _globals['_METRICSRESPONSE_METRICSENTRY']._serialized_end=2819
+  _globals['_DFS']._serialized_start=2822
+  _globals['_DFS']._serialized_end=4108
 # @@protoc_insertion_point(module_scope)
@@ -54,31 +54,81 @@ class dfsStub(object):
                 request_serializer=dfs__pb2.UploadFileRequest.SerializeToString,
                 response_deserializer=dfs__pb2.EmptyMessage.FromString,
                 _registered_method=True)
+        self.UploadPacked = channel.stream_unary(
+                '/files.dfs/UploadPacked',
+                request_serializer=dfs__pb2.UploadFileRequest.SerializeToString,
+                response_deserializer=dfs__pb2.EmptyMessage.FromString,
+                _registered_method=True)
         self.UploadBlock = channel.unary_unary(
                 '/files.dfs/UploadBlock',
                 request_serializer=dfs__pb2.UploadBlockRequest.SerializeToString,
                 response_deserializer=dfs__pb2.UploadBlockResponse.FromString,
                 _registered_method=True)
+        self.UploadBlockStream = channel.stream_unary(
+                '/files.dfs/UploadBlockStream',
+                request_serializer=dfs__pb2.UploadBlockChunk.SerializeToString,
+                response_deserializer=dfs__pb2.UploadBlockResponse.FromString,
+                _registered_method=True)
         self.NameNodeConnection = channel.unary_unary(
                 '/files.dfs/NameNodeConnection',
                 request_serializer=dfs__pb2.NameNodeRequest.SerializeToString,
-                response_deserializer=dfs__pb2.StatusMessage.FromString,
+                response_deserializer=dfs__pb2.HeartbeatResponse.FromString,
                 _registered_method=True)
         self.NameNodeDownload = channel.unary_unary(
                 '/files.dfs/NameNodeDownload',
                 request_serializer=dfs__pb2.DownloadFileRequest.SerializeToString,
                 response_deserializer=dfs__pb2.BlockLocationsResponse.FromString,
                 _registered_method=True)
+        self.GetBlockRange = channel.unary_unary(
+                '/files.dfs/GetBlockRange',
+                request_serializer=dfs__pb2.DownloadFileRequest.SerializeToString,
+                response_deserializer=dfs__pb2.BlockLocationsResponse.FromString,
+                _registered_method=True)
         self.NameNodeUpload = channel.unary_unary(
                 '/files.dfs/NameNodeUpload',
                 request_serializer=dfs__pb2.EmptyMessage.SerializeToString,
                 response_deserializer=dfs__pb2.DataNodeResponse.FromString,
                 _registered_method=True)
+        self.AllocateBlock = channel.unary_unary(
+                '/files.dfs/AllocateBlock',
+                request_serializer=dfs__pb2.AllocateBlockRequest.SerializeToString,
+                response_deserializer=dfs__pb2.DataNodeResponse.FromString,
+                _registered_method=True)
         self.FindFile = channel.unary_unary(
                 '/files.dfs/FindFile',
                 request_serializer=dfs__pb2.FindFileRequest.SerializeToString,
                 response_deserializer=dfs__pb2.FindFileResponse.FromString,
                 _registered_method=True)
+        self.GetMetrics = channel.unary_unary(
+                '/files.dfs/GetMetrics',
+                request_serializer=dfs__pb2.EmptyMessage.SerializeToString,
+                response_deserializer=dfs__pb2.MetricsResponse.FromString,
+                _registered_method=True)
+        self.ReportBadBlock = channel.unary_unary(
+                '/files.dfs/ReportBadBlock',
+                request_serializer=dfs__pb2.BadBlockRequest.SerializeToString,
+                response_deserializer=dfs__pb2.StatusMessage.FromString,
+                _registered_method=True)
+        self.CommitFile = channel.unary_unary(
+                '/files.dfs/CommitFile',
+                request_serializer=dfs__pb2.CommitFileRequest.SerializeToString,
+                response_deserializer=dfs__pb2.CommitFileResponse.FromString,
+                _registered_method=True)
+        self.CommitFiles = channel.unary_unary(
+                '/files.dfs/CommitFiles',
+                request_serializer=dfs__pb2.CommitFilesRequest.SerializeToString,
+                response_deserializer=dfs__pb2.CommitFilesResponse.FromString,
+                _registered_method=True)
+        self.HasBlocks = channel.unary_unary(
+                '/files.dfs/HasBlocks',
+                request_serializer=dfs__pb2.HasBlocksRequest.SerializeToString,
+                response_deserializer=dfs__pb2.HasBlocksResponse.FromString,
+                _registered_method=True)
+        self.WatchNamespace = channel.unary_stream(
+                '/files.dfs/WatchNamespace',
+                request_serializer=dfs__pb2.WatchRequest.SerializeToString,
+                response_deserializer=dfs__pb2.NamespaceChange.FromString,
+                _registered_method=True)
 
 
 class dfsServicer(object):
@@ -108,8 +158,22 @@ class dfsServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def UploadPacked(self, request_iterator, context):
+        """Varios archivos pequeños, empaquetados en bloques contenedores
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def UploadBlock(self, request, context):
-        """NUEVO: RPC para subir bloques
+        """NUEVO: RPC para subir bloques
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def UploadBlockStream(self, request_iterator, context):
+        """Subida de bloques por partes, con reenvío en pipeline
         """
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
@@ -127,18 +191,73 @@ class dfsServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetBlockRange(self, request, context):
+        """Sólo los bloques que cubren offset/length
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def NameNodeUpload(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def AllocateBlock(self, request, context):
+        """DataNodes donde guardar las réplicas de un bloque
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
     def FindFile(self, request, context):
         """Missing associated documentation comment in .proto file."""
         context.set_code(grpc.StatusCode.UNIMPLEMENTED)
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def GetMetrics(self, request, context):
+        """Missing associated documentation comment in .proto file."""
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ReportBadBlock(self, request, context):
+        """Un DataNode avisa que una réplica suya está corrupta
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CommitFile(self, request, context):
+        """Fija la lista de bloques (hashes) de un archivo
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def CommitFiles(self, request, context):
+        """CommitFile de muchos archivos con un solo fsync
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def HasBlocks(self, request, context):
+        """Qué bloques (por hash) ya están en el clúster
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def WatchNamespace(self, request, context):
+        """Cambios del espacio de nombres, para invalidar cachés de clientes
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_dfsServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -162,31 +281,81 @@ def add_dfsServicer_to_server(servicer, server):
                     request_deserializer=dfs__pb2.UploadFileRequest.FromString,
                     response_serializer=dfs__pb2.EmptyMessage.SerializeToString,
             ),
+            'UploadPacked': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadPacked,
+                    request_deserializer=dfs__pb2.UploadFileRequest.FromString,
+                    response_serializer=dfs__pb2.EmptyMessage.SerializeToString,
+            ),
             'UploadBlock': grpc.unary_unary_rpc_method_handler(
                     servicer.UploadBlock,
                     request_deserializer=dfs__pb2.UploadBlockRequest.FromString,
                     response_serializer=dfs__pb2.UploadBlockResponse.SerializeToString,
             ),
+            'UploadBlockStream': grpc.stream_unary_rpc_method_handler(
+                    servicer.UploadBlockStream,
+                    request_deserializer=dfs__pb2.UploadBlockChunk.FromString,
+                    response_serializer=dfs__pb2.UploadBlockResponse.SerializeToString,
+            ),
             'NameNodeConnection': grpc.unary_unary_rpc_method_handler(
                     servicer.NameNodeConnection,
                     request_deserializer=dfs__pb2.NameNodeRequest.FromString,
-                    response_serializer=dfs__pb2.StatusMessage.SerializeToString,
+                    response_serializer=dfs__pb2.HeartbeatResponse.SerializeToString,
             ),
             'NameNodeDownload': grpc.unary_unary_rpc_method_handler(
                     servicer.NameNodeDownload,
                     request_deserializer=dfs__pb2.DownloadFileRequest.FromString,
                     response_serializer=dfs__pb2.BlockLocationsResponse.SerializeToString,
             ),
+            'GetBlockRange': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetBlockRange,
+                    request_deserializer=dfs__pb2.DownloadFileRequest.FromString,
+                    response_serializer=dfs__pb2.BlockLocationsResponse.SerializeToString,
+            ),
             'NameNodeUpload': grpc.unary_unary_rpc_method_handler(
                     servicer.NameNodeUpload,
                     request_deserializer=dfs__pb2.EmptyMessage.FromString,
                     response_serializer=dfs__pb2.DataNodeResponse.SerializeToString,
             ),
+            'AllocateBlock': grpc.unary_unary_rpc_method_handler(
+                    servicer.AllocateBlock,
+                    request_deserializer=dfs__pb2.AllocateBlockRequest.FromString,
+                    response_serializer=dfs__pb2.DataNodeResponse.SerializeToString,
+            ),
             'FindFile': grpc.unary_unary_rpc_method_handler(
                     servicer.FindFile,
                     request_deserializer=dfs__pb2.FindFileRequest.FromString,
                     response_serializer=dfs__pb2.FindFileResponse.SerializeToString,
             ),
+            'GetMetrics': grpc.unary_unary_rpc_method_handler(
+                    servicer.GetMetrics,
+                    request_deserializer=dfs__pb2.EmptyMessage.FromString,
+                    response_serializer=dfs__pb2.MetricsResponse.SerializeToString,
+            ),
+            'ReportBadBlock': grpc.unary_unary_rpc_method_handler(
+                    servicer.ReportBadBlock,
+                    request_deserializer=dfs__pb2.BadBlockRequest.FromString,
+                    response_serializer=dfs__pb2.StatusMessage.SerializeToString,
+            ),
+            'CommitFile': grpc.unary_unary_rpc_method_handler(
+                    servicer.CommitFile,
+                    request_deserializer=dfs__pb2.CommitFileRequest.FromString,
+                    response_serializer=dfs__pb2.CommitFileResponse.SerializeToString,
+            ),
+            'CommitFiles': grpc.unary_unary_rpc_method_handler(
+                    servicer.CommitFiles,
+                    request_deserializer=dfs__pb2.CommitFilesRequest.FromString,
+                    response_serializer=dfs__pb2.CommitFilesResponse.SerializeToString,
+            ),
+            'HasBlocks': grpc.unary_unary_rpc_method_handler(
+                    servicer.HasBlocks,
+                    request_deserializer=dfs__pb2.HasBlocksRequest.FromString,
+                    response_serializer=dfs__pb2.HasBlocksResponse.SerializeToString,
+            ),
+            'WatchNamespace': grpc.unary_stream_rpc_method_handler(
+                    servicer.WatchNamespace,
+                    request_deserializer=dfs__pb2.WatchRequest.FromString,
+                    response_serializer=dfs__pb2.NamespaceChange.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'files.dfs', rpc_method_handlers)
@@ -306,6 +475,33 @@ class dfs(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def UploadPacked(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/files.dfs/UploadPacked',
+            dfs__pb2.UploadFileRequest.SerializeToString,
+            dfs__pb2.EmptyMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def UploadBlock(request,
             target,
@@ -333,6 +529,33 @@ class dfs(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def UploadBlockStream(request_iterator,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.stream_unary(
+            request_iterator,
+            target,
+            '/files.dfs/UploadBlockStream',
+            dfs__pb2.UploadBlockChunk.SerializeToString,
+            dfs__pb2.UploadBlockResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def NameNodeConnection(request,
             target,
@@ -349,7 +572,7 @@ class dfs(object):
             target,
             '/files.dfs/NameNodeConnection',
             dfs__pb2.NameNodeRequest.SerializeToString,
-            dfs__pb2.StatusMessage.FromString,
+            dfs__pb2.HeartbeatResponse.FromString,
             options,
             channel_credentials,
             insecure,
@@ -387,6 +610,33 @@ class dfs(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def GetBlockRange(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/GetBlockRange',
+            dfs__pb2.DownloadFileRequest.SerializeToString,
+            dfs__pb2.BlockLocationsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def NameNodeUpload(request,
             target,
@@ -414,6 +664,33 @@ class dfs(object):
             metadata,
             _registered_method=True)
 
+    @staticmethod
+    def AllocateBlock(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/AllocateBlock',
+            dfs__pb2.AllocateBlockRequest.SerializeToString,
+            dfs__pb2.DataNodeResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
     @staticmethod
     def FindFile(request,
             target,
@@ -440,3 +717,165 @@ class dfs(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def GetMetrics(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/GetMetrics',
+            dfs__pb2.EmptyMessage.SerializeToString,
+            dfs__pb2.MetricsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ReportBadBlock(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/ReportBadBlock',
+            dfs__pb2.BadBlockRequest.SerializeToString,
+            dfs__pb2.StatusMessage.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CommitFile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/CommitFile',
+            dfs__pb2.CommitFileRequest.SerializeToString,
+            dfs__pb2.CommitFileResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def CommitFiles(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/CommitFiles',
+            dfs__pb2.CommitFilesRequest.SerializeToString,
+            dfs__pb2.CommitFilesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def HasBlocks(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/files.dfs/HasBlocks',
+            dfs__pb2.HasBlocksRequest.SerializeToString,
+            dfs__pb2.HasBlocksResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def WatchNamespace(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/files.dfs/WatchNamespace',
+            dfs__pb2.WatchRequest.SerializeToString,
+            dfs__pb2.NamespaceChange.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)